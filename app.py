@@ -1,9 +1,14 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import (
+    Flask, render_template, request, jsonify, flash, redirect, url_for, Response, send_file, stream_with_context
+)
 import numpy as np
 import pandas as pd
+import io
 import os
 import sys
 import json
+import time
+import uuid
 import warnings
 from werkzeug.exceptions import BadRequest
 from datetime import datetime
@@ -21,12 +26,97 @@ try:
 except ImportError:
     MARKET_COMPARISON_AVAILABLE = False
 
+try:
+    from market_comparison.summary_index import LocalitySummaryIndex, build_summary_frame, compute_data_version
+    SUMMARY_INDEX_AVAILABLE = True
+except ImportError:
+    SUMMARY_INDEX_AVAILABLE = False
+
+try:
+    from market_comparison.multi_comparison import compare_many
+    MULTI_COMPARISON_AVAILABLE = True
+except ImportError:
+    MULTI_COMPARISON_AVAILABLE = False
+
+try:
+    from market_comparison.bootstrap import ListingSamples, annotate_comparison, bootstrap_comparison
+    BOOTSTRAP_AVAILABLE = True
+except ImportError:
+    BOOTSTRAP_AVAILABLE = False
+
+try:
+    from market_comparison.similarity import SimilarityIndex
+    SIMILARITY_AVAILABLE = True
+except ImportError:
+    SIMILARITY_AVAILABLE = False
+
+try:
+    from market_comparison.comparison_cache import ComparisonCache, ComparisonWarmer
+    COMPARISON_CACHE_AVAILABLE = True
+except ImportError:
+    COMPARISON_CACHE_AVAILABLE = False
+
 try:
     from investment_calculator.investment_calculator import InvestmentCalculator, calculate_investment_details
     INVESTMENT_CALCULATOR_AVAILABLE = True
 except ImportError:
     INVESTMENT_CALCULATOR_AVAILABLE = False
 
+try:
+    from investment_calculator.cash_flow import (
+        analyze_investment, estimate_monthly_rent, realistic_risk_score, investment_recommendation
+    )
+    CASH_FLOW_MODEL_AVAILABLE = True
+except ImportError:
+    CASH_FLOW_MODEL_AVAILABLE = False
+
+try:
+    from investment_calculator.scenario_sweep import (
+        SWEEP_METRICS, SWEEP_RETURN_METRICS, SWEEP_TAX_METRICS, parse_axis, sweep_scenarios, summarize_sweep,
+        to_json_matrix
+    )
+    SCENARIO_SWEEP_AVAILABLE = True
+except ImportError:
+    SCENARIO_SWEEP_AVAILABLE = False
+
+try:
+    from investment_calculator.monte_carlo import DEFAULT_ASSUMPTIONS, MAX_PATHS, simulate_investment
+    MONTE_CARLO_AVAILABLE = True
+except ImportError:
+    MONTE_CARLO_AVAILABLE = False
+
+try:
+    from investment_calculator.amortization import (
+        build_schedule, iter_schedule_csv, iter_schedule_ndjson, parse_events, schedule_summary
+    )
+    AMORTIZATION_AVAILABLE = True
+except ImportError:
+    AMORTIZATION_AVAILABLE = False
+
+try:
+    from investment_calculator.bulk_analysis import iter_bulk_analysis, read_upload
+    BULK_ANALYSIS_AVAILABLE = True
+except ImportError:
+    BULK_ANALYSIS_AVAILABLE = False
+
+try:
+    from investment_calculator.affordability import PriceListingIndex, max_purchase
+    AFFORDABILITY_AVAILABLE = True
+except ImportError:
+    AFFORDABILITY_AVAILABLE = False
+
+try:
+    from investment_calculator.risk_engine import locality_risk_frame, risk_leaderboard
+    RISK_ENGINE_AVAILABLE = True
+except ImportError:
+    RISK_ENGINE_AVAILABLE = False
+
+try:
+    from investment_calculator.portfolio_optimizer import DEFAULT_APPRECIATION_PERCENT, optimize_portfolio
+    PORTFOLIO_OPTIMIZER_AVAILABLE = True
+except ImportError:
+    PORTFOLIO_OPTIMIZER_AVAILABLE = False
+
 try:
     # Import only the function, not run the script
     import importlib.util
@@ -34,10 +124,17 @@ try:
     roi_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(roi_module)
     predict_roi = roi_module.predict_roi
+    predict_roi_interval = roi_module.predict_roi_interval
     ROI_MODEL_AVAILABLE = True
 except:
     ROI_MODEL_AVAILABLE = False
 
+try:
+    from roi_model.shadow_scoring import ShadowMetricsStore, ShadowScorer, CANDIDATE_MODEL_PATH
+    SHADOW_SCORING_AVAILABLE = True
+except ImportError:
+    SHADOW_SCORING_AVAILABLE = False
+
 try:
     from price_prediction.price_forecaster import PriceForecaster
     from price_prediction.price_prediction_model import PricePredictionModel
@@ -46,7 +143,16 @@ except ImportError:
     PRICE_MODEL_AVAILABLE = False
 
 try:
-    from heatmap.heatmap import generate_heatmap_data
+    from charts.chart_renderers import RENDERERS as CHART_RENDERERS
+    from charts.chart_service import CHART_FORMATS, ChartService, chart_key
+    CHART_SERVICE_AVAILABLE = True
+except ImportError:
+    CHART_SERVICE_AVAILABLE = False
+
+try:
+    from heatmap.heatmap import HEATMAP_PATH, ensure_heatmap, generate_heatmap_data, source_hash
+    from heatmap.heat_tiles import CELL_SHAPES, LOCATIONS_PATH, HeatTileIndex, listing_points
+    from heatmap.heat_query import HEAT_METRICS, HeatQueryIndex, parse_bbox
     HEATMAP_AVAILABLE = True
 except ImportError:
     HEATMAP_AVAILABLE = False
@@ -67,6 +173,11 @@ class PropTechMLService:
         self.tools = {}
         self.data = {}
         self.encoders = {}
+        self.summary_index = None
+        self.listing_samples = None
+        self.similarity_index = None
+        self.comparison_cache = ComparisonCache() if COMPARISON_CACHE_AVAILABLE else None
+        self.comparison_warmer = None
         self.load_models_and_data()
     
     def load_models_and_data(self):
@@ -95,6 +206,13 @@ class PropTechMLService:
                 except:
                     self.models['roi'] = None
                     self.encoders = {}
+                
+                # Candidate model scored in shadow mode, if one has been staged
+                if SHADOW_SCORING_AVAILABLE and os.path.exists(CANDIDATE_MODEL_PATH):
+                    try:
+                        self.models['roi_candidate'] = joblib.load(CANDIDATE_MODEL_PATH)
+                    except:
+                        self.models['roi_candidate'] = None
             
             # Load and preprocess data
             self.load_and_preprocess_data()
@@ -111,28 +229,58 @@ class PropTechMLService:
             rent_df = pd.read_csv("data/Mumbai_House_Rent.csv")
             
             # Use market comparison preprocessing if available
+            # Both preprocessors clean the frames in place, which keeps the listing-level prices and rents
+            price_df = price_df.copy()
+            rent_df = rent_df.copy()
             if MARKET_COMPARISON_AVAILABLE and 'market_comparison' in self.tools:
-                merged = self.tools['market_comparison'].preprocess_data(price_df.copy(), rent_df.copy())
+                merged = self.tools['market_comparison'].preprocess_data(price_df, rent_df)
             else:
                 merged = self.basic_preprocess_data(price_df, rent_df)
             
             # Store processed data
             self.data['merged'] = merged
             self.data['localities'] = sorted(merged['locality'].unique())
+            listing_columns = [c for c in ['locality', 'price_lakh', 'area_sqft', 'rate_sqft', 'bedroom'] if c in price_df.columns]
+            self.data['price_listings'] = price_df.loc[price_df['locality'].isin(self.data['localities']), listing_columns].reset_index(drop=True)
+            self.data['rent_listings'] = rent_df.loc[rent_df['locality'].isin(self.data['localities']), ['locality', 'rent']].reset_index(drop=True)
             
             # Create summary
-            self.data['summary'] = merged.groupby("locality").agg({
-                "price_lakh": ["mean", "min", "max", "std"],
-                "rate_sqft": ["mean", "min", "max"],
-                "rent": ["mean", "min", "max"],
-                "roi": ["mean", "min", "max"]
-            }).reset_index()
+            if SUMMARY_INDEX_AVAILABLE:
+                self.data['summary'] = build_summary_frame(merged)
+            else:
+                self.data['summary'] = merged.groupby("locality").agg({
+                    "price_lakh": ["mean", "min", "max", "std"],
+                    "rate_sqft": ["mean", "min", "max"],
+                    "rent": ["mean", "min", "max"],
+                    "roi": ["mean", "min", "max"]
+                }).reset_index()
+                
+                # Flatten column names
+                self.data['summary'].columns = ['_'.join(col).strip('_') for col in self.data['summary'].columns]
             
-            # Flatten column names
-            self.data['summary'].columns = ['_'.join(col).strip('_') for col in self.data['summary'].columns]
+            # Score every locality's risk once, so requests only look it up
+            if RISK_ENGINE_AVAILABLE:
+                self.data['summary'] = locality_risk_frame(self.data['summary'])
+            
+            # Versioned lookup index over the summary, shared with the comparison tool
+            if SUMMARY_INDEX_AVAILABLE:
+                self.summary_index = LocalitySummaryIndex(self.data['summary'], version=compute_data_version(merged),
+                                                          source=merged)
+            if BOOTSTRAP_AVAILABLE:
+                self.listing_samples = ListingSamples(self.data['price_listings'], self.data['rent_listings'])
+            if SIMILARITY_AVAILABLE and self.summary_index is not None:
+                self.similarity_index = SimilarityIndex.build(self.data['summary'], self.data['price_listings'],
+                                                              version=self.summary_index.version)
+            if 'market_comparison' in self.tools:
+                self.tools['market_comparison'].summary_index = self.summary_index
+                self.tools['market_comparison'].listing_samples = self.listing_samples
             
         except Exception as e:
-            self.data = {'localities': [], 'merged': pd.DataFrame(), 'summary': pd.DataFrame()}
+            self.data = {'localities': [], 'merged': pd.DataFrame(), 'summary': pd.DataFrame(),
+                         'price_listings': pd.DataFrame(), 'rent_listings': pd.DataFrame()}
+            self.summary_index = LocalitySummaryIndex(self.data['summary']) if SUMMARY_INDEX_AVAILABLE else None
+            self.listing_samples = None
+            self.similarity_index = None
     
     def basic_preprocess_data(self, price_df, rent_df):
         """Basic data preprocessing"""
@@ -158,6 +306,15 @@ class PropTechMLService:
 # Initialize the service
 ml_service = PropTechMLService()
 
+# Initialize shadow scoring of the candidate ROI model
+shadow_metrics = ShadowMetricsStore() if SHADOW_SCORING_AVAILABLE else None
+shadow_scorer = None
+if shadow_metrics is not None and ROI_MODEL_AVAILABLE and ml_service.models.get('roi_candidate') is not None:
+    shadow_scorer = ShadowScorer(ml_service.models['roi_candidate'], roi_module.encode_features, shadow_metrics)
+
+# Initialize the background chart renderer (its process pool starts on first use)
+chart_service = ChartService() if CHART_SERVICE_AVAILABLE else None
+
 # Initialize chatbot service
 if CHATBOT_AVAILABLE:
     chatbot_service = create_chatbot_service(ml_service)
@@ -197,13 +354,19 @@ def roi_calculator():
         try:
             locality = request.form["locality"].strip().lower()
             price = float(request.form["price"])
+            mode = request.form.get("mode", "model")
+            
+            request_id = uuid.uuid4().hex
             
             # Use ROI model if available
             if ROI_MODEL_AVAILABLE:
                 try:
                     # Convert price from lakhs to actual amount for the model
                     price_actual = price * 100000
-                    prediction = predict_roi(locality, price_actual)
+                    start = time.perf_counter()
+                    prediction = predict_roi(locality, price_actual, mode=mode)
+                    record_roi_prediction(request_id, locality, price_actual, prediction,
+                                          time.perf_counter() - start, mode)
                 except Exception as e:
                     prediction = ml_service.calculate_roi_fallback(locality, price)
             else:
@@ -215,12 +378,34 @@ def roi_calculator():
             
             historical_data = ml_service.get_locality_stats(locality)
             
+            # Uncertainty band from the forest's per-tree predictions
+            prediction_interval = None
+            if ROI_MODEL_AVAILABLE and roi_module.MODEL_LOADED:
+                try:
+                    prediction_interval = predict_roi_interval(locality, price * 100000)
+                except Exception:
+                    prediction_interval = None
+            
+            # Expected rent of this property (hedonic rent model, by estimated area)
+            expected_rent = None
+            if CASH_FLOW_MODEL_AVAILABLE and historical_data and historical_data['avg_rate_sqft'] > 0:
+                monthly_rent = float(estimate_monthly_rent(
+                    historical_data, price * 100000, price * 100000 / historical_data['avg_rate_sqft']
+                ))
+                expected_rent = {
+                    'monthly': round(monthly_rent, 0),
+                    'gross_yield': round(monthly_rent * 12 / (price * 100000) * 100, 2)
+                }
+            
             result = {
+                'request_id': request_id,
                 'locality': locality.title(),
                 'price': price,
                 'predicted_roi': round(prediction, 2),
+                'prediction_interval': format_prediction_interval(prediction_interval),
+                'expected_rent': expected_rent,
                 'historical_data': historical_data,
-                'prediction_method': 'ML Model' if ROI_MODEL_AVAILABLE else 'Statistical Analysis'
+                'prediction_method': get_prediction_method(mode)
             }
             
             return render_template("roi_result.html", result=result)
@@ -233,6 +418,52 @@ def roi_calculator():
     return render_template("roi_calculator.html", 
                          localities=ml_service.data.get('localities', []))
 
+def record_roi_prediction(request_id, locality, price, prediction, seconds, mode):
+    """Track primary latency and hand the same inputs to the shadow candidate"""
+    if shadow_metrics is None:
+        return
+    
+    shadow_metrics.record_latency(served_roi_mode(mode), seconds)
+    shadow_metrics.record_prediction(request_id, 'primary', prediction)
+    if shadow_scorer is not None:
+        shadow_scorer.submit(request_id, locality, price)
+
+def require_admin_token():
+    """Reject admin requests without the configured token (if one is set)"""
+    token = os.environ.get('ADMIN_TOKEN')
+    return not token or request.headers.get('X-Admin-Token') == token
+
+def served_roi_mode(mode):
+    """ROI predictor that actually answers a mode: 'fast' only when the lookup table is loaded"""
+    if mode == 'interval':
+        return 'interval'
+    return 'fast' if mode == 'fast' and roi_module.LOOKUP_LOADED else 'primary'
+
+def get_prediction_method(mode):
+    """Describe which ROI predictor served a request"""
+    if not ROI_MODEL_AVAILABLE:
+        return 'Statistical Analysis'
+    if served_roi_mode(mode) == 'fast':
+        return 'ML Model (Fast Lookup)'
+    return 'ML Model'
+
+def format_prediction_interval(interval):
+    """Round an ROI interval for display"""
+    if not interval:
+        return None
+    
+    low_q, high_q = min(interval['quantiles']), max(interval['quantiles'])
+    formatted = {
+        'low': round(interval['quantiles'][low_q], 2),
+        'high': round(interval['quantiles'][high_q], 2),
+        'label': f"P{low_q}-P{high_q} across trees"
+    }
+    if 'lower' in interval:
+        formatted['low'] = round(interval['lower'], 2)
+        formatted['high'] = round(interval['upper'], 2)
+        formatted['label'] = f"{interval['coverage'] * 100:.0f}% calibrated interval"
+    return formatted
+
 @app.route("/market-comparison", methods=["GET", "POST"])
 def market_comparison():
     """Market comparison tool"""
@@ -249,19 +480,25 @@ def market_comparison():
                 flash("Please select different localities for comparison", "error")
                 return redirect(url_for('market_comparison'))
             
-            # Use market comparison tool
-            if MARKET_COMPARISON_AVAILABLE and 'market_comparison' in ml_service.tools:
-                comparison_data = ml_service.tools['market_comparison'].compare_localities(
-                    loc1, loc2, ml_service.data['merged']
-                )
-            else:
-                comparison_data = ml_service.compare_localities(loc1, loc2)
+            # Served from the pairwise cache, computed live on a miss
+            comparison_data = ml_service.get_comparison(loc1, loc2)
             
             if not comparison_data:
                 flash("Unable to find sufficient data for selected localities", "error")
                 return redirect(url_for('market_comparison'))
             
-            return render_template("comparison_result.html", comparison=comparison_data)
+            # Further localities add an all-pairs matrix below the two-way view
+            others = [name.lower().strip() for name in request.form.getlist("localities") if name.strip()]
+            matrix = None
+            if others and MULTI_COMPARISON_AVAILABLE and ml_service.summary_index is not None:
+                matrix = compare_many(ml_service.summary_index, [loc1, loc2] + others)
+            
+            comparison_data['similar'] = {
+                'loc1': ml_service.similar_localities(loc1, 3),
+                'loc2': ml_service.similar_localities(loc2, 3)
+            }
+            
+            return render_template("comparison_result.html", comparison=comparison_data, matrix=matrix)
             
         except Exception as e:
             flash(f"Error in comparison: {str(e)}", "error")
@@ -282,6 +519,9 @@ def investment_calculator():
             down_payment_percent = float(request.form.get("down_payment", 20))
             interest_rate = float(request.form.get("interest_rate", 8.5))
             maintenance_percent = float(request.form.get("maintenance", 2))
+            appreciation_percent = float(request.form.get("appreciation", 0))
+            annual_income = request.form.get("annual_income", "").strip()
+            tax_regime = request.form.get("tax_regime", "new")
             
             # Use enhanced investment calculator
             investment_analysis = ml_service.analyze_investment_opportunity_enhanced(
@@ -291,7 +531,10 @@ def investment_calculator():
                 risk_tolerance=risk_tolerance,
                 down_payment_percent=down_payment_percent,
                 interest_rate=interest_rate,
-                maintenance_percent=maintenance_percent
+                maintenance_percent=maintenance_percent,
+                appreciation_percent=appreciation_percent,
+                annual_income=float(annual_income) * 100000 if annual_income else None,
+                tax_regime=tax_regime
             )
             
             if "error" in investment_analysis:
@@ -308,12 +551,374 @@ def investment_calculator():
     return render_template("investment_calculator.html", 
                          localities=ml_service.data.get('localities', []))
 
+@app.route("/api/investment/scenarios", methods=["POST"])
+def api_investment_scenarios():
+    """Evaluate the investment model over a grid of financing scenarios"""
+    try:
+        if not SCENARIO_SWEEP_AVAILABLE:
+            return jsonify({"error": "Scenario sweep not available"}), 503
+        
+        data = request.get_json() or {}
+        locality = str(data.get("locality", "")).strip().lower()
+        locality_stats = ml_service.get_locality_stats(locality)
+        if not locality_stats:
+            return jsonify({"error": "Locality data not available"}), 404
+        
+        annual_income = data.get("annual_income")
+        annual_income = None if annual_income is None else float(annual_income)
+        requested = data.get("metrics", SWEEP_METRICS + (SWEEP_TAX_METRICS if annual_income is not None else []))
+        known_metrics = SWEEP_METRICS + SWEEP_RETURN_METRICS + SWEEP_TAX_METRICS
+        if not isinstance(requested, list) or not all(m in known_metrics for m in requested):
+            return jsonify({"error": f"metrics must be a list of: {', '.join(known_metrics)}"}), 400
+        sweep = sweep_scenarios(
+            locality_stats,
+            budgets=parse_axis(data.get("budget"), locality_stats['avg_price']),
+            horizons=parse_axis(data.get("horizon"), 20),
+            down_payment_percents=parse_axis(data.get("down_payment"), 20),
+            interest_rates=parse_axis(data.get("interest_rate"), 8.5),
+            risk_tolerance=data.get("risk_tolerance", "medium"),
+            include_returns=any(m in SWEEP_RETURN_METRICS for m in requested),
+            appreciation_percent=float(data.get("appreciation_percent", 0)),
+            annual_income=annual_income,
+            tax_regime=data.get("tax_regime", "new")
+        )
+        metrics = [m for m in requested if m in sweep['metrics']]
+        
+        return jsonify({
+            "locality": locality.title(),
+            "axes": {name: values.tolist() for name, values in sweep['axes'].items()},
+            "shape": list(sweep['shape']),
+            "metrics": {name: to_json_matrix(sweep['metrics'][name]) for name in metrics},
+            "summary": summarize_sweep(sweep)
+        })
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid scenario ranges: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/investment/monte-carlo", methods=["POST"])
+def api_investment_monte_carlo():
+    """Monte Carlo percentile bands for cash flow, equity and IRR"""
+    try:
+        if not MONTE_CARLO_AVAILABLE:
+            return jsonify({"error": "Monte Carlo simulation not available"}), 503
+        
+        data = request.get_json() or {}
+        locality = str(data.get("locality", "")).strip().lower()
+        locality_stats = ml_service.get_locality_stats(locality)
+        if not locality_stats:
+            return jsonify({"error": "Locality data not available"}), 404
+        
+        n_paths = int(data.get("paths", 100000))
+        if not 1 <= n_paths <= MAX_PATHS:
+            return jsonify({"error": f"paths must be between 1 and {MAX_PATHS}"}), 400
+        
+        assumptions = {
+            name: float(value) for name, value in (data.get("assumptions") or {}).items()
+            if name in DEFAULT_ASSUMPTIONS
+        }
+        seed = data.get("seed")
+        
+        result = simulate_investment(
+            locality_stats,
+            budget=float(data.get("budget", locality_stats['avg_price'])),
+            horizon=int(data.get("horizon", 20)),
+            down_payment_percent=float(data.get("down_payment", 20)),
+            interest_rate=float(data.get("interest_rate", 8.5)),
+            n_paths=n_paths,
+            seed=None if seed is None else int(seed),
+            assumptions=assumptions
+        )
+        result["locality"] = locality.title()
+        return jsonify(result)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid simulation inputs: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/amortization", methods=["GET", "POST"])
+def api_amortization():
+    """Stream the month-by-month amortization schedule as CSV or NDJSON"""
+    try:
+        if not AMORTIZATION_AVAILABLE:
+            return jsonify({"error": "Amortization schedule not available"}), 503
+        
+        params = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+        tenure_months = int(params.get("tenure_months") or int(params.get("tenure_years", 20)) * 12)
+        schedule = build_schedule(
+            loan_amount=float(params["loan_amount"]),
+            interest_rate=float(params.get("interest_rate", 8.5)),
+            tenure_months=tenure_months,
+            prepayments=parse_events(params.get("prepayments"), "amount"),
+            rate_resets=parse_events(params.get("rate_resets"), "rate"),
+            prepayment_mode=params.get("prepayment_mode", "reduce_tenure")
+        )
+        
+        output_format = params.get("format", "csv")
+        if output_format == "summary":
+            return jsonify(schedule_summary(schedule, tenure_months))
+        if output_format == "ndjson":
+            return Response(stream_with_context(iter_schedule_ndjson(schedule)), mimetype="application/x-ndjson")
+        if output_format != "csv":
+            return jsonify({"error": "format must be csv, ndjson or summary"}), 400
+        
+        return Response(
+            stream_with_context(iter_schedule_csv(schedule)),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=amortization_schedule.csv"}
+        )
+    except KeyError as e:
+        return jsonify({"error": f"Missing parameter: {e.args[0]}"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid loan inputs: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/portfolio/optimize", methods=["POST"])
+def api_portfolio_optimize():
+    """Optimal multi-locality portfolio for a budget, with its efficient frontier"""
+    try:
+        if not PORTFOLIO_OPTIMIZER_AVAILABLE:
+            return jsonify({"error": "Portfolio optimizer not available"}), 503
+        if ml_service.data.get('summary') is None or ml_service.data['summary'].empty:
+            return jsonify({"error": "Locality data not available"}), 503
+        
+        data = request.get_json() or {}
+        min_cash_flow = data.get("min_monthly_cash_flow")
+        risk_ceiling = data.get("risk_ceiling")
+        
+        result = optimize_portfolio(
+            ml_service.data['summary'],
+            budget_lakhs=float(data["budget"]),
+            max_per_locality=int(data.get("max_per_locality", 2)),
+            max_locality_share=float(data.get("max_locality_share", 0.5)),
+            min_monthly_cash_flow=None if min_cash_flow is None else float(min_cash_flow),
+            risk_ceiling=None if risk_ceiling is None else float(risk_ceiling),
+            down_payment_percent=float(data.get("down_payment", 20)),
+            interest_rate=float(data.get("interest_rate", 8.5)),
+            horizon=int(data.get("horizon", 20)),
+            appreciation_percent=float(data.get("appreciation_percent", DEFAULT_APPRECIATION_PERCENT)),
+            frontier_points=int(data.get("frontier_points", 10))
+        )
+        
+        if "error" in result:
+            return jsonify(result), 422
+        return jsonify(result)
+    except KeyError as e:
+        return jsonify({"error": f"Missing parameter: {e.args[0]}"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid portfolio inputs: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/investment/bulk", methods=["POST"])
+def api_investment_bulk():
+    """Analyse a CSV of candidate properties, streaming NDJSON results as they finish"""
+    try:
+        if not BULK_ANALYSIS_AVAILABLE:
+            return jsonify({"error": "Bulk analysis not available"}), 503
+        
+        upload = request.files.get("file")
+        if upload is None and not request.data:
+            return jsonify({"error": "Upload a CSV as the 'file' field or the request body"}), 400
+        
+        frame = read_upload(upload.stream if upload is not None else io.BytesIO(request.data))
+        
+        # Resolve locality stats once here; workers only get the stats they need
+        stats_by_locality = {
+            locality: ml_service.get_locality_stats(locality) for locality in frame['locality'].unique()
+        }
+        
+        return Response(
+            stream_with_context(iter_bulk_analysis(frame, stats_by_locality)),
+            mimetype="application/x-ndjson"
+        )
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return jsonify({"error": f"Invalid CSV: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/affordability", methods=["GET", "POST"])
+def api_affordability():
+    """Maximum loan and price for an income, and the localities (and share of listings) within reach"""
+    try:
+        if not AFFORDABILITY_AVAILABLE:
+            return jsonify({"error": "Affordability solver not available"}), 503
+        price_index = ml_service.get_price_listing_index()
+        if price_index is None:
+            return jsonify({"error": "Listing data not available"}), 503
+        
+        params = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+        monthly_income = float(params["monthly_income"])
+        down_payment = params.get("down_payment")
+        limit = params.get("limit")
+        if monthly_income <= 0:
+            return jsonify({"error": "Monthly income must be positive"}), 400
+        
+        limits = max_purchase(
+            monthly_income,
+            existing_emis=float(params.get("existing_emis", 0)),
+            down_payment=None if down_payment in (None, "") else float(down_payment),
+            interest_rate=float(params.get("interest_rate", 8.5)),
+            tenure_years=int(params.get("tenure_years", 20))
+        )
+        max_price_lakhs = float(limits['max_price']) / 100000
+        
+        summary = ml_service.data['summary']
+        avg_roi = dict(zip(summary['locality'], summary['roi_mean'])) if not summary.empty else {}
+        localities = price_index.rank_affordable(max_price_lakhs, avg_roi, limit=int(limit) if limit else None)
+        
+        return jsonify({
+            **{key: round(float(value), 2) for key, value in limits.items()},
+            'max_price_lakhs': round(max_price_lakhs, 2),
+            'feasible_localities': len(localities),
+            'localities': localities
+        })
+    except KeyError as e:
+        return jsonify({"error": f"Missing parameter: {e.args[0]}"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid affordability inputs: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/risk")
+def api_risk():
+    """Locality risk leaderboard (lowest risk first unless order=riskiest)"""
+    summary = ml_service.data.get('summary')
+    if summary is None or 'risk_score' not in summary:
+        return jsonify({"error": "Risk scores not available"}), 503
+    
+    order = request.args.get("order", "safest")
+    if order not in ("safest", "riskiest"):
+        return jsonify({"error": "order must be safest or riskiest"}), 400
+    
+    return jsonify({
+        "order": order,
+        "localities": risk_leaderboard(summary, riskiest_first=order == "riskiest",
+                                       limit=request.args.get("limit", type=int))
+    })
+
+@app.route("/api/compare", methods=["GET", "POST"])
+def api_compare():
+    """All-pairs comparison of several localities (all of them when none are given)"""
+    if not MULTI_COMPARISON_AVAILABLE or ml_service.summary_index is None:
+        return jsonify({"error": "Multi-locality comparison not available"}), 503
+    if request.method == "POST":
+        localities = (request.get_json(silent=True) or {}).get("localities") or request.form.getlist("localities")
+    else:
+        localities = [name for value in request.args.getlist("localities") for name in value.split(",")]
+    localities = [str(name).lower().strip() for name in localities if str(name).strip()]
+    if not localities or localities == ["all"]:
+        localities = None
+    
+    comparison = compare_many(ml_service.summary_index, localities)
+    if comparison is None:
+        return jsonify({"error": "At least two known localities are required"}), 400
+    return jsonify(comparison)
+
+CHART_FORECAST_PATHS = 20000  # Monte Carlo paths behind a forecast chart
+CHART_FORECAST_SEED = 42      # fixed so a cached forecast chart matches a fresh one
+
+def build_chart_spec(chart_type, inputs):
+    """Renderer spec for a chart from normalised request inputs"""
+    if chart_type == "comparison":
+        comparison = compare_many(ml_service.summary_index, inputs["localities"])
+        if comparison is None:
+            raise ValueError("At least two known localities are required")
+        keys = [('Price (₹L)', 'avg_price'), ('Rent (₹)', 'avg_rent'), ('ROI (%)', 'avg_roi'),
+                ('Rate/sqft (₹)', 'avg_rate_sqft')]
+        return {
+            'title': "Market Comparison: " + " vs ".join(comparison['localities']),
+            'labels': [label for label, _ in keys],
+            'series': {name: [stats[key] for _, key in keys]
+                       for name, stats in zip(comparison['localities'], comparison['stats'])}
+        }
+    
+    stats = ml_service.get_locality_stats(inputs["locality"])
+    if not stats:
+        raise KeyError(inputs["locality"])
+    
+    if chart_type == "distribution":
+        listings = ml_service.data.get('price_listings', pd.DataFrame())
+        column, label = {'price': ('price_lakh', 'Price (₹ lakhs)'), 'rate': ('rate_sqft', 'Rate (₹/sqft)')}[inputs["metric"]]
+        values = listings.loc[listings['locality'] == stats['locality'], column].dropna()
+        return {'title': f"{stats['locality'].title()}: {label} of listings", 'xlabel': label,
+                'values': values.round(2).tolist()}
+    
+    if not MONTE_CARLO_AVAILABLE:
+        raise ValueError("Monte Carlo simulation not available")
+    result = simulate_investment(stats, budget=inputs["budget"], horizon=inputs["horizon"],
+                                 n_paths=CHART_FORECAST_PATHS, seed=CHART_FORECAST_SEED)
+    equity = result['equity_lakhs']
+    return {
+        'title': f"{stats['locality'].title()}: projected equity (₹{inputs['budget']}L, {inputs['horizon']} years)",
+        'ylabel': 'Equity (₹ lakhs)',
+        'x': result['years'],
+        'median': equity['p50'],
+        'bands': [('5th-95th percentile', equity['p5'], equity['p95']),
+                  ('25th-75th percentile', equity['p25'], equity['p75'])]
+    }
+
+@app.route("/api/charts/<chart_type>.<fmt>")
+def api_chart(chart_type, fmt):
+    """Server-rendered comparison, distribution or forecast chart (PNG or SVG)"""
+    if chart_service is None or ml_service.summary_index is None:
+        return jsonify({"error": "Chart rendering not available"}), 503
+    if chart_type == "comparison" and not MULTI_COMPARISON_AVAILABLE:
+        return jsonify({"error": "Multi-locality comparison not available"}), 503
+    if chart_type not in CHART_RENDERERS:
+        return jsonify({"error": f"chart type must be one of {', '.join(CHART_RENDERERS)}"}), 404
+    if fmt not in CHART_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(CHART_FORMATS)}"}), 400
+    
+    try:
+        if chart_type == "comparison":
+            localities = [name.lower().strip() for value in request.args.getlist("localities")
+                          for name in value.split(",") if name.strip()]
+            inputs = {"localities": [ml_service.summary_index.resolve(name) or name for name in localities]}
+        else:
+            locality = request.args["locality"].lower().strip()
+            inputs = {"locality": ml_service.summary_index.resolve(locality) or locality}
+            if chart_type == "distribution":
+                inputs["metric"] = request.args.get("metric", "price")
+                if inputs["metric"] not in ("price", "rate"):
+                    return jsonify({"error": "metric must be price or rate"}), 400
+            elif chart_type == "forecast":
+                inputs["budget"] = float(request.args.get("budget", 100))
+                inputs["horizon"] = int(request.args.get("horizon", 20))
+                if inputs["budget"] <= 0 or not 1 <= inputs["horizon"] <= 40:
+                    return jsonify({"error": "budget must be positive and horizon between 1 and 40 years"}), 400
+        
+        data_version = ml_service.summary_index.version
+        key = chart_key(chart_type, inputs, fmt, data_version)
+        if key in request.if_none_match:
+            return Response(status=304, headers={"ETag": f'"{key}"'})
+        
+        key, image = chart_service.render(chart_type, inputs, lambda: build_chart_spec(chart_type, inputs),
+                                          fmt=fmt, data_version=data_version)
+    except KeyError as e:
+        if e.args and e.args[0] == "locality":
+            return jsonify({"error": f"Missing parameter: {e.args[0]}"}), 400
+        return jsonify({"error": "Locality data not available"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except TimeoutError:
+        return jsonify({"error": "Chart rendering timed out"}), 504
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+    return Response(image, mimetype=CHART_FORMATS[fmt],
+                    headers={"ETag": f'"{key}"', "Cache-Control": "public, max-age=3600"})
+
 @app.route("/roi-heatmap")
 def roi_heatmap():
     """ROI Heatmap"""
     try:
         if HEATMAP_AVAILABLE:
-            heatmap_data = generate_heatmap_data(ml_service.data['merged'])
+            heatmap_data = generate_heatmap_data(
+                ml_service.data['merged'],
+                data_version=ml_service.summary_index.version if ml_service.summary_index is not None else None
+            )
         else:
             heatmap_data = ml_service.generate_roi_heatmap_data()
         
@@ -321,11 +926,101 @@ def roi_heatmap():
             flash("No data available for heatmap generation", "error")
             return redirect(url_for('home'))
         
-        return render_template("roi_heatmap.html", heatmap_data=heatmap_data)
+        return render_template("roi_heatmap.html", heatmap_data=heatmap_data, map_url=folium_heatmap_url())
     except Exception as e:
         flash(f"Error generating heatmap: {str(e)}", "error")
         return redirect(url_for('home'))
 
+HEATMAP_MAX_AGE = 31536000  # one year; versioned map URLs never change content
+
+folium_heatmap_meta = None  # set at startup by refresh_folium_heatmap()
+
+def refresh_folium_heatmap():
+    """Bring the folium map up to date (regenerated only when its sources changed); startup only"""
+    global folium_heatmap_meta
+    if not HEATMAP_AVAILABLE:
+        return None
+    try:
+        folium_heatmap_meta = ensure_heatmap()
+    except Exception:
+        folium_heatmap_meta = None
+    return folium_heatmap_meta
+
+def current_folium_heatmap():
+    """Metadata of the folium map as of startup, or None"""
+    return folium_heatmap_meta
+
+def folium_heatmap_url():
+    meta = current_folium_heatmap()
+    return url_for('roi_heatmap_map_version', etag=meta['etag']) if meta else None
+
+def send_folium_heatmap(meta, cache_control):
+    response = send_file(HEATMAP_PATH, mimetype="text/html", etag=meta['etag'], conditional=True)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+@app.route("/roi-heatmap/map")
+def roi_heatmap_map():
+    """Folium listing map; revalidated on every use via its ETag"""
+    meta = current_folium_heatmap()
+    if meta is None:
+        return jsonify({"error": "Heatmap not available"}), 503
+    return send_folium_heatmap(meta, "no-cache")
+
+@app.route("/roi-heatmap/map/<etag>")
+def roi_heatmap_map_version(etag):
+    """Folium listing map at a content-addressed URL, cacheable for a year"""
+    meta = current_folium_heatmap()
+    if meta is None:
+        return jsonify({"error": "Heatmap not available"}), 503
+    if etag != meta['etag']:
+        return redirect(url_for('roi_heatmap_map_version', etag=meta['etag']))
+    return send_folium_heatmap(meta, f"public, max-age={HEATMAP_MAX_AGE}, immutable")
+
+@app.route("/api/heat-tiles/<int:z>/<int:x>/<int:y>")
+def api_heat_tiles(z, x, y):
+    """Aggregated listing cells (square or hex) of one web-mercator map tile"""
+    index = ml_service.get_heat_tile_index()
+    if index is None:
+        return jsonify({"error": "Heat tiles not available"}), 503
+    
+    shape = request.args.get("shape", "square")
+    if shape not in CELL_SHAPES:
+        return jsonify({"error": f"shape must be one of {', '.join(CELL_SHAPES)}"}), 400
+    if z not in index.zooms:
+        return jsonify({"error": f"zoom must be between {index.zooms[0]} and {index.zooms[-1]}"}), 400
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": "tile outside the zoom level"}), 400
+    
+    etag = f"{index.version[:16]}-{shape}-{z}-{x}-{y}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    
+    response = jsonify(index.tile(z, x, y, shape))
+    response.headers["ETag"] = f'"{etag}"'
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
+@app.route("/api/heatmap")
+def api_heatmap():
+    """Listing heat data of one metric inside the viewport (bbox=west,south,east,north)"""
+    index = ml_service.get_heat_query_index()
+    if index is None:
+        return jsonify({"error": "Heat data not available"}), 503
+    
+    metric = request.args.get("metric", "roi")
+    if metric not in HEAT_METRICS:
+        return jsonify({"error": f"metric must be one of {', '.join(HEAT_METRICS)}"}), 400
+    bbox = request.args.get("bbox")
+    try:
+        bbox = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    response = jsonify(index.query(metric, bbox))
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
 # Chatbot Routes
 @app.route("/chat")
 def chat_interface():
@@ -373,6 +1068,68 @@ def api_locality_stats(locality):
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route("/api/similar/<locality>")
+def api_similar(locality):
+    """Localities most similar to one locality (cosine similarity of market profiles)"""
+    if ml_service.similarity_index is None:
+        return jsonify({"error": "Similarity index not available"}), 503
+    
+    name = ml_service.summary_index.resolve(locality)
+    if name is None:
+        return jsonify({"error": "Locality data not available"}), 404
+    
+    k = request.args.get("k", type=int)
+    if k is not None and k < 1:
+        return jsonify({"error": "k must be at least 1"}), 400
+    return jsonify({
+        "locality": name.title(),
+        "data_version": ml_service.similarity_index.version,
+        "similar": ml_service.similar_localities(name, k)
+    })
+
+@app.route("/api/roi-predict")
+def api_roi_predict():
+    """API endpoint for ROI predictions (mode: model, fast or interval)"""
+    try:
+        if not ROI_MODEL_AVAILABLE:
+            return jsonify({"error": "ROI model not available"}), 503
+        
+        locality = request.args.get("locality", "").strip().lower()
+        price = float(request.args["price"]) * 100000
+        mode = request.args.get("mode", "model")
+        request_id = uuid.uuid4().hex
+        
+        if mode == "interval":
+            quantiles = tuple(float(q) for q in request.args.get("quantiles", "5,95").split(","))
+            coverage = float(request.args.get("coverage", 0.9))
+            if not 0 < coverage < 1:
+                return jsonify({"error": "coverage must be strictly between 0 and 1"}), 400
+            start = time.perf_counter()
+            interval = predict_roi_interval(
+                locality, price,
+                quantiles=quantiles,
+                calibrated=request.args.get("calibrated", "true").lower() == "true",
+                coverage=coverage
+            )
+            record_roi_prediction(request_id, locality, price, interval['mean'], time.perf_counter() - start, mode)
+            interval['quantiles'] = {f"p{q:g}": v for q, v in interval['quantiles'].items()}
+            return jsonify({"request_id": request_id, "locality": locality, "mode": mode, **interval})
+        
+        start = time.perf_counter()
+        prediction = predict_roi(locality, price, mode=mode)
+        record_roi_prediction(request_id, locality, price, prediction, time.perf_counter() - start, mode)
+        return jsonify({
+            "request_id": request_id,
+            "locality": locality,
+            "mode": mode,
+            "served_by": served_roi_mode(mode),
+            "predicted_roi": prediction
+        })
+    except (KeyError, ValueError):
+        return jsonify({"error": "locality and numeric price (lakhs) are required"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route("/api/localities")
 def api_localities():
     """API endpoint to get all available localities"""
@@ -382,6 +1139,38 @@ def api_localities():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+# Admin Endpoints
+@app.route("/api/admin/shadow-metrics")
+def api_shadow_metrics():
+    """Shadow scoring metrics for the primary and candidate ROI models"""
+    if not require_admin_token():
+        return jsonify({"error": "Unauthorized"}), 401
+    if shadow_metrics is None:
+        return jsonify({"error": "Shadow scoring not available"}), 503
+    
+    return jsonify({
+        "candidate_loaded": shadow_scorer is not None,
+        "metrics": shadow_metrics.snapshot(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route("/api/admin/shadow-ground-truth", methods=["POST"])
+def api_shadow_ground_truth():
+    """Record the observed ROI for an earlier prediction request"""
+    if not require_admin_token():
+        return jsonify({"error": "Unauthorized"}), 401
+    if shadow_metrics is None:
+        return jsonify({"error": "Shadow scoring not available"}), 503
+    
+    try:
+        data = request.get_json() or {}
+        matched = shadow_metrics.record_ground_truth(data['request_id'], float(data['actual_roi']))
+        if not matched:
+            return jsonify({"error": "Unknown or expired request_id"}), 404
+        return jsonify({"status": "recorded"})
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "request_id and numeric actual_roi are required"}), 400
+
 # Enhanced Helper Methods
 def calculate_roi_fallback(self, locality, price):
     """Fallback ROI calculation"""
@@ -402,6 +1191,9 @@ def calculate_roi_fallback(self, locality, price):
 
 def get_locality_stats(self, locality):
     """Get locality statistics"""
+    if self.summary_index is not None:
+        return self.summary_index.stats(locality) if len(self.summary_index) else None
+    
     if 'summary' not in self.data or self.data['summary'].empty:
         return None
     
@@ -418,7 +1210,8 @@ def get_locality_stats(self, locality):
         return None
     
     stats = locality_data.iloc[0].to_dict()
-    return {
+    locality_stats = {
+        'locality': stats['locality'],
         'avg_price': round(stats.get('price_lakh_mean', 0), 2),
         'price_range': {
             'min': round(stats.get('price_lakh_min', 0), 2),
@@ -432,6 +1225,11 @@ def get_locality_stats(self, locality):
         },
         'avg_rate_sqft': round(stats.get('rate_sqft_mean', 0), 2)
     }
+    if 'risk_score' in stats:
+        locality_stats['market_risk'] = float(stats['market_risk'])
+        locality_stats['risk_score'] = float(stats['risk_score'])
+        locality_stats['risk_level'] = stats['risk_level']
+    return locality_stats
 
 def compare_localities(self, loc1, loc2):
     """Compare localities"""
@@ -441,7 +1239,7 @@ def compare_localities(self, loc1, loc2):
     if not loc1_stats or not loc2_stats:
         return None
     
-    return {
+    comparison = {
         'loc1': {'name': loc1.title(), 'stats': loc1_stats},
         'loc2': {'name': loc2.title(), 'stats': loc2_stats},
         'comparison': {
@@ -469,15 +1267,35 @@ def compare_localities(self, loc1, loc2):
             f"{loc1.title() if loc1_stats['avg_rent'] > loc2_stats['avg_rent'] else loc2.title()} has higher rental income potential"
         ]
     }
+    if self.listing_samples is not None:
+        annotate_comparison(comparison, bootstrap_comparison(self.listing_samples, loc1_stats['locality'], loc2_stats['locality']))
+    return comparison
 
 def analyze_investment_opportunity_enhanced(self, locality, budget, horizon, risk_tolerance, 
-                                          down_payment_percent=20, interest_rate=8.5, maintenance_percent=2):
+                                          down_payment_percent=20, interest_rate=8.5, maintenance_percent=2,
+                                          appreciation_percent=0.0, annual_income=None, tax_regime='new'):
     """Enhanced investment analysis with realistic maintenance costs"""
     
     locality_stats = self.get_locality_stats(locality)
     if not locality_stats:
         return {"error": "Locality data not available"}
     
+    # Built-in model without the cash-flow module (no returns, tax or sensitivity)
+    if not CASH_FLOW_MODEL_AVAILABLE:
+        return self.analyze_investment_fallback(locality, locality_stats, budget, horizon, risk_tolerance,
+                                                down_payment_percent, interest_rate)
+    
+    # Maintenance is modelled from fixed realistic rates, so maintenance_percent is not used
+    return analyze_investment(
+        locality, locality_stats, budget, horizon, risk_tolerance,
+        down_payment_percent=down_payment_percent, interest_rate=interest_rate,
+        appreciation_percent=appreciation_percent, annual_income=annual_income, tax_regime=tax_regime
+    )
+
+def analyze_investment_fallback(self, locality, locality_stats, budget, horizon, risk_tolerance,
+                                down_payment_percent=20, interest_rate=8.5):
+    """Single-scenario investment analysis used when the cash-flow model is unavailable"""
+    
     # Convert budget from lakhs to actual amount
     property_price = budget * 100000
     
@@ -600,6 +1418,8 @@ def analyze_investment_opportunity_enhanced(self, locality, budget, horizon, ris
 
 def calculate_realistic_risk_score(self, stats, monthly_cash_flow, roi, risk_tolerance, property_price):
     """More realistic risk calculation for real estate"""
+    if CASH_FLOW_MODEL_AVAILABLE:
+        return float(realistic_risk_score(stats, monthly_cash_flow, roi, risk_tolerance, property_price))
     
     base_risk = 25  # Start with 25% base risk for real estate
     
@@ -658,6 +1478,8 @@ def calculate_realistic_risk_score(self, stats, monthly_cash_flow, roi, risk_tol
 
 def get_realistic_investment_recommendation(self, roi, monthly_cash_flow, risk_score):
     """Realistic investment recommendations for real estate"""
+    if CASH_FLOW_MODEL_AVAILABLE:
+        return str(investment_recommendation(roi, monthly_cash_flow, risk_score))
     
     if roi >= 12 and monthly_cash_flow >= -2000 and risk_score < 35:
         return "Highly Recommended"
@@ -686,14 +1508,124 @@ def generate_roi_heatmap_data(self):
     
     return sorted(heatmap_data, key=lambda x: x['avg_roi'], reverse=True)
 
+def get_price_listing_index(self):
+    """Listing-level price index for affordability queries, built on first use"""
+    if not AFFORDABILITY_AVAILABLE:
+        return None
+    if getattr(self, '_price_listing_index', None) is None:
+        listings = self.data.get('price_listings')
+        if listings is None or listings.empty:
+            return None
+        self._price_listing_index = PriceListingIndex(listings)
+    return self._price_listing_index
+
+def similar_localities(self, locality, k=None):
+    """Localities with the most similar market profile, with their headline stats"""
+    if self.similarity_index is None:
+        return []
+    name = self.summary_index.resolve(locality)
+    similar = []
+    for entry in self.similarity_index.similar(name, k):
+        stats = self.summary_index.stats(entry['locality'])
+        similar.append({
+            **entry,
+            'locality': entry['locality'].title(),
+            'avg_price': stats['avg_price'],
+            'avg_rent': stats['avg_rent'],
+            'avg_roi': stats['avg_roi']
+        })
+    return similar
+
+def compute_comparison(self, loc1, loc2):
+    """Two-way comparison payload, from the market comparison tool when available"""
+    if MARKET_COMPARISON_AVAILABLE and 'market_comparison' in self.tools:
+        return self.tools['market_comparison'].compare_localities(loc1, loc2, self.data['merged'])
+    return self.compare_localities(loc1, loc2)
+
+def get_comparison(self, loc1, loc2):
+    """Two-way comparison served from the pairwise cache of the current data version"""
+    if self.summary_index is None or self.comparison_cache is None:
+        return self.compute_comparison(loc1, loc2)
+    name1, name2 = self.summary_index.resolve(loc1), self.summary_index.resolve(loc2)
+    if name1 is None or name2 is None:
+        return self.compute_comparison(loc1, loc2)
+    
+    version = self.summary_index.version
+    comparison = self.comparison_cache.get(name1, name2, version)
+    if comparison is None:
+        comparison = self.compute_comparison(name1, name2)
+        if comparison:
+            self.comparison_cache.put(name1, name2, version, comparison)
+            comparison = self.comparison_cache.get(name1, name2, version)
+    return comparison
+
+def start_comparison_warmer(self):
+    """Precompute every locality pair in a background thread (replacing a running warmer)"""
+    if self.comparison_warmer is not None:
+        self.comparison_warmer.stop()
+    if self.comparison_cache is None or self.summary_index is None or len(self.summary_index) < 2:
+        return None
+    self.comparison_warmer = ComparisonWarmer(self.comparison_cache, self.compute_comparison,
+                                              self.summary_index.names, self.summary_index.version)
+    self.comparison_warmer.start()
+    return self.comparison_warmer
+
+def get_heat_listings(self):
+    """Geocoded listings behind the heat tiles and heat queries, and their version; read on first use"""
+    if getattr(self, '_heat_listings', None) is None:
+        if not HEATMAP_AVAILABLE:
+            return None, None
+        try:
+            sources = [LOCATIONS_PATH] + (["rent_model/rent_coefficients.json"]
+                                          if os.path.exists("rent_model/rent_coefficients.json") else [])
+            self._heat_listings = (listing_points(LOCATIONS_PATH), source_hash(sources))
+        except Exception:
+            return None, None
+    return self._heat_listings
+
+def get_heat_tile_index(self):
+    """Per-zoom listing cells for map tiles, built on first use"""
+    if getattr(self, '_heat_tile_index', None) is None:
+        points, version = self.get_heat_listings()
+        if points is None:
+            return None
+        self._heat_tile_index = HeatTileIndex(points, version=version)
+    return self._heat_tile_index
+
+def get_heat_query_index(self):
+    """Grid index of the listings for bounding-box heat queries, built on first use"""
+    if getattr(self, '_heat_query_index', None) is None:
+        points, version = self.get_heat_listings()
+        if points is None:
+            return None
+        self._heat_query_index = HeatQueryIndex(points, version=version)
+    return self._heat_query_index
+
 # Add methods to service
 PropTechMLService.calculate_roi_fallback = calculate_roi_fallback
 PropTechMLService.get_locality_stats = get_locality_stats
 PropTechMLService.compare_localities = compare_localities
 PropTechMLService.analyze_investment_opportunity_enhanced = analyze_investment_opportunity_enhanced
+PropTechMLService.analyze_investment_fallback = analyze_investment_fallback
 PropTechMLService.calculate_realistic_risk_score = calculate_realistic_risk_score
 PropTechMLService.get_realistic_investment_recommendation = get_realistic_investment_recommendation
 PropTechMLService.generate_roi_heatmap_data = generate_roi_heatmap_data
+PropTechMLService.get_price_listing_index = get_price_listing_index
+PropTechMLService.similar_localities = similar_localities
+PropTechMLService.compute_comparison = compute_comparison
+PropTechMLService.get_comparison = get_comparison
+PropTechMLService.start_comparison_warmer = start_comparison_warmer
+PropTechMLService.get_heat_listings = get_heat_listings
+PropTechMLService.get_heat_tile_index = get_heat_tile_index
+PropTechMLService.get_heat_query_index = get_heat_query_index
+
+# Bring the folium map up to date at startup, so requests only serve the file
+refresh_folium_heatmap()
+
+# Precompute all pairwise comparisons off the request path. Opt-in (COMPARISON_WARMER=1): every
+# server worker imports this module, and each would otherwise compute every pair for its own cache
+if os.environ.get('COMPARISON_WARMER', '0') == '1':
+    ml_service.start_comparison_warmer()
 
 # Error handlers
 @app.errorhandler(404)
@@ -714,6 +1646,7 @@ def health_check():
             "roi_model": ROI_MODEL_AVAILABLE,
             "market_comparison": MARKET_COMPARISON_AVAILABLE,
             "investment_calculator": INVESTMENT_CALCULATOR_AVAILABLE,
+            "portfolio_optimizer": PORTFOLIO_OPTIMIZER_AVAILABLE,
             "price_prediction": PRICE_MODEL_AVAILABLE,
             "heatmap": HEATMAP_AVAILABLE,
             "chatbot": CHATBOT_AVAILABLE
@@ -721,7 +1654,9 @@ def health_check():
         "data_loaded": {
             "localities_count": len(ml_service.data.get('localities', [])),
             "merged_data_rows": len(ml_service.data.get('merged', [])),
-            "summary_data_rows": len(ml_service.data.get('summary', []))
+            "summary_data_rows": len(ml_service.data.get('summary', [])),
+            "data_version": ml_service.summary_index.version if ml_service.summary_index is not None else None,
+            "cached_comparisons": len(ml_service.comparison_cache) if ml_service.comparison_cache is not None else 0
         },
         "services": {
             "database_connection": "active",
@@ -742,8 +1677,10 @@ def system_info():
             "roi_calculator": ROI_MODEL_AVAILABLE,
             "market_comparison": MARKET_COMPARISON_AVAILABLE,
             "investment_calculator": INVESTMENT_CALCULATOR_AVAILABLE,
+            "portfolio_optimizer": PORTFOLIO_OPTIMIZER_AVAILABLE,
             "price_prediction": PRICE_MODEL_AVAILABLE,
             "heatmap_generator": HEATMAP_AVAILABLE,
+            "chart_service": CHART_SERVICE_AVAILABLE,
             "chatbot_assistant": CHATBOT_AVAILABLE
         },
         "data_statistics": {
@@ -757,9 +1694,25 @@ def system_info():
             "/investment-calculator", 
             "/market-comparison",
             "/roi-heatmap",
+            "/roi-heatmap/map",
+            "/api/heat-tiles/<z>/<x>/<y>",
+            "/api/heatmap",
             "/chat",
             "/api/localities",
             "/api/locality-stats/<locality>",
+            "/api/similar/<locality>",
+            "/api/roi-predict",
+            "/api/investment/scenarios",
+            "/api/investment/monte-carlo",
+            "/api/investment/bulk",
+            "/api/amortization",
+            "/api/affordability",
+            "/api/risk",
+            "/api/compare",
+            "/api/charts/<chart_type>.<fmt>",
+            "/api/portfolio/optimize",
+            "/api/admin/shadow-metrics",
+            "/api/admin/shadow-ground-truth",
             "/api/chat",
             "/health",
             "/api/system-info"
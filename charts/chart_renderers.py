@@ -0,0 +1,101 @@
+import io
+
+# Runs inside the chart pool's worker processes. matplotlib is imported on
+# first use there, so the web process never loads it.
+
+CHART_SIZE = (10, 5.5)  # inches
+CHART_DPI = 110
+SERIES_COLORS = ['#3498db', '#17a2b8', '#28a745', '#ffc107', '#dc3545', '#6f42c1', '#fd7e14', '#20c997']
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _save(fig, fmt):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=CHART_DPI, bbox_inches="tight")
+    fig.clf()
+    _pyplot().close(fig)
+    return buffer.getvalue()
+
+
+def render_comparison(spec, fmt):
+    """
+    Grouped bars, one panel per metric
+
+    spec: {'title', 'labels': metric names, 'series': {locality: values aligned with labels}}
+    """
+    plt = _pyplot()
+    labels = spec['labels']
+    series = spec['series']
+    fig, axes = plt.subplots(1, len(labels), figsize=CHART_SIZE, squeeze=False)
+    names = list(series)
+    for position, (ax, label) in enumerate(zip(axes[0], labels)):
+        values = [series[name][position] for name in names]
+        ax.bar(range(len(names)), values, color=[SERIES_COLORS[i % len(SERIES_COLORS)] for i in range(len(names))])
+        ax.set_title(label, fontsize=10)
+        ax.set_xticks(range(len(names)))
+        ax.set_xticklabels(names, rotation=45, ha="right", fontsize=8)
+        ax.tick_params(axis="y", labelsize=8)
+    fig.suptitle(spec.get('title', ''))
+    fig.tight_layout()
+    return _save(fig, fmt)
+
+
+def render_distribution(spec, fmt):
+    """
+    Histogram with mean and median markers
+
+    spec: {'title', 'xlabel', 'values': list of numbers, 'bins' (optional)}
+    """
+    plt = _pyplot()
+    values = spec['values']
+    fig, ax = plt.subplots(figsize=CHART_SIZE)
+    ax.hist(values, bins=spec.get('bins', 30), color=SERIES_COLORS[0], alpha=0.8, edgecolor="white")
+    if values:
+        ordered = sorted(values)
+        mean = sum(values) / len(values)
+        median = (ordered[(len(ordered) - 1) // 2] + ordered[len(ordered) // 2]) / 2
+        ax.axvline(mean, color=SERIES_COLORS[4], linestyle="--", label=f"Mean {mean:,.1f}")
+        ax.axvline(median, color=SERIES_COLORS[2], linestyle=":", label=f"Median {median:,.1f}")
+        ax.legend()
+    ax.set_title(spec.get('title', ''))
+    ax.set_xlabel(spec.get('xlabel', ''))
+    ax.set_ylabel("Listings")
+    return _save(fig, fmt)
+
+
+def render_forecast(spec, fmt):
+    """
+    Median line with percentile fan
+
+    spec: {'title', 'ylabel', 'x': periods, 'median': values,
+           'bands': [(label, lower values, upper values)], widest first}
+    """
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=CHART_SIZE)
+    for position, (label, lower, upper) in enumerate(spec.get('bands', [])):
+        ax.fill_between(spec['x'], lower, upper, color=SERIES_COLORS[0], alpha=0.15 + 0.15 * position, label=label)
+    ax.plot(spec['x'], spec['median'], color=SERIES_COLORS[0], linewidth=2, label="Median")
+    ax.set_title(spec.get('title', ''))
+    ax.set_xlabel(spec.get('xlabel', 'Year'))
+    ax.set_ylabel(spec.get('ylabel', ''))
+    ax.grid(alpha=0.3)
+    ax.legend(loc="upper left")
+    return _save(fig, fmt)
+
+
+RENDERERS = {
+    'comparison': render_comparison,
+    'distribution': render_distribution,
+    'forecast': render_forecast
+}
+
+
+def render_chart(chart_type, spec, fmt):
+    """Chart bytes in 'png' or 'svg' format"""
+    return RENDERERS[chart_type](spec, fmt)
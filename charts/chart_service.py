@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import json
+import multiprocessing
+import threading
+
+from charts.chart_renderers import RENDERERS, render_chart
+
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+CHART_WORKERS = 2
+CHART_CACHE_SIZE = 256  # rendered charts kept in memory
+CHART_TIMEOUT = 30      # seconds a request waits for its chart
+
+
+def chart_key(chart_type, inputs, fmt, data_version=None):
+    """Cache key of a chart: its type, request inputs, format and data version"""
+    payload = json.dumps([chart_type, inputs, fmt, data_version], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ChartService:
+    """
+    Server-side chart rendering in a background process pool
+
+    Charts are cached by chart_key(), so the spec (and any data work behind
+    it) is only built on a miss. Concurrent requests for the same chart
+    share one render. The pool starts on first use, from a forkserver
+    (spawn where that is unavailable) rather than forking the threaded app
+    process; its workers import matplotlib only when they render. A pool
+    broken by a dead worker is replaced, and the render retried once.
+    """
+
+    def __init__(self, max_workers=CHART_WORKERS, cache_size=CHART_CACHE_SIZE):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+    def _reset_pool(self, executor):
+        """Drop a broken pool, so the next render starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _render(self, key, future, job, retry=True):
+        """Submit a (chart_type, spec, fmt) render whose outcome goes to the shared future"""
+        executor = self._pool()
+        try:
+            render = executor.submit(render_chart, *job)
+        except BrokenProcessPool:
+            self._reset_pool(executor)
+            if not retry:
+                raise
+            return self._render(key, future, job, retry=False)
+        render.add_done_callback(lambda done: self._finished(key, future, job, done, executor, retry))
+
+    def _finished(self, key, future, job, render, executor, retry):
+        if not render.cancelled() and isinstance(render.exception(), BrokenProcessPool):
+            # A worker died: replace the pool and give the chart one more try on the new one
+            self._reset_pool(executor)
+            if retry:
+                try:
+                    self._render(key, future, job, retry=False)
+                    return
+                except BrokenProcessPool:
+                    pass
+        self._store(key, future, render)
+
+    def submit(self, chart_type, inputs, build_spec, fmt="png", data_version=None):
+        """
+        Future resolving to the chart bytes
+
+        Args:
+            chart_type (str): Key of chart_renderers.RENDERERS
+            inputs (dict): Request inputs that determine the chart (JSON-serialisable)
+            build_spec (callable): Returns the renderer spec; called only on a cache miss
+            fmt (str): 'png' or 'svg'
+            data_version (str): Version of the data the spec is built from
+
+        Returns:
+            tuple: (cache key, Future)
+        """
+        if chart_type not in RENDERERS:
+            raise ValueError(f"chart type must be one of {', '.join(RENDERERS)}")
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(CHART_FORMATS)}")
+
+        key = chart_key(chart_type, inputs, fmt, data_version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                future = Future()
+                future.set_result(self._cache[key])
+                return key, future
+            if key in self._pending:
+                return key, self._pending[key]
+            # Registered before the lock is released, so concurrent misses wait on this render
+            future = Future()
+            self._pending[key] = future
+
+        try:
+            self._render(key, future, (chart_type, build_spec(), fmt))
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            future.set_exception(e)
+            raise
+        return key, future
+
+    def _store(self, key, future, render):
+        """Cache a finished render and hand its outcome to the shared future"""
+        with self._lock:
+            self._pending.pop(key, None)
+            if not render.cancelled() and render.exception() is None:
+                self._cache[key] = render.result()
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        if render.cancelled():
+            future.cancel()
+        elif render.exception() is not None:
+            future.set_exception(render.exception())
+        else:
+            future.set_result(render.result())
+
+    def render(self, chart_type, inputs, build_spec, fmt="png", data_version=None, timeout=CHART_TIMEOUT):
+        """Chart bytes, waiting up to `timeout` seconds; returns (cache key, bytes)"""
+        key, future = self.submit(chart_type, inputs, build_spec, fmt, data_version)
+        return key, future.result(timeout=timeout)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
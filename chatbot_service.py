@@ -5,6 +5,21 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from investment_calculator import finance_kernel
+from investment_calculator.affordability import EMI_TO_INCOME_LIMIT, max_purchase
+
+try:
+    from investment_calculator.portfolio_optimizer import optimize_portfolio
+    PORTFOLIO_OPTIMIZER_AVAILABLE = True
+except ImportError:
+    PORTFOLIO_OPTIMIZER_AVAILABLE = False
+
+try:
+    from rent_model import predict_rent
+    RENT_MODEL_AVAILABLE = predict_rent.MODEL_LOADED
+except ImportError:
+    RENT_MODEL_AVAILABLE = False
+
 class PropTechChatbot:
     def __init__(self, ml_service):
         self.ml_service = ml_service
@@ -370,8 +385,64 @@ Just ask me anything about Mumbai real estate! I'm here 24/7 to help! 🚀"""]
         except Exception as e:
             return "I'd love to help with investment advice! Please specify your budget (e.g., ₹50 lakhs, ₹1 crore) and I'll provide detailed recommendations."
     
+    def get_optimized_portfolio(self, budget_lakhs, max_per_locality=1):
+        """All-cash portfolio picked by the optimizer, or None if it cannot run"""
+        if not PORTFOLIO_OPTIMIZER_AVAILABLE:
+            return None
+        summary = self.ml_service.data.get('summary')
+        if summary is None or summary.empty:
+            return None
+        try:
+            result = optimize_portfolio(summary, budget_lakhs, max_per_locality=max_per_locality,
+                                        max_locality_share=1.0, down_payment_percent=100, frontier_points=5)
+        except Exception:
+            return None
+        if 'error' in result or not result['allocation']:
+            return None
+        return result
+
+    def format_portfolio_advice(self, title, result):
+        """Chat response for an optimized portfolio"""
+        portfolio = result['portfolio']
+        allocation_lines = "\n".join(
+            f"• **{item['locality']}**: {item['properties']} × ₹{item['price_lakhs']:.0f}L "
+            f"(₹{item['monthly_cash_flow']:,.0f}/month net, risk {item['risk_score']:.0f}%)"
+            for item in result['allocation']
+        )
+        frontier_lines = "\n".join(
+            f"• Risk ≤ {point['risk_ceiling']:.0f}%: {point['properties']} "
+            f"{'property' if point['properties'] == 1 else 'properties'}, "
+            f"₹{point['net_annual_income']/100000:.1f}L/year net income"
+            for point in result['efficient_frontier']
+        )
+        return f"""{title}
+
+**🧮 OPTIMIZED ALLOCATION (from current locality data):**
+{allocation_lines}
+
+**Cash Reserve**: ₹{result['cash_reserve_lakhs']:.1f}L kept for opportunities & emergencies
+
+**📊 PORTFOLIO METRICS:**
+• **Invested**: ₹{portfolio['cash_invested_lakhs']:.1f}L across {portfolio['properties']} {'property' if portfolio['properties'] == 1 else 'properties'}
+• **Net Rental Income**: ₹{portfolio['net_annual_income']/100000:.1f}L per year
+• **Net Yield**: {portfolio['return_on_cash']:.1f}% on cash invested
+• **Risk Score**: {portfolio['risk_score']:.0f}% (cash-weighted)
+
+**⚖️ RISK vs RETURN (efficient frontier):**
+{frontier_lines}
+
+**💡 HOW THIS WAS CHOSEN:**
+The allocation maximises net rental income within your budget, buying typical properties outright with at most one per locality.
+
+🔗 Tune the constraints via `/api/portfolio/optimize` or analyse any pick in the [Investment Calculator](/investment-calculator)"""
+
     def get_premium_investment_advice(self, budget_lakhs):
         """Investment advice for 2+ crore budget"""
+        result = self.get_optimized_portfolio(budget_lakhs)
+        if result:
+            return self.format_portfolio_advice(
+                f"💎 **Premium Investment Strategy for ₹{budget_lakhs/100:.1f} Crore Portfolio**", result
+            )
         return f"""💎 **Premium Investment Strategy for ₹{budget_lakhs/100:.1f} Crore Portfolio**
 
 **🏢 DIVERSIFIED PREMIUM PORTFOLIO:**
@@ -421,6 +492,11 @@ Want specific analysis for any tier or area? Just ask!"""
     
     def get_high_budget_advice(self, budget_lakhs):
         """Investment advice for 1-2 crore budget"""
+        result = self.get_optimized_portfolio(budget_lakhs)
+        if result:
+            return self.format_portfolio_advice(
+                f"💰 **Strategic Investment Plan for ₹{budget_lakhs/100:.1f} Crore Budget**", result
+            )
         return f"""💰 **Strategic Investment Plan for ₹{budget_lakhs/100:.1f} Crore Budget**
 
 **🏠 BALANCED PORTFOLIO APPROACH:**
@@ -743,7 +819,7 @@ I can calculate detailed ROI analysis including:
 
 **💡 INVESTMENT INSIGHT:**
 {self.get_detailed_locality_insight(stats, locality.lower())}
-
+{self.get_similar_areas_section(locality)}
 **🔗 QUICK ACTIONS:**
 • Calculate ROI: "ROI for ₹{stats['avg_price']:.0f}L in {locality.title()}"
 • Compare areas: "Compare {locality.title()} vs [other area]"
@@ -788,6 +864,21 @@ Which area would you like to know about? I have comprehensive data on:
 
 I'll provide detailed market analysis, investment insights, and recommendations!"""
     
+    def get_similar_areas_section(self, locality):
+        """'Similar areas' block from the locality similarity index (empty when unavailable)"""
+        if not hasattr(self.ml_service, 'similar_localities'):
+            return ""
+        similar = self.ml_service.similar_localities(locality, 3)
+        if not similar:
+            return ""
+        lines = []
+        for area in similar:
+            line = f"• **{area['locality']}**: ₹{area['avg_price']:.1f}L avg, {area['avg_roi']:.2f}% ROI"
+            if area['distance_km'] is not None:
+                line += f", {area['distance_km']:.0f} km away"
+            lines.append(line)
+        return "\n**🧭 SIMILAR AREAS:**\n" + "\n".join(lines) + "\n"
+    
     def get_locality_category(self, locality):
         """Determine locality category"""
         if locality in self.knowledge_base['mumbai_areas']['premium']:
@@ -941,14 +1032,9 @@ Which areas would you like me to compare?"""
             if loan_amount:
                 # Calculate EMI
                 principal = loan_amount * 100000  # Convert to actual amount
-                monthly_rate = interest_rate / (12 * 100)
                 total_months = tenure * 12
-                
-                if monthly_rate > 0:
-                    emi = (principal * monthly_rate * (1 + monthly_rate) ** total_months) / \
-                          ((1 + monthly_rate) ** total_months - 1)
-                else:
-                    emi = principal / total_months
+                # Requested tenure and the 25-year alternative in one call
+                emi, emi_25_years = finance_kernel.emi(principal, interest_rate, [total_months, 25 * 12])
                 
                 total_payment = emi * total_months
                 total_interest = total_payment - principal
@@ -978,7 +1064,7 @@ Which areas would you like me to compare?"""
 • Keep 6-month EMI as emergency fund
 
 **🎯 OPTIMIZATION OPTIONS:**
-• **Longer Tenure**: ₹{(principal * (interest_rate/1200) * (1 + interest_rate/1200)**(25*12)) / ((1 + interest_rate/1200)**(25*12) - 1):,.0f} EMI for 25 years
+• **Longer Tenure**: ₹{emi_25_years:,.0f} EMI for 25 years
 • **Higher Down Payment**: Reduce loan amount to lower EMI
 • **Prepayment**: Save ₹{total_interest*0.3/100000:.1f}L+ with annual prepayments
 
@@ -1085,6 +1171,10 @@ Which area would you like me to assess?"""
     
     def calculate_risk_score(self, stats, locality):
         """Calculate risk score for a locality"""
+        # Scored for every locality by the risk engine when the data was loaded
+        if 'risk_score' in stats:
+            return stats['risk_score']
+        
         base_score = 50
         
         # ROI consistency (lower volatility = lower risk)
@@ -1247,6 +1337,26 @@ Which area would you like me to assess?"""
         else:
             return f"🚨 **HIGH RISK** - Only for aggressive investors seeking high returns. Consider smaller allocation despite {stats['avg_roi']:.1f}% potential"
     
+    def estimate_rent(self, locality, property_value, stats):
+        """Monthly rent of a home at this price, from the hedonic rent model when it knows the locality"""
+        if RENT_MODEL_AVAILABLE and stats.get('avg_rate_sqft') and predict_rent.rent_model.knows(locality):
+            return predict_rent.rent_model.predict(locality, property_value / stats['avg_rate_sqft'])
+        return stats['avg_rent']
+    
+    def get_rent_by_configuration(self, locality):
+        """Expected rent of a typical 1 RK to 3 BHK home in the locality"""
+        if not RENT_MODEL_AVAILABLE or not predict_rent.rent_model.knows(locality):
+            return ""
+        model = predict_rent.rent_model
+        bedrooms = sorted(model.typical_area_sqft)
+        areas = [model.typical_area_sqft[count] for count in bedrooms]
+        rents = model.predict(locality, areas, bedrooms)
+        lines = "\n".join(
+            f"• **{'1 RK' if count == 0 else f'{count} BHK'}** (~{area:,.0f} sq.ft): ₹{rent:,.0f}/month"
+            for count, area, rent in zip(bedrooms, areas, rents)
+        )
+        return f"**🛏️ RENT BY CONFIGURATION:**\n{lines}\n"
+    
     def is_rental_yield_query(self, message, entities):
         """Check if user wants rental yield information"""
         return any(word in message for word in ['rental yield', 'rent', 'rental income', 'tenant', 'renting'])
@@ -1258,14 +1368,16 @@ Which area would you like me to assess?"""
             stats = self.ml_service.get_locality_stats(locality)
             
             if stats:
-                annual_rent = stats['avg_rent'] * 12
                 property_value = stats['avg_price'] * 100000
+                monthly_rent = self.estimate_rent(locality, property_value, stats)
+                annual_rent = monthly_rent * 12
                 rental_yield = (annual_rent / property_value) * 100
                 
                 return f"""🏠 **Rental Yield Analysis for {locality.title()}**
 
 **💰 RENTAL METRICS:**
 • **Average Monthly Rent**: ₹{stats['avg_rent']:,.0f}
+• **Expected Rent (average-priced home)**: ₹{monthly_rent:,.0f}
 • **Annual Rental Income**: ₹{annual_rent:,.0f}
 • **Rental Yield**: {rental_yield:.2f}% annually
 • **Gross ROI**: {stats['avg_roi']:.2f}% (including appreciation)
@@ -1275,6 +1387,7 @@ Which area would you like me to assess?"""
 • **Appreciation Component**: {stats['avg_roi'] - rental_yield:.2f}%
 • **Total Return**: {stats['avg_roi']:.2f}%
 
+{self.get_rent_by_configuration(locality)}
 **🎯 RENTAL MARKET INSIGHTS:**
 • **Tenant Profile**: {self.get_tenant_profile(locality.lower())}
 • **Rental Demand**: {self.get_rental_demand_level(locality.lower())}
@@ -1515,9 +1628,10 @@ Which area interests you for rental investment?"""
                 down_payment = entities['prices'][0] * 100000  # Convert to actual amount
             
             if income:
-                max_emi = income * 0.4  # 40% rule
-                max_loan = self.calculate_max_loan(max_emi)
-                max_property_value = max_loan / 0.8  # Assuming 20% down payment
+                limits = max_purchase(income)  # 40% rule, 20% down payment
+                max_emi = float(limits['max_emi'])
+                max_loan = float(limits['max_loan'])
+                max_property_value = float(limits['max_price'])
                 
                 return f"""💰 **Affordability Analysis**
 
@@ -1549,7 +1663,7 @@ Want specific property recommendations in your budget? Just ask!"""
                 max_property_value = down_payment / 0.2  # Assuming 20% down payment
                 loan_amount = max_property_value * 0.8
                 emi = self.calculate_emi(loan_amount, 8.5, 20)
-                required_income = emi / 0.4
+                required_income = emi / EMI_TO_INCOME_LIMIT
                 
                 return f"""💰 **Affordability Analysis**
 
@@ -1607,32 +1721,27 @@ What's your income or available down payment?"""
     
     def calculate_max_loan(self, max_emi, interest_rate=8.5, tenure=20):
         """Calculate maximum loan amount based on EMI capacity"""
-        monthly_rate = interest_rate / (12 * 100)
-        total_months = tenure * 12
-        
-        if monthly_rate > 0:
-            max_loan = max_emi * ((1 + monthly_rate) ** total_months - 1) / \
-                      (monthly_rate * (1 + monthly_rate) ** total_months)
-        else:
-            max_loan = max_emi * total_months
-        
-        return max_loan
+        return float(finance_kernel.max_loan(max_emi, interest_rate, tenure * 12))
     
     def calculate_emi(self, loan_amount, interest_rate, tenure):
         """Calculate EMI for given loan parameters"""
-        monthly_rate = interest_rate / (12 * 100)
-        total_months = tenure * 12
-        
-        if monthly_rate > 0:
-            emi = (loan_amount * monthly_rate * (1 + monthly_rate) ** total_months) / \
-                  ((1 + monthly_rate) ** total_months - 1)
-        else:
-            emi = loan_amount / total_months
-        
-        return emi
+        return float(finance_kernel.emi(loan_amount, interest_rate, tenure * 12))
     
     def get_affordable_areas(self, max_budget):
         """Get areas within budget range"""
+        get_index = getattr(self.ml_service, 'get_price_listing_index', None)
+        price_index = get_index() if get_index else None
+        if price_index is not None:
+            summary = self.ml_service.data.get('summary')
+            avg_roi = dict(zip(summary['locality'], summary['roi_mean'])) if summary is not None and not summary.empty else {}
+            localities = price_index.rank_affordable(max_budget, avg_roi, limit=5)
+            if localities:
+                return f"**Localities with listings up to ₹{max_budget:.0f}L:**\n" + "\n".join(
+                    f"• **{item['locality']}**: {item['affordable_listings']} of {item['listings']} listings "
+                    f"({item['affordable_share']*100:.0f}%), from ₹{item['min_price_lakhs']:.0f}L"
+                    for item in localities
+                )
+        
         if max_budget >= 100:
             return """**Premium Options (₹80L-120L+):**
 • Powai, Andheri, Bandra (outskirts)
@@ -0,0 +1,157 @@
+import numpy as np
+
+# Query metric -> listing_points() column
+HEAT_METRICS = {'roi': 'roi', 'price': 'price_lakh', 'rent': 'rent', 'rate_sqft': 'rate_sqft'}
+
+GRID_CELL_DEG = 0.005       # grid cell side in degrees (about 500 m in Mumbai)
+MAX_GRID_SIDE = 1024        # cells per axis; larger extents get coarser cells
+MAX_HEAT_POINTS = 2000      # listings returned as points; more are returned as grid cells
+SCALE_PERCENTILES = [5, 95]  # value range sent for colour scaling, robust to outliers
+
+
+def parse_bbox(text):
+    """
+    'west,south,east,north' (Leaflet's toBBoxString order) as floats
+
+    Raises:
+        ValueError: Not four finite numbers, or south above north / west above east
+    """
+    try:
+        west, south, east, north = (float(part) for part in text.split(","))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north")
+    if not np.isfinite([west, south, east, north]).all():
+        raise ValueError("bbox coordinates must be finite numbers")
+    if south > north or west > east:
+        raise ValueError("bbox must be west,south,east,north with south <= north and west <= east")
+    return west, south, east, north
+
+
+class HeatQueryIndex:
+    """
+    Uniform-grid spatial index over the geocoded listings
+
+    Listings are sorted by grid cell (row-major) with one value array per
+    metric in the same order, so the listings of a bounding box are a
+    contiguous slice per grid row, and switching metric only changes which
+    array is read. Per-cell counts, sums and centroids are precomputed for
+    viewports holding too many listings to send one by one.
+    """
+
+    def __init__(self, points, cell_deg=GRID_CELL_DEG, version=None):
+        self.version = version
+        latitude = points['latitude'].to_numpy(dtype=np.float64)
+        longitude = points['longitude'].to_numpy(dtype=np.float64)
+
+        self.origin = (latitude.min(), longitude.min()) if len(points) else (0.0, 0.0)
+        extent = max(np.ptp(latitude), np.ptp(longitude)) if len(points) else 0.0
+        self.cell_deg = max(cell_deg, extent / MAX_GRID_SIDE)
+        rows, columns = self._cell(latitude, longitude)
+        self.n_rows = int(rows.max()) + 1 if len(points) else 1
+        self.n_columns = int(columns.max()) + 1 if len(points) else 1
+        n_cells = self.n_rows * self.n_columns
+
+        cell_id = rows * self.n_columns + columns
+        order = np.argsort(cell_id, kind='stable')
+        cell_id = cell_id[order]
+        self.latitude, self.longitude = latitude[order], longitude[order]
+        self.values = {metric: points[column].to_numpy(dtype=np.float64)[order]
+                       for metric, column in HEAT_METRICS.items()}
+        # Listings of cell c are [starts[c], starts[c + 1])
+        self.starts = np.searchsorted(cell_id, np.arange(n_cells + 1))
+
+        count = np.diff(self.starts)
+        with np.errstate(invalid='ignore'):
+            self.cell_latitude = np.bincount(cell_id, self.latitude, minlength=n_cells) / count
+            self.cell_longitude = np.bincount(cell_id, self.longitude, minlength=n_cells) / count
+        self.cell_sums, self.cell_counts, self.scale = {}, {}, {}
+        for metric, value in self.values.items():
+            known = ~np.isnan(value)
+            self.cell_sums[metric] = np.bincount(cell_id[known], value[known], minlength=n_cells)
+            self.cell_counts[metric] = np.bincount(cell_id[known], minlength=n_cells)
+            self.scale[metric] = ([round(float(v), 2) for v in np.percentile(value[known], SCALE_PERCENTILES)]
+                                  if known.any() else None)
+
+    def __len__(self):
+        return len(self.latitude)
+
+    def _cell(self, latitude, longitude):
+        rows = np.floor((np.asarray(latitude) - self.origin[0]) / self.cell_deg).astype(np.int64)
+        columns = np.floor((np.asarray(longitude) - self.origin[1]) / self.cell_deg).astype(np.int64)
+        return rows, columns
+
+    def _cell_ranges(self, bbox):
+        """Row-major (first, last) cell ids of every grid row the bbox overlaps"""
+        if bbox is None:
+            return np.array([0]), np.array([self.n_rows * self.n_columns - 1])
+        west, south, east, north = bbox
+        # Clipped to one cell beyond the grid first, so far-off coordinates cannot overflow the int64 cell ids
+        latitude = np.clip([south, north], self.origin[0] - self.cell_deg, self.origin[0] + self.n_rows * self.cell_deg)
+        longitude = np.clip([west, east], self.origin[1] - self.cell_deg,
+                            self.origin[1] + self.n_columns * self.cell_deg)
+        (row0, row1), (column0, column1) = self._cell(latitude, longitude)
+        row0, row1 = max(row0, 0), min(row1, self.n_rows - 1)
+        column0, column1 = max(column0, 0), min(column1, self.n_columns - 1)
+        if row0 > row1 or column0 > column1:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        rows = np.arange(row0, row1 + 1)
+        return rows * self.n_columns + column0, rows * self.n_columns + column1
+
+    def listings(self, bbox=None):
+        """Positions (in index order) of the listings inside the bbox"""
+        first, last = self._cell_ranges(bbox)
+        lo, hi = self.starts[first], self.starts[last + 1]
+        lengths = hi - lo
+        # Concatenated aranges of each row's slice
+        positions = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        if bbox is not None:
+            west, south, east, north = bbox
+            latitude, longitude = self.latitude[positions], self.longitude[positions]
+            positions = positions[(latitude >= south) & (latitude <= north) &
+                                  (longitude >= west) & (longitude <= east)]
+        return positions
+
+    def cells(self, bbox=None):
+        """Ids of the non-empty grid cells the bbox overlaps"""
+        first, last = self._cell_ranges(bbox)
+        lengths = last - first + 1
+        ids = np.repeat(first - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return ids[self.starts[ids + 1] > self.starts[ids]]
+
+    def query(self, metric, bbox=None, max_points=MAX_HEAT_POINTS):
+        """
+        Heat data of one metric inside a bounding box
+
+        Args:
+            metric (str): Key of HEAT_METRICS
+            bbox (tuple): (west, south, east, north); None for the whole city
+            max_points (int): Most listings returned individually
+
+        Returns:
+            dict: metric, bbox, count (listings with a value), scale (5th/95th
+                percentile over the city) and either points ([lat, lon, value])
+                or, past max_points, cells ([lat, lon, mean, listings])
+        """
+        if metric not in HEAT_METRICS:
+            raise ValueError(f"metric must be one of {', '.join(HEAT_METRICS)}")
+        value = self.values[metric]
+        positions = self.listings(bbox)
+        positions = positions[~np.isnan(value[positions])]
+
+        result = {'metric': metric, 'bbox': list(bbox) if bbox else None, 'count': int(len(positions)),
+                  'scale': self.scale[metric], 'version': self.version}
+        if len(positions) <= max_points:
+            result['mode'] = 'points'
+            result['points'] = np.column_stack([self.latitude[positions].round(6), self.longitude[positions].round(6),
+                                                value[positions].round(2)]).tolist()
+            return result
+
+        ids = self.cells(bbox)
+        ids = ids[self.cell_counts[metric][ids] > 0]
+        counts = self.cell_counts[metric][ids]
+        result['mode'] = 'cells'
+        result['cell_deg'] = self.cell_deg
+        result['cells'] = [[round(float(lat), 6), round(float(lon), 6), round(float(total / n), 2), int(n)]
+                           for lat, lon, total, n in zip(self.cell_latitude[ids], self.cell_longitude[ids],
+                                                         self.cell_sums[metric][ids], counts)]
+        return result
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from rent_model import predict_rent
+    RENT_MODEL_AVAILABLE = predict_rent.MODEL_LOADED
+except ImportError:
+    RENT_MODEL_AVAILABLE = False
+
+LOCATIONS_PATH = "data/Map_Location.csv"
+
+TILE_SIZE = 256             # web-mercator tile size in pixels
+TILE_ZOOMS = range(9, 17)   # zoom levels with precomputed cells
+SQUARE_CELL_PX = 32         # square cell side, in pixels at the cell's zoom
+HEX_CELL_PX = 20            # hexagon circumradius, in pixels at the cell's zoom
+CELL_SHAPES = ('square', 'hex')
+
+MAX_LATITUDE = 85.05112878  # web-mercator limit
+CELL_ID_OFFSET = 2 ** 30      # cell ids are shifted by this before packing into one key
+CELL_ID_SPAN = 2 ** 31
+
+
+def listing_points(path=LOCATIONS_PATH):
+    """
+    Geocoded listings with price, rate and an ROI estimate
+
+    Monthly rent comes from the hedonic rent model (locality taken from the
+    listing's region, unknown regions get the average locality), so every
+    listing carries its own gross ROI; without the model rent and ROI are
+    left NaN.
+
+    Returns:
+        DataFrame: latitude, longitude, price_lakh, rate_sqft, rent (monthly), roi
+    """
+    df = pd.read_csv(path)
+    points = pd.DataFrame({
+        'latitude': pd.to_numeric(df['Latitude'], errors="coerce"),
+        'longitude': pd.to_numeric(df['Longitude'], errors="coerce"),
+        'price_lakh': pd.to_numeric(df['Price_Lakh'], errors="coerce"),
+        'rate_sqft': pd.to_numeric(df['Rate_SqFt'], errors="coerce"),
+        'rent': np.nan,
+        'roi': np.nan
+    })
+
+    if RENT_MODEL_AVAILABLE:
+        model = predict_rent.rent_model
+        region = df['Region'].astype(str).str.strip().str.lower().str.replace(r"\s+mumbai$", "", regex=True)
+        names = {name: name if model.knows(name) else name.split(" ")[0] for name in region.unique()}
+        area = pd.to_numeric(df['Area_SqFt'], errors="coerce")
+        valid = area.gt(0) & points['price_lakh'].gt(0)
+        rent = model.predict(region[valid].map(names).to_numpy(), area[valid].to_numpy(),
+                             pd.to_numeric(df['Bedroom'], errors="coerce")[valid].clip(upper=3).to_numpy())
+        points.loc[valid, 'rent'] = rent
+        points.loc[valid, 'roi'] = rent * 12 / (points.loc[valid, 'price_lakh'] * 100000) * 100
+
+    valid = points['latitude'].abs().le(MAX_LATITUDE) & points['longitude'].abs().le(180)
+    return points[valid].reset_index(drop=True)
+
+
+def to_pixels(latitude, longitude, zoom):
+    """Global web-mercator pixel coordinates at a zoom level"""
+    scale = TILE_SIZE * 2 ** zoom
+    sin_lat = np.sin(np.radians(latitude))
+    x = (np.asarray(longitude) + 180) / 360 * scale
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)) * scale
+    return x, y
+
+
+def to_lat_lon(x, y, zoom):
+    """Inverse of to_pixels()"""
+    scale = TILE_SIZE * 2 ** zoom
+    longitude = np.asarray(x) / scale * 360 - 180
+    latitude = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y) / scale))))
+    return latitude, longitude
+
+
+def square_cells(x, y, size=SQUARE_CELL_PX):
+    """Cell column/row of every pixel and the cell centres' pixel coordinates"""
+    column, row = np.floor(x / size).astype(np.int64), np.floor(y / size).astype(np.int64)
+    return column, row, lambda c, r: ((c + 0.5) * size, (r + 0.5) * size)
+
+
+def hex_cells(x, y, size=HEX_CELL_PX):
+    """Axial (q, r) of the pointy-top hexagon containing every pixel, and the centre mapping"""
+    q = (np.sqrt(3) / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+    # Cube rounding: round all three coordinates, then fix the one with the largest error
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64), lambda cq, cr: (size * np.sqrt(3) * (cq + cr / 2), size * 1.5 * cr)
+
+
+class HeatTileIndex:
+    """
+    Listing aggregates per square or hex cell, per zoom level
+
+    Every zoom is binned once (vectorized: cell ids, np.unique, bincount)
+    and its cells sorted by the tile holding their centre, so a tile
+    request is two searchsorted calls and a slice.
+    """
+
+    def __init__(self, points, zooms=TILE_ZOOMS, version=None):
+        self.version = version
+        self.zooms = list(zooms)
+        self.points = len(points)
+        self.levels = {}
+        latitude = points['latitude'].to_numpy(dtype=np.float64)
+        longitude = points['longitude'].to_numpy(dtype=np.float64)
+        values = {name: points[name].to_numpy(dtype=np.float64) for name in ('price_lakh', 'rate_sqft', 'roi')}
+        for zoom in self.zooms:
+            x, y = to_pixels(latitude, longitude, zoom)
+            self.levels[(zoom, 'square')] = self._aggregate(zoom, *square_cells(x, y), values)
+            self.levels[(zoom, 'hex')] = self._aggregate(zoom, *hex_cells(x, y), values)
+
+    @staticmethod
+    def _aggregate(zoom, column, row, centre, values):
+        # One int64 key per cell (both ids offset to be non-negative) keeps np.unique one-dimensional
+        packed = (column + CELL_ID_OFFSET) * CELL_ID_SPAN + (row + CELL_ID_OFFSET)
+        keys, inverse = np.unique(packed, return_inverse=True)
+        cells = np.column_stack([keys // CELL_ID_SPAN, keys % CELL_ID_SPAN]) - CELL_ID_OFFSET
+        n_cells = len(cells)
+        level = {'count': np.bincount(inverse, minlength=n_cells)}
+        for name, value in values.items():
+            known = ~np.isnan(value)
+            level[f'{name}_sum'] = np.bincount(inverse[known], value[known], minlength=n_cells)
+            level[f'{name}_count'] = np.bincount(inverse[known], minlength=n_cells)
+
+        centre_x, centre_y = centre(cells[:, 0], cells[:, 1])
+        level['latitude'], level['longitude'] = to_lat_lon(centre_x, centre_y, zoom)
+        level['cell'] = cells
+
+        # Order cells by the tile that holds their centre
+        tiles = 2 ** zoom
+        tile_key = (np.clip(np.floor(centre_y / TILE_SIZE), 0, tiles - 1).astype(np.int64) * tiles +
+                    np.clip(np.floor(centre_x / TILE_SIZE), 0, tiles - 1).astype(np.int64))
+        order = np.argsort(tile_key, kind='stable')
+        level = {name: array[order] for name, array in level.items()}
+        level['tile_key'] = tile_key[order]
+        return level
+
+    @classmethod
+    def build(cls, path=LOCATIONS_PATH, zooms=TILE_ZOOMS, version=None):
+        return cls(listing_points(path), zooms, version)
+
+    def tile(self, zoom, x, y, shape='square'):
+        """
+        Cells of one tile
+
+        Returns:
+            dict: z, x, y, shape and cells (each with its id, centre, listing
+                count, sums and means of price, rate and ROI); None when the
+                zoom or shape is not precomputed
+        """
+        level = self.levels.get((zoom, shape))
+        if level is None:
+            return None
+        key = y * 2 ** zoom + x
+        start, stop = np.searchsorted(level['tile_key'], [key, key + 1])
+
+        cells = []
+        for i in range(start, stop):
+            cell = {
+                'id': level['cell'][i].tolist(),
+                'lat': round(float(level['latitude'][i]), 6),
+                'lon': round(float(level['longitude'][i]), 6),
+                'count': int(level['count'][i])
+            }
+            for name in ('price_lakh', 'rate_sqft', 'roi'):
+                known = int(level[f'{name}_count'][i])
+                total = float(level[f'{name}_sum'][i])
+                cell[f'{name}_sum'] = round(total, 2)
+                cell[f'{name}_mean'] = round(total / known, 2) if known else None
+            cells.append(cell)
+        return {'z': zoom, 'x': x, 'y': y, 'shape': shape,
+                'cell_px': SQUARE_CELL_PX if shape == 'square' else HEX_CELL_PX, 'cells': cells}
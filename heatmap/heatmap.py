@@ -0,0 +1,215 @@
+# heatmap.py
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: regeneration is not serialised across processes
+    fcntl = None
+
+SOURCES = ["data/Final_Project.csv", "data/Map_Location.csv"]
+HEATMAP_PATH = "static/mumbai_roi_heatmap.html"
+HEATMAP_META_PATH = "static/mumbai_roi_heatmap.json"  # source content hash and ETag of the generated map
+HEATMAP_LOCK_PATH = "static/.mumbai_roi_heatmap.lock"  # serialises regeneration across server processes
+HEATMAP_VERSION = 2  # bump when the map layout changes, to regenerate existing files
+
+MAP_CENTER = [19.0760, 72.8777]
+MONTHLY_RENT_YIELD = 0.025  # assumed monthly rent as a share of the price
+
+# Approximate centre of each locality (latitude, longitude)
+LOCALITY_COORDINATES = {
+    'andheri': (19.1136, 72.8697), 'bandra': (19.0544, 72.8406), 'bhandup': (19.1445, 72.9380),
+    'borivali': (19.2307, 72.8567), 'byculla': (18.9750, 72.8342), 'chembur': (19.0633, 72.8997),
+    'churchgate': (18.9322, 72.8264), 'colaba': (18.9067, 72.8147), 'dadar': (19.0176, 72.8562),
+    'dharavi': (19.0380, 72.8538), 'fort': (18.9339, 72.8356), 'ghatkopar': (19.0864, 72.9081),
+    'girgaon': (18.9550, 72.8150), 'goregaon': (19.1663, 72.8526), 'govandi': (19.0550, 72.9150),
+    'grant road': (18.9647, 72.8175), 'jogeshwari': (19.1347, 72.8478), 'juhu': (19.1075, 72.8263),
+    'kandivali': (19.2095, 72.8526), 'khar': (19.0728, 72.8378), 'kurla': (19.0728, 72.8794),
+    'lalbaug': (18.9930, 72.8370), 'lokhandwala': (19.1431, 72.8347), 'lower parel': (19.0000, 72.8333),
+    'mahalakshmi': (18.9827, 72.8228), 'mahim': (19.0411, 72.8397), 'malabar hill': (18.9548, 72.7985),
+    'malad': (19.1875, 72.8489), 'marine drive': (18.9439, 72.8236), 'masjid': (18.9500, 72.8350),
+    'matunga': (19.0297, 72.8397), 'mulund': (19.1726, 72.9565), 'mumbai central': (18.9750, 72.8258),
+    'nariman point': (18.9256, 72.8242), 'oshiwara': (19.1478, 72.8347), 'parel': (18.9986, 72.8400),
+    'powai': (19.1197, 72.9089), 'prabhadevi': (19.0144, 72.8301), 'santacruz': (19.0896, 72.8356),
+    'sion': (19.0433, 72.8636), 'tardeo': (18.9690, 72.8130), 'thane': (19.2183, 72.9781),
+    'versova': (19.1317, 72.8142), 'vidyavihar': (19.0790, 72.8970), 'vikhroli': (19.1112, 72.9276),
+    'vile parle': (19.1000, 72.8440), 'wadala': (19.0160, 72.8650), 'worli': (19.0176, 72.8133)
+}
+
+HEATMAP_DATA_VERSIONS = 4  # data versions whose payload stays memoized
+_heatmap_data_cache = OrderedDict()
+
+
+def source_hash(paths=SOURCES):
+    """SHA-1 over the source files' contents (and the generator version)"""
+    digest = hashlib.sha1(f"heatmap-v{HEATMAP_VERSION}".encode())
+    for path in paths:
+        digest.update(path.encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def heat_points(final_df, map_df):
+    """
+    [[latitude, longitude, ROI %], ...] for every geocoded listing
+
+    Region averages are joined on with one merge and the points are taken
+    as a single array, so the cost is a few column operations at any size.
+    """
+    final_region = final_df['Region'].astype(str).str.strip().str.lower()
+    map_region = map_df['Region'].astype(str).str.strip().str.lower()
+
+    # Compute average metrics
+    avg_price = pd.to_numeric(final_df['Price_Lakh'], errors="coerce").groupby(final_region).mean()
+
+    price = map_region.map(avg_price).to_numpy(dtype=float)
+    annual_rent = price * 100000 * MONTHLY_RENT_YIELD * 12
+    roi = annual_rent / (price * 100000) * 100
+
+    points = pd.DataFrame({
+        'latitude': pd.to_numeric(map_df['Latitude'], errors="coerce"),
+        'longitude': pd.to_numeric(map_df['Longitude'], errors="coerce"),
+        'roi': roi
+    }).dropna()
+    return points.to_numpy().tolist()
+
+
+def generate_heatmap_data(merged, locations=None, data_version=None):
+    """
+    Per-locality ROI, price, rent and coordinates for /roi-heatmap, highest ROI first
+
+    Built column-wise from one groupby and memoized per data version, so
+    repeated requests return the cached list (treat it as read-only).
+
+    Args:
+        merged (DataFrame): ml_service.data['merged']
+        locations (DataFrame): Optional latitude/longitude per locality (index),
+            overriding LOCALITY_COORDINATES
+        data_version (str): Version of `merged`; without one nothing is memoized
+
+    Returns:
+        list: Dicts with locality, avg_roi, avg_price, avg_rent, latitude and
+            longitude (None when the locality has no coordinates)
+    """
+    if data_version is not None and data_version in _heatmap_data_cache:
+        _heatmap_data_cache.move_to_end(data_version)
+        return _heatmap_data_cache[data_version]
+    if merged is None or merged.empty:
+        return []
+
+    stats = merged.groupby('locality')[['roi', 'price_lakh', 'rent']].mean()
+    coordinates = pd.DataFrame.from_dict(LOCALITY_COORDINATES, orient='index', columns=['latitude', 'longitude'])
+    if locations is not None and not locations.empty:
+        coordinates = locations[['latitude', 'longitude']].combine_first(coordinates)
+    coordinates = coordinates.reindex(stats.index)
+
+    frame = pd.DataFrame({
+        'locality': stats.index.str.title(),
+        'avg_roi': stats['roi'].round(2).to_numpy(),
+        'avg_price': stats['price_lakh'].round(2).to_numpy(),
+        'avg_rent': stats['rent'].round(2).to_numpy(),
+        'latitude': coordinates['latitude'].to_numpy(),
+        'longitude': coordinates['longitude'].to_numpy()
+    }).sort_values('avg_roi', ascending=False, kind='stable')
+    heatmap_data = frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+    if data_version is not None:
+        _heatmap_data_cache[data_version] = heatmap_data
+        while len(_heatmap_data_cache) > HEATMAP_DATA_VERSIONS:
+            _heatmap_data_cache.popitem(last=False)
+    return heatmap_data
+
+
+def _write_atomic(path, data):
+    """Write to a temporary file next to `path`, then rename over it"""
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def render_heatmap(points):
+    """Folium map HTML (bytes) with a heat layer of the points"""
+    import folium
+    from folium.plugins import HeatMap
+
+    mumbai_map = folium.Map(location=MAP_CENTER, zoom_start=11)
+    HeatMap(points, radius=12).add_to(mumbai_map)
+    return mumbai_map.get_root().render().encode("utf-8")
+
+
+def read_meta(meta_path=HEATMAP_META_PATH):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def create_heatmap(sources=SOURCES, output_path=HEATMAP_PATH, meta_path=HEATMAP_META_PATH):
+    """Regenerate the map from the sources; returns its metadata"""
+    fingerprint = source_hash(sources)
+    final_df = pd.read_csv(sources[0])
+    map_df = pd.read_csv(sources[1])
+    points = heat_points(final_df, map_df)
+
+    html = render_heatmap(points)
+    meta = {
+        'source_hash': fingerprint,
+        'etag': hashlib.sha1(html).hexdigest(),
+        'points': len(points)
+    }
+    _write_atomic(output_path, html)
+    _write_atomic(meta_path, json.dumps(meta, indent=2).encode())
+    return meta
+
+
+@contextmanager
+def _generation_lock(lock_path):
+    """Exclusive lock on lock_path, shared by every process regenerating the map"""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_heatmap(sources=SOURCES, output_path=HEATMAP_PATH, meta_path=HEATMAP_META_PATH,
+                   lock_path=HEATMAP_LOCK_PATH):
+    """
+    Metadata of an up-to-date map, regenerating it only when the sources changed
+
+    Only the sources' content hash is compared (and stored), so a fresh
+    checkout or a touched but identical file leaves the files alone. Meant
+    to run at startup, not per request: processes starting together take
+    turns on a lock file, so one regenerates and the rest read its result.
+    """
+    with _generation_lock(lock_path):
+        meta = read_meta(meta_path)
+        if meta is not None and os.path.exists(output_path) and meta.get('source_hash') == source_hash(sources):
+            return meta
+        return create_heatmap(sources, output_path, meta_path)
+
+
+if __name__ == "__main__":
+    meta = create_heatmap()
+    print(f"✅ Heatmap with {meta['points']} points saved to {HEATMAP_PATH}")
@@ -0,0 +1,119 @@
+import numpy as np
+
+from investment_calculator import finance_kernel
+
+EMI_TO_INCOME_LIMIT = 0.4  # banks' FOIR rule of thumb: all EMIs within 40% of income
+MAX_LOAN_TO_VALUE = 0.8    # home loans fund at most 80% of the property value
+
+
+def max_purchase(monthly_income, existing_emis=0, down_payment=None, interest_rate=8.5, tenure_years=20,
+                 emi_limit=EMI_TO_INCOME_LIMIT, max_ltv=MAX_LOAN_TO_VALUE):
+    """
+    Largest loan and property price an income supports (scalars or arrays)
+
+    Args:
+        monthly_income: Gross monthly income in ₹
+        existing_emis: EMIs already being paid, in ₹ per month
+        down_payment: Cash available in ₹; None assumes the minimum down payment is available
+        interest_rate: Annual rate in %
+        tenure_years: Loan tenure in years
+
+    Returns:
+        dict: max_emi, max_loan, max_price and required_down_payment (₹)
+    """
+    max_emi = np.maximum(np.asarray(monthly_income, dtype=np.float64) * emi_limit - existing_emis, 0)
+    max_loan = finance_kernel.max_loan(max_emi, interest_rate, np.asarray(tenure_years) * 12)
+
+    if down_payment is None:
+        max_price = max_loan / max_ltv
+    else:
+        # Limited by the loan on top of the cash, and by the loan-to-value cap on the cash
+        down_payment = np.asarray(down_payment, dtype=np.float64)
+        max_price = np.minimum(max_loan + down_payment, down_payment / (1 - max_ltv))
+    loan_used = np.minimum(max_loan, max_price * max_ltv)
+
+    return {
+        'max_emi': max_emi,
+        'max_loan': max_loan,
+        'max_price': max_price,
+        'loan_used': loan_used,
+        'required_down_payment': max_price - loan_used,
+        'emi_at_max_price': finance_kernel.emi(loan_used, interest_rate, np.asarray(tenure_years) * 12)
+    }
+
+
+class PriceListingIndex:
+    """
+    Sorted listing prices of every locality in one flat array
+
+    Prices are keyed as locality_index * span + price, so a single
+    searchsorted over the keys counts affordable listings in every
+    locality at once, for any number of budgets.
+    """
+
+    def __init__(self, price_listings):
+        listings = price_listings.dropna(subset=['locality', 'price_lakh'])
+        listings = listings[listings['price_lakh'] > 0]
+        codes, self.localities = listings['locality'].factorize(sort=True)
+        prices = listings['price_lakh'].to_numpy(dtype=np.float64)
+
+        order = np.lexsort((prices, codes))
+        self.prices = prices[order]
+        self.counts = np.bincount(codes, minlength=len(self.localities))
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)])
+        self.span = float(self.prices.max()) * 2 + 1 if len(self.prices) else 1.0
+        self.keys = codes[order] * self.span + self.prices
+
+    def affordable_counts(self, max_price_lakhs):
+        """
+        Listings at or below each budget, per locality
+
+        Args:
+            max_price_lakhs: Budget(s) in lakhs, scalar or 1-D array
+
+        Returns:
+            array: Counts of shape (n_budgets, n_localities), or (n_localities,) for a scalar
+        """
+        budgets = np.atleast_1d(np.asarray(max_price_lakhs, dtype=np.float64))
+        budgets = np.clip(budgets, 0, self.span - 1)
+        queries = np.arange(len(self.localities)) * self.span + budgets[:, None]
+        counts = np.searchsorted(self.keys, queries, side='right') - self.offsets[:-1]
+        return counts[0] if np.ndim(max_price_lakhs) == 0 else counts
+
+    def quantile(self, q):
+        """Per-locality price quantile (0-1) straight from the sorted segments"""
+        positions = self.offsets[:-1] + np.floor(q * (self.counts - 1)).astype(np.int64)
+        return np.where(self.counts > 0, self.prices[np.minimum(positions, len(self.prices) - 1)], np.nan)
+
+    def rank_affordable(self, max_price_lakhs, avg_roi=None, limit=None):
+        """
+        Localities with at least one affordable listing, best coverage first
+
+        Args:
+            max_price_lakhs (float): Budget in lakhs
+            avg_roi (dict): Optional locality -> average ROI, used as a tie-breaker and reported
+            limit (int): Keep only the top entries
+
+        Returns:
+            list: Dicts with listing counts, affordable share and price context
+        """
+        affordable = self.affordable_counts(float(max_price_lakhs))
+        share = np.divide(affordable, self.counts, out=np.zeros(len(self.counts)), where=self.counts > 0)
+        roi = np.array([(avg_roi or {}).get(locality, np.nan) for locality in self.localities])
+
+        feasible = np.flatnonzero(affordable > 0)
+        order = feasible[np.lexsort((-np.nan_to_num(roi[feasible], nan=-np.inf), -share[feasible]))]
+        if limit:
+            order = order[:limit]
+
+        cheapest = self.quantile(0)
+        median = self.quantile(0.5)
+        return [{
+            'locality': str(self.localities[i]).title(),
+            'listings': int(self.counts[i]),
+            'affordable_listings': int(affordable[i]),
+            'affordable_share': round(float(share[i]), 4),
+            'min_price_lakhs': round(float(cheapest[i]), 2),
+            'median_price_lakhs': round(float(median[i]), 2),
+            'avg_roi': None if np.isnan(roi[i]) else round(float(roi[i]), 2)
+        } for i in order]
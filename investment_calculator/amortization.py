@@ -0,0 +1,234 @@
+import json
+
+import numpy as np
+
+from investment_calculator import finance_kernel
+
+SCHEDULE_COLUMNS = ['month', 'rate', 'opening_balance', 'emi', 'interest', 'principal', 'prepayment',
+                    'closing_balance']
+
+PREPAYMENT_MODES = ('reduce_tenure', 'reduce_emi')
+
+STREAM_CHUNK_ROWS = 120
+
+
+def parse_events(spec, value_key):
+    """
+    Normalise prepayment / rate-reset events to {month: value}
+
+    Accepts a dict, a list of {"month": m, value_key: v} objects, or a
+    "month:value,month:value" string (as used in query strings).
+    """
+    if not spec:
+        return {}
+    if isinstance(spec, str):
+        pairs = [item.split(":") for item in spec.split(",") if item.strip()]
+        return {int(month): float(value) for month, value in pairs}
+    if isinstance(spec, dict):
+        return {int(month): float(value) for month, value in spec.items()}
+    return {int(event['month']): float(event[value_key]) for event in spec}
+
+
+def remaining_tenure(balance, monthly_emi, interest_rate, max_months):
+    """
+    Months (possibly fractional) a running EMI needs to clear a balance, capped at max_months
+
+    Inverts the annuity formula: n = -log(1 - B * r / EMI) / log(1 + r).
+    """
+    r = interest_rate / 1200
+    if r == 0:
+        months = balance / monthly_emi
+    elif balance * r >= monthly_emi:
+        return max_months
+    else:
+        months = -np.log1p(-balance * r / monthly_emi) / np.log1p(r)
+    # Without prepayments this is the scheduled remainder up to rounding; keep it exact
+    return max_months if months > max_months - 1e-6 else float(months)
+
+
+def build_schedule(loan_amount, interest_rate, tenure_months, prepayments=None, rate_resets=None,
+                   prepayment_mode='reduce_tenure'):
+    """
+    Month-by-month amortization schedule as NumPy arrays
+
+    With cumulative growth factors G_k = prod(1 + r_j, j <= k), the balance
+    after month k is G_k * (L - sum((emi_j + prepayment_j) / G_j, j <= k)),
+    so the whole schedule comes out of one cumprod/cumsum pass. The EMI is
+    only re-sized at events (rate resets, and prepayments in 'reduce_emi'
+    mode), which is the only Python-level loop. A rate reset re-sizes the
+    EMI over the loan's current remaining tenure: the original end date in
+    'reduce_emi' mode, and in 'reduce_tenure' mode the months the running
+    EMI still needed, so earlier prepayments keep their tenure reduction.
+
+    Args:
+        loan_amount (float): Principal in ₹
+        interest_rate (float): Starting annual interest rate in %
+        tenure_months (int): Original tenure in months (at most finance_kernel.MAX_GRID_MONTHS)
+        prepayments (dict): {month: amount}, paid on top of that month's EMI
+        rate_resets (dict): {month: annual rate %}, effective from that month's interest
+        prepayment_mode (str): 'reduce_tenure' keeps the EMI and ends the loan
+            earlier; 'reduce_emi' keeps the end date and lowers the EMI
+
+    Returns:
+        dict: One array per SCHEDULE_COLUMNS entry, truncated at payoff
+    """
+    if prepayment_mode not in PREPAYMENT_MODES:
+        raise ValueError(f"prepayment_mode must be one of {', '.join(PREPAYMENT_MODES)}")
+    tenure_months = int(tenure_months)
+    if tenure_months < 1 or loan_amount <= 0:
+        raise ValueError("Loan amount and tenure must be positive")
+    if tenure_months > finance_kernel.MAX_GRID_MONTHS:
+        raise ValueError(f"Tenure cannot exceed {finance_kernel.MAX_GRID_MONTHS} months")
+
+    prepayments = {int(m): float(a) for m, a in (prepayments or {}).items() if 1 <= int(m) <= tenure_months}
+    rate_resets = {int(m): float(r) for m, r in (rate_resets or {}).items() if 1 <= int(m) <= tenure_months}
+    if any(amount < 0 for amount in prepayments.values()) or any(rate < 0 for rate in rate_resets.values()):
+        raise ValueError("Prepayments and rates cannot be negative")
+
+    # Rate path (index 0 is month 1)
+    annual_rate = np.full(tenure_months, float(interest_rate))
+    for month in sorted(rate_resets):
+        annual_rate[month - 1:] = rate_resets[month]
+    monthly_rate = annual_rate / 1200
+
+    prepayment = np.zeros(tenure_months)
+    for month, amount in prepayments.items():
+        prepayment[month - 1] = amount
+
+    growth = np.cumprod(1 + monthly_rate)
+
+    # EMI is re-sized at the start, at every rate reset, and after prepayments in 'reduce_emi' mode
+    reset_months = {1, *rate_resets}
+    if prepayment_mode == 'reduce_emi':
+        reset_months.update(month + 1 for month in prepayments if month < tenure_months)
+    boundaries = sorted(reset_months) + [tenure_months + 1]
+
+    emi = np.empty(tenure_months)
+    discounted_paid = 0.0  # sum((emi_j + prepayment_j) / G_j) over months already laid out
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        opening = loan_amount if start == 1 else growth[start - 2] * (loan_amount - discounted_paid)
+        if opening <= 0:
+            emi[start - 1:] = 0
+            break
+        remaining = tenure_months - start + 1
+        if prepayment_mode == 'reduce_tenure' and start > 1:
+            remaining = remaining_tenure(opening, emi[start - 2], annual_rate[start - 2], remaining)
+        emi[start - 1:end - 1] = finance_kernel.emi(opening, annual_rate[start - 1], remaining)
+        segment = slice(start - 1, end - 1)
+        discounted_paid += ((emi[segment] + prepayment[segment]) / growth[segment]).sum()
+
+    closing = growth * (loan_amount - np.cumsum((emi + prepayment) / growth))
+    opening = np.concatenate([[loan_amount], closing[:-1]])
+
+    # Payoff: the first month the balance would go to (or below) zero takes only what is owed
+    paid_off = np.flatnonzero(closing <= loan_amount * 1e-9)
+    months = int(paid_off[0]) + 1 if len(paid_off) else tenure_months
+    opening, monthly_rate = opening[:months], monthly_rate[:months]
+    emi, prepayment, closing = emi[:months].copy(), prepayment[:months].copy(), closing[:months].copy()
+
+    interest = opening * monthly_rate
+    owed = opening[-1] + interest[-1]
+    emi[-1] = min(emi[-1], owed)
+    prepayment[-1] = min(prepayment[-1], owed - emi[-1])
+    closing[-1] = 0.0
+
+    return {
+        'month': np.arange(1, months + 1),
+        'rate': monthly_rate * 1200,
+        'opening_balance': opening,
+        'emi': emi,
+        'interest': interest,
+        'principal': emi - interest,
+        'prepayment': prepayment,
+        'closing_balance': closing
+    }
+
+
+def schedule_summary(schedule, tenure_months=None):
+    """Totals of a schedule built by build_schedule()"""
+    months = len(schedule['month'])
+    summary = {
+        'months': months,
+        'first_emi': round(float(schedule['emi'][0]), 2),
+        'last_emi': round(float(schedule['emi'][-1]), 2),
+        'total_interest': round(float(schedule['interest'].sum()), 2),
+        'total_prepayment': round(float(schedule['prepayment'].sum()), 2),
+        'total_paid': round(float(schedule['emi'].sum() + schedule['prepayment'].sum()), 2)
+    }
+    if tenure_months is not None:
+        summary['months_saved'] = int(tenure_months) - months
+    return summary
+
+
+def _chunk_rows(schedule, chunk_rows):
+    """Rounded row tuples of the schedule, one chunk at a time"""
+    for start in range(0, len(schedule['month']), chunk_rows):
+        block = slice(start, start + chunk_rows)
+        columns = [schedule['month'][block].tolist()]
+        columns += [np.round(schedule[name][block], 2).tolist() for name in SCHEDULE_COLUMNS[1:]]
+        yield zip(*columns)
+
+
+def iter_schedule_csv(schedule, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield the schedule as CSV text, `chunk_rows` rows per chunk"""
+    yield ",".join(SCHEDULE_COLUMNS) + "\n"
+    for rows in _chunk_rows(schedule, chunk_rows):
+        yield "".join(",".join(map(str, row)) + "\n" for row in rows)
+
+
+def iter_schedule_ndjson(schedule, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield the schedule as newline-delimited JSON, `chunk_rows` rows per chunk"""
+    for rows in _chunk_rows(schedule, chunk_rows):
+        yield "".join(json.dumps(dict(zip(SCHEDULE_COLUMNS, row))) + "\n" for row in rows)
+
+
+def yearly_breakdown(loan_amount, interest_rate, tenure_months):
+    """
+    Interest and principal paid in each loan year, for many loans at once
+
+    Uses the closed-form balance B_k = L * g^k - EMI * (g^k - 1) / r (g = 1 + r)
+    at every year end, so no month-by-month schedule is built. Inputs
+    broadcast; years past a loan's tenure are zero.
+
+    Args:
+        loan_amount: Principal in ₹ (scalar or array)
+        interest_rate: Annual interest rate in % (scalar or array)
+        tenure_months: Tenure in months (scalar or array)
+
+    Returns:
+        dict: 'interest', 'principal' and 'emi_paid' of shape (..., years), and 'year' (1-based)
+    """
+    loan_amount, interest_rate, tenure_months = np.broadcast_arrays(
+        *[np.asarray(v, dtype=np.float64) for v in (loan_amount, interest_rate, tenure_months)]
+    )
+    emi = finance_kernel.emi(loan_amount, interest_rate, tenure_months)[..., None]
+    n_years = int(np.ceil(tenure_months.max() / 12)) if tenure_months.size else 0
+
+    # Months elapsed at each year boundary, capped at the tenure
+    boundaries = np.minimum(np.arange(n_years + 1) * 12, tenure_months[..., None])
+    monthly_rate = (interest_rate / 1200)[..., None]
+    growth = (1 + monthly_rate) ** boundaries
+    with np.errstate(divide='ignore', invalid='ignore'):
+        paid_factor = np.where(monthly_rate > 0, (growth - 1) / monthly_rate, boundaries)
+    balance = np.maximum(loan_amount[..., None] * growth - emi * paid_factor, 0)
+    balance[..., -1] = 0.0
+
+    principal = balance[..., :-1] - balance[..., 1:]
+    emi_paid = emi * np.diff(boundaries, axis=-1)
+    return {
+        'year': np.arange(1, n_years + 1),
+        'interest': emi_paid - principal,
+        'principal': principal,
+        'emi_paid': emi_paid
+    }
+
+
+def schedule_by_year(schedule):
+    """Totals per loan year of a schedule built by build_schedule()"""
+    starts = np.arange(0, len(schedule['month']), 12)
+    return {
+        'year': np.arange(1, len(starts) + 1),
+        'interest': np.add.reduceat(schedule['interest'], starts),
+        'principal': np.add.reduceat(schedule['principal'] + schedule['prepayment'], starts),
+        'emi_paid': np.add.reduceat(schedule['emi'] + schedule['prepayment'], starts)
+    }
@@ -0,0 +1,197 @@
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from investment_calculator.cash_flow import analyze_investment
+
+REQUIRED_COLUMNS = ['locality', 'budget', 'horizon']
+
+# Accepted spellings of the optional columns, mapped to analyze_investment arguments
+COLUMN_ALIASES = {
+    'down_payment': 'down_payment_percent',
+    'down_payment_percent': 'down_payment_percent',
+    'rate': 'interest_rate',
+    'interest_rate': 'interest_rate',
+    'risk': 'risk_tolerance',
+    'risk_tolerance': 'risk_tolerance',
+    'investment_horizon': 'horizon'
+}
+
+RISK_TOLERANCES = ('low', 'medium', 'high')
+
+MAX_ROWS = 100_000
+CHUNK_ROWS = 250
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Shared worker pool, started on first use (BULK_WORKERS overrides the size)
+
+    Workers come from a forkserver (spawn where that is unavailable) rather
+    than forking the app process, whose request threads may hold locks at
+    fork time; they only import this module. The pool is shut down at exit,
+    and replaced on the next call once a dead worker has broken it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get("BULK_WORKERS", 0)) or os.cpu_count() or 1
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            atexit.register(shutdown_process_pool)
+        return _pool
+
+
+def _reset_process_pool(pool):
+    """Drop a pool broken by a dead worker, so the next caller starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_process_pool():
+    """Stop the shared worker pool, if it was started"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def read_upload(file_obj):
+    """
+    Parse an uploaded CSV into a frame of analysis inputs
+
+    Column names are normalised (lower case, underscores) and aliases mapped,
+    so "Down Payment" and "rate" are accepted.
+    """
+    frame = pd.read_csv(file_obj, dtype=str, keep_default_na=False)
+    frame.columns = frame.columns.str.lower().str.strip().str.replace(" ", "_")
+    frame = frame.rename(columns=COLUMN_ALIASES)
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    if len(frame) > MAX_ROWS:
+        raise ValueError(f"Too many rows ({len(frame):,}); the limit is {MAX_ROWS:,}")
+
+    frame['locality'] = frame['locality'].str.strip().str.lower()
+    return frame
+
+
+def _analyze_row(row, stats_by_locality):
+    """Validate one CSV row and run the investment analysis on it"""
+    locality = row['locality']
+    locality_stats = stats_by_locality.get(locality)
+    if not locality_stats:
+        return {"error": f"Locality data not available for '{locality}'"}
+
+    try:
+        budget = float(row['budget'])
+        horizon = int(float(row['horizon']))
+        down_payment_percent = float(row.get('down_payment_percent') or 20)
+        interest_rate = float(row.get('interest_rate') or 8.5)
+    except (ValueError, OverflowError):
+        return {"error": "budget, horizon, down payment and rate must be numeric"}
+
+    risk_tolerance = (row.get('risk_tolerance') or 'medium').strip().lower()
+    if risk_tolerance not in RISK_TOLERANCES:
+        return {"error": f"risk tolerance must be one of {', '.join(RISK_TOLERANCES)}"}
+    if budget <= 0 or not np.isfinite(budget):
+        return {"error": "budget must be positive"}
+
+    return analyze_investment(
+        locality, locality_stats, budget, horizon, risk_tolerance,
+        down_payment_percent=down_payment_percent, interest_rate=interest_rate
+    )
+
+
+def analyze_chunk(start, rows, stats_by_locality):
+    """Worker task: analyse a block of rows, returning (row number, result) pairs"""
+    results = []
+    for offset, row in enumerate(rows):
+        try:
+            result = _analyze_row(row, stats_by_locality)
+        except Exception as e:
+            result = {"error": str(e)}
+        results.append((start + offset + 1, result))
+    return results
+
+
+def _run_on_pool(tasks):
+    """
+    analyze_chunk() results of the tasks in completion order, from the process pool
+
+    A chunk whose worker failed (or died, breaking the pool) comes back as
+    one error per row, so callers always see every row.
+    """
+    pool = get_process_pool()
+    try:
+        futures = {pool.submit(analyze_chunk, *task): task for task in tasks}
+    except BrokenProcessPool:
+        _reset_process_pool(pool)
+        pool = get_process_pool()
+        futures = {pool.submit(analyze_chunk, *task): task for task in tasks}
+
+    for future in as_completed(futures):
+        try:
+            chunk = future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _reset_process_pool(pool)
+            start, rows, _ = futures[future]
+            chunk = [(start + offset + 1, {"error": f"Analysis failed: {e}"}) for offset in range(len(rows))]
+        yield chunk
+
+
+def iter_bulk_analysis(frame, stats_by_locality, chunk_rows=CHUNK_ROWS):
+    """
+    Analyse every row and yield NDJSON lines as chunks finish
+
+    Rows are split into chunks and fanned out over the process pool; each
+    worker only receives the stats of the localities in its chunk. Lines are
+    typed: "result" or "error" per row (row numbers are 1-based, in file
+    order), "progress" after every chunk and a final "summary".
+    """
+    records = frame.to_dict('records')
+    total = len(records)
+    yield json.dumps({"type": "progress", "completed": 0, "total": total}) + "\n"
+
+    tasks = []
+    for start in range(0, total, chunk_rows):
+        rows = records[start:start + chunk_rows]
+        stats = {row['locality']: stats_by_locality.get(row['locality']) for row in rows}
+        tasks.append((start, rows, stats))
+
+    if len(tasks) == 1:
+        # Not worth the round trip to the pool
+        finished = (analyze_chunk(*task) for task in tasks)
+    else:
+        finished = _run_on_pool(tasks)
+
+    completed = errors = 0
+    for chunk in finished:
+        lines = []
+        for row_number, result in chunk:
+            if "error" in result:
+                errors += 1
+                lines.append(json.dumps({"type": "error", "row": row_number, "error": result["error"]}))
+            else:
+                lines.append(json.dumps({"type": "result", "row": row_number, "analysis": result}))
+        completed += len(chunk)
+        lines.append(json.dumps({"type": "progress", "completed": completed, "total": total}))
+        yield "\n".join(lines) + "\n"
+
+    yield json.dumps({"type": "summary", "rows": total, "succeeded": total - errors, "failed": errors}) + "\n"
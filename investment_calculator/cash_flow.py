@@ -0,0 +1,333 @@
+import numpy as np
+
+from investment_calculator import finance_kernel
+from investment_calculator.risk_engine import realistic_risk_score
+from investment_calculator.sensitivity import perturbation_batch, tornado_chart
+from investment_calculator.tax import DEFAULT_TAX_REGIME, after_tax_cash_flows
+
+try:
+    from rent_model import predict_rent
+    RENT_MODEL_AVAILABLE = predict_rent.MODEL_LOADED
+except ImportError:
+    RENT_MODEL_AVAILABLE = False
+
+# Running-cost assumptions of the realistic investment model
+BASIC_MAINTENANCE_PERCENT = 0.5   # % of property price per year
+PROPERTY_TAX_PERCENT = 0.1        # % of property price per year
+INSURANCE_PERCENT = 0.2           # % of property price per year
+SOCIETY_MAINTENANCE_PER_SQFT = 3  # ₹ per sqft per month
+VACANCY_RATE = 0.08               # share of rent lost to vacancy
+RENT_SCALING_BOUNDS = (0.8, 1.3)  # clamp on price ratio when scaling locality rent
+
+# Return metrics: the property is sold at the end of the horizon, when the loan is fully repaid
+DISCOUNT_RATE_PERCENT = 10.0  # annual hurdle rate for NPV
+RETURNS_CHUNK_SIZE = 20000    # scenarios per cash-flow matrix block
+MAX_HORIZON_YEARS = finance_kernel.MAX_GRID_MONTHS // 12  # longest tenure / holding period
+
+
+def evaluate_investment(locality_stats, budget, horizon, down_payment_percent=20, interest_rate=8.5,
+                        risk_tolerance='medium', rent_multiplier=1.0, vacancy_rate=VACANCY_RATE,
+                        maintenance_multiplier=1.0):
+    """
+    Realistic investment model evaluated for any broadcastable set of inputs
+
+    Args:
+        locality_stats (dict): Output of PropTechMLService.get_locality_stats; its
+            values may also be arrays (one entry per locality) that broadcast with the inputs.
+            With a 'locality' entry, rent comes from the hedonic rent model
+        budget: Property price in lakhs (scalar or array)
+        horizon: Loan tenure / holding period in years (scalar or array)
+        down_payment_percent: Down payment as % of price (scalar or array)
+        interest_rate: Annual interest rate in % (scalar or array)
+        risk_tolerance (str): 'low', 'medium' or 'high'
+        rent_multiplier: Scale on the estimated rent (scalar or array)
+        vacancy_rate: Share of rent lost to vacancy (scalar or array)
+        maintenance_multiplier: Scale on basic and society maintenance (scalar or array)
+
+    Returns:
+        dict: Arrays (broadcast to a common shape) for every model output
+    """
+    (budget, horizon, down_payment_percent, interest_rate,
+     rent_multiplier, vacancy_rate, maintenance_multiplier) = np.broadcast_arrays(
+        *[np.asarray(v, dtype=np.float64) for v in (budget, horizon, down_payment_percent, interest_rate,
+                                                     rent_multiplier, vacancy_rate, maintenance_multiplier)]
+    )
+
+    # Convert budget from lakhs to actual amount
+    property_price = budget * 100000
+
+    # 1. LOAN CALCULATIONS
+    down_payment = property_price * (down_payment_percent / 100)
+    loan_amount = property_price - down_payment
+    total_months = horizon * 12
+    emi = finance_kernel.emi(loan_amount, interest_rate, total_months)
+
+    # 2. RENTAL INCOME ESTIMATION
+    estimated_area_sqft = property_price / locality_stats.get('avg_rate_sqft', 10000)
+    estimated_monthly_rent = estimate_monthly_rent(locality_stats, property_price, estimated_area_sqft)
+    estimated_monthly_rent = estimated_monthly_rent * rent_multiplier
+
+    # 3. REALISTIC MAINTENANCE AND EXPENSES
+    monthly_basic_maintenance = (property_price * BASIC_MAINTENANCE_PERCENT / 100) / 12 * maintenance_multiplier
+    monthly_property_tax = (property_price * PROPERTY_TAX_PERCENT / 100) / 12
+    monthly_insurance = (property_price * INSURANCE_PERCENT / 100) / 12
+    monthly_society_maintenance = estimated_area_sqft * SOCIETY_MAINTENANCE_PER_SQFT * maintenance_multiplier
+    monthly_vacancy_cost = estimated_monthly_rent * vacancy_rate
+
+    total_monthly_expenses = (
+        monthly_basic_maintenance +
+        monthly_property_tax +
+        monthly_insurance +
+        monthly_society_maintenance +
+        monthly_vacancy_cost
+    )
+
+    # 4. CASH FLOW ANALYSIS
+    monthly_cash_flow = estimated_monthly_rent - emi - total_monthly_expenses
+
+    # 5. ROI CALCULATIONS
+    annual_rent = estimated_monthly_rent * 12
+    net_annual_income = annual_rent - total_monthly_expenses * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi_on_cash_invested = (net_annual_income / down_payment) * 100
+
+        # 6. BREAK-EVEN ANALYSIS (NaN where income never recovers the down payment)
+        break_even_years = np.where(net_annual_income > 0, down_payment / net_annual_income, np.nan)
+
+    # 7. RISK CALCULATION
+    risk_score = realistic_risk_score(
+        locality_stats, monthly_cash_flow, roi_on_cash_invested, risk_tolerance, property_price
+    )
+
+    return {
+        'property_price': property_price,
+        'down_payment': down_payment,
+        'loan_amount': loan_amount,
+        'emi': emi,
+        'interest_rate': interest_rate,
+        'total_interest': emi * total_months - loan_amount,
+        'total_months': total_months,
+        'estimated_monthly_rent': estimated_monthly_rent,
+        'monthly_basic_maintenance': monthly_basic_maintenance,
+        'monthly_property_tax': monthly_property_tax,
+        'monthly_insurance': monthly_insurance,
+        'monthly_society_maintenance': monthly_society_maintenance,
+        'monthly_vacancy_cost': monthly_vacancy_cost,
+        'total_monthly_expenses': total_monthly_expenses,
+        'monthly_cash_flow': monthly_cash_flow,
+        'annual_cash_flow': monthly_cash_flow * 12,
+        'annual_rent': annual_rent,
+        'net_annual_income': net_annual_income,
+        'roi_on_cash_invested': roi_on_cash_invested,
+        'break_even_years': break_even_years,
+        'risk_score': risk_score,
+        'recommendation': investment_recommendation(roi_on_cash_invested, monthly_cash_flow, risk_score)
+    }
+
+
+def estimate_monthly_rent(locality_stats, property_price, area_sqft):
+    """
+    Monthly rent of a property of the given price and built-up area
+
+    Uses the hedonic rent model (locality, area, bedrooms estimated from area)
+    when locality_stats names the locality; otherwise, and wherever the area
+    is unusable, scales the locality's average rent by the clamped ratio of
+    price to the locality's average price.
+    """
+    avg_property_price = locality_stats['avg_price'] * 100000
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_ratio = np.where(avg_property_price > 0, property_price / avg_property_price, 1.0)
+    rent_scaling_factor = np.clip(price_ratio, *RENT_SCALING_BOUNDS)
+    scaled_rent = locality_stats['avg_rent'] * rent_scaling_factor
+
+    if not RENT_MODEL_AVAILABLE or 'locality' not in locality_stats:
+        return scaled_rent
+
+    usable_area = np.isfinite(area_sqft) & (area_sqft > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hedonic_rent = predict_rent.rent_model.predict(locality_stats['locality'], np.where(usable_area, area_sqft, 1.0))
+    return np.where(usable_area, hedonic_rent, scaled_rent)
+
+
+def cash_flow_matrix(result, appreciation_percent=0.0):
+    """
+    Monthly cash-flow series (scenarios x months) from an evaluate_investment() result
+
+    Column 0 is the down payment, columns 1..n the monthly cash flow, and the
+    last month of each scenario also receives the sale price after
+    `appreciation_percent` annual growth (scalar or one per scenario).
+    Shorter horizons are zero-padded.
+    """
+    total_months = np.rint(result['total_months'].ravel()).astype(np.int64)
+    n_months = int(total_months.max())
+    rows = np.arange(len(total_months))
+
+    months = np.arange(1, n_months + 1)
+    flows = np.empty((len(total_months), n_months + 1))
+    flows[:, 0] = -result['down_payment'].ravel()
+    flows[:, 1:] = np.where(months <= total_months[:, None], result['monthly_cash_flow'].ravel()[:, None], 0)
+    exit_value = result['property_price'].ravel() * (1 + appreciation_percent / 100) ** (total_months / 12)
+    flows[rows, total_months] += exit_value
+    return flows
+
+
+def investment_returns(result, appreciation_percent=0.0, discount_rate=DISCOUNT_RATE_PERCENT,
+                       chunk_size=RETURNS_CHUNK_SIZE):
+    """
+    Annualized IRR and NPV for every scenario of an evaluate_investment() result
+
+    Cash-flow matrices are built and solved in blocks of `chunk_size`
+    scenarios so memory stays bounded on large grids. `appreciation_percent`
+    may be a scalar or an array broadcastable to the result's shape.
+
+    Returns:
+        dict: 'irr' (% per year, NaN where undefined), 'npv' (₹) and
+            'irr_converged', each in the result's shape
+    """
+    shape = result['down_payment'].shape
+    n_scenarios = int(np.prod(shape, dtype=np.int64))
+    flat = {name: result[name].ravel() for name in ('total_months', 'down_payment', 'monthly_cash_flow',
+                                                     'property_price')}
+    appreciation = np.broadcast_to(np.asarray(appreciation_percent, dtype=np.float64), shape).ravel()
+    monthly_discount = (1 + discount_rate / 100) ** (1 / 12) - 1
+
+    irr = np.empty(n_scenarios)
+    npv = np.empty(n_scenarios)
+    converged = np.empty(n_scenarios, dtype=bool)
+    for start in range(0, n_scenarios, chunk_size):
+        block = slice(start, start + chunk_size)
+        flows = cash_flow_matrix({name: values[block] for name, values in flat.items()}, appreciation[block])
+        monthly_irr, converged[block], _ = finance_kernel.irr(flows, full_output=True)
+        irr[block] = ((1 + monthly_irr) ** 12 - 1) * 100
+        npv[block] = finance_kernel.npv(monthly_discount, flows)
+
+    return {'irr': irr.reshape(shape), 'npv': npv.reshape(shape), 'irr_converged': converged.reshape(shape)}
+
+
+def investment_recommendation(roi, monthly_cash_flow, risk_score):
+    """Vectorized recommendation labels for real estate investments"""
+    return np.select(
+        [
+            (roi >= 12) & (monthly_cash_flow >= -2000) & (risk_score < 35),
+            (roi >= 8) & (monthly_cash_flow >= -5000) & (risk_score < 45),
+            (roi >= 5) & (monthly_cash_flow >= -8000) & (risk_score < 55),
+            (roi >= 3) & (risk_score < 65)
+        ],
+        ["Highly Recommended", "Recommended", "Consider for Capital Appreciation", "Consider with Caution"],
+        default="Not Recommended"
+    )
+
+
+def analyze_investment(locality, locality_stats, budget, horizon, risk_tolerance,
+                       down_payment_percent=20, interest_rate=8.5, appreciation_percent=0.0,
+                       annual_income=None, tax_regime=DEFAULT_TAX_REGIME):
+    """
+    Single investment analysis formatted for the investment result page
+
+    The base case is evaluated in one batch with the one-at-a-time input
+    shifts of the sensitivity module, so the tornado chart comes with it.
+    With the investor's annual (taxable) income, year-wise after-tax cash
+    flows under the chosen tax regime are added.
+
+    Returns:
+        dict: Rounded results, or {"error": ...} if the inputs are unusable
+    """
+    if down_payment_percent <= 0:
+        return {"error": "Down payment must be greater than zero"}
+    if horizon <= 0:
+        return {"error": "Investment horizon must be at least one year"}
+    if horizon > MAX_HORIZON_YEARS:
+        return {"error": f"Investment horizon cannot exceed {MAX_HORIZON_YEARS} years"}
+
+    batch = perturbation_batch({
+        'interest_rate': interest_rate,
+        'rent_multiplier': 1.0,
+        'vacancy_rate': VACANCY_RATE,
+        'maintenance_multiplier': 1.0,
+        'appreciation_percent': appreciation_percent
+    })
+    result = evaluate_investment(
+        locality_stats, budget, horizon, down_payment_percent, batch['interest_rate'], risk_tolerance,
+        rent_multiplier=batch['rent_multiplier'], vacancy_rate=batch['vacancy_rate'],
+        maintenance_multiplier=batch['maintenance_multiplier']
+    )
+    outputs = {**result, **investment_returns(result, batch['appreciation_percent'])}
+    value = {name: array[0].item() for name, array in outputs.items()}
+    break_even_years = value['break_even_years']
+
+    after_tax = None
+    if annual_income is not None:
+        flows = after_tax_cash_flows({name: array[:1] for name, array in result.items()}, annual_income, tax_regime)
+        flows = {name: array[0] if array.ndim > 1 else array for name, array in flows.items()}
+        after_tax = {
+            'regime': tax_regime,
+            'annual_income': annual_income,
+            'first_year_tax_impact': round(float(flows['tax_impact'][0]), 2),
+            'first_year_monthly_cash_flow': round(float(flows['after_tax_cash_flow'][0]) / 12, 2),
+            'total_tax_impact': round(float(flows['tax_impact'].sum()), 2),
+            'yearly': [{
+                'year': int(year),
+                'interest': round(float(interest), 2),
+                'principal': round(float(principal), 2),
+                'tax_impact': round(float(tax), 2),
+                'after_tax_cash_flow': round(float(cash_flow), 2)
+            } for year, interest, principal, tax, cash_flow in zip(
+                flows['year'], flows['interest'], flows['principal'], flows['tax_impact'],
+                flows['after_tax_cash_flow'])]
+        }
+
+    return {
+        'locality': locality.title(),
+        'budget': budget,
+        'horizon': horizon,
+        'property_price': round(value['property_price'] / 100000, 2),
+
+        # Loan Details
+        'down_payment': round(value['down_payment'] / 100000, 2),
+        'loan_amount': round(value['loan_amount'] / 100000, 2),
+        'monthly_emi': round(value['emi'], 2),
+        'total_interest': round(value['total_interest'] / 100000, 2),
+        'interest_rate': interest_rate,
+        'down_payment_percent': down_payment_percent,
+
+        # Rental Income
+        'estimated_monthly_rent': round(value['estimated_monthly_rent'], 2),
+        'annual_rent_income': round(value['annual_rent'], 2),
+
+        # Expenses
+        'monthly_maintenance': round(value['total_monthly_expenses'], 2),
+        'total_monthly_expenses': round(value['total_monthly_expenses'], 2),
+
+        # Cash Flow
+        'monthly_cash_flow': round(value['monthly_cash_flow'], 2),
+        'annual_cash_flow': round(value['annual_cash_flow'], 2),
+        'net_annual_income': round(value['net_annual_income'], 2),
+
+        # Returns
+        'annual_roi': round(value['roi_on_cash_invested'], 2),
+        'break_even_years': None if np.isnan(break_even_years) else round(break_even_years, 2),
+        'irr': None if np.isnan(value['irr']) else round(value['irr'], 2),
+        'irr_converged': value['irr_converged'],
+        'npv': round(value['npv'] / 100000, 2),
+        'npv_discount_rate': DISCOUNT_RATE_PERCENT,
+        'appreciation_percent': appreciation_percent,
+
+        # Risk Assessment
+        'risk_score': value['risk_score'],
+        'recommendation': value['recommendation'],
+
+        # Maintenance Breakdown
+        'maintenance_breakdown': {
+            'basic_maintenance': round(value['monthly_basic_maintenance'], 2),
+            'property_tax': round(value['monthly_property_tax'], 2),
+            'insurance': round(value['monthly_insurance'], 2),
+            'society_maintenance': round(value['monthly_society_maintenance'], 2),
+            'vacancy_allowance': round(value['monthly_vacancy_cost'], 2)
+        },
+
+        # Tax (None unless an income was given)
+        'after_tax': after_tax,
+
+        # One-at-a-time sensitivity of the key outputs
+        'sensitivity': tornado_chart(outputs, batch)
+    }
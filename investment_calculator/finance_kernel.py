@@ -0,0 +1,243 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Grid of the cached annuity-factor table: annual rates 0-20% in 0.05% steps, tenures 1-480 months
+RATE_GRID_STEP = 0.05
+RATE_GRID_MAX = 20.0
+MAX_GRID_MONTHS = 480
+
+# Up to this many series, NPV is evaluated with explicit powers instead of Horner's rule
+DENSE_NPV_MAX_SERIES = 64
+
+# Per-period rates at which irr() evaluates every series up front (one matrix product) to
+# bracket its root; 0.2% steps over the -3% to +3% a month that housing cash flows fall in
+IRR_SEED_RATES = [-0.5, -0.25, -0.1, -0.05] + [round(0.002 * k, 3) for k in range(-15, 16)] + [0.05, 0.1, 0.25, 0.5]
+
+
+def _annuity_factor_formula(interest_rate, total_months):
+    """Present value of ₹1 paid monthly for `total_months` at an annual rate (%)"""
+    monthly_rate = interest_rate / 1200
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = (1 - (1 + monthly_rate) ** -total_months) / monthly_rate
+    return np.where(monthly_rate == 0, total_months, factor)
+
+
+@lru_cache(maxsize=1)
+def annuity_factor_table():
+    """Annuity factors over the rate x tenure grid, built on first use"""
+    rates = np.arange(round(RATE_GRID_MAX / RATE_GRID_STEP) + 1) / round(1 / RATE_GRID_STEP)
+    months = np.arange(1, MAX_GRID_MONTHS + 1)
+    table = _annuity_factor_formula(rates[:, None], months[None, :])
+    table.setflags(write=False)
+    return table
+
+
+def annuity_factor(interest_rate, total_months):
+    """
+    Annuity factors for scalars or arrays of annual rates (%) and tenures (months)
+
+    Inputs that fall on the rate x tenure grid (the common case: rates quoted
+    to 0.05% and whole-month tenures) are read from the cached table; the rest
+    are computed directly.
+    """
+    interest_rate, total_months = np.broadcast_arrays(
+        np.asarray(interest_rate, dtype=np.float64), np.asarray(total_months, dtype=np.float64)
+    )
+    rate_index = np.rint(interest_rate / RATE_GRID_STEP)
+    month_index = np.rint(total_months)
+    on_grid = (
+        (np.abs(rate_index * RATE_GRID_STEP - interest_rate) < 1e-9) & (rate_index >= 0) &
+        (rate_index * RATE_GRID_STEP <= RATE_GRID_MAX) &
+        (month_index == total_months) & (month_index >= 1) & (month_index <= MAX_GRID_MONTHS)
+    )
+
+    if on_grid.all():
+        return annuity_factor_table()[rate_index.astype(np.intp), month_index.astype(np.intp) - 1]
+
+    factor = _annuity_factor_formula(interest_rate, total_months)
+    if on_grid.any():
+        factor[on_grid] = annuity_factor_table()[
+            rate_index[on_grid].astype(np.intp), month_index[on_grid].astype(np.intp) - 1
+        ]
+    return factor
+
+
+def emi(principal, interest_rate, total_months):
+    """Monthly instalment for loan amounts, annual rates (%) and tenures (months)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.asarray(principal, dtype=np.float64) / annuity_factor(interest_rate, total_months)
+
+
+def max_loan(monthly_emi, interest_rate, total_months):
+    """Largest loan a monthly instalment can service at the given rate and tenure"""
+    return np.asarray(monthly_emi, dtype=np.float64) * annuity_factor(interest_rate, total_months)
+
+
+def npv(rate, cash_flows):
+    """
+    Net present value of cash-flow series at a per-period rate
+
+    Args:
+        rate: Per-period discount rate as a fraction (scalar or one per series)
+        cash_flows (array): Flows of shape (..., periods); the first period is undiscounted
+
+    Returns:
+        array: NPV per series
+    """
+    cash_flows = np.asarray(cash_flows, dtype=np.float64)
+    discount = (1 + np.asarray(rate, dtype=np.float64)[..., None]) ** -np.arange(cash_flows.shape[-1])
+    return (cash_flows * discount).sum(axis=-1)
+
+
+def _npv_and_derivative(periods, x):
+    """NPV and dNPV/dx in x = 1/(1+r); `periods` is latest-first"""
+    n_periods, n_series = periods.shape
+    if n_series <= DENSE_NPV_MAX_SERIES:
+        # Few series: explicit powers beat one Python-level Horner step per period
+        exponents = np.arange(n_periods - 1, -1, -1, dtype=np.float64)[:, None]
+        terms = periods * x ** exponents
+        return terms.sum(axis=0), (terms * exponents).sum(axis=0) / x
+
+    # Many series: Horner's rule, one multiply-add per period across all of them
+    value = periods[0].copy()
+    derivative = np.zeros_like(value)
+    for column in periods[1:]:
+        derivative *= x
+        derivative += value
+        value *= x
+        value += column
+    return value, derivative
+
+
+def _seed_brackets(cash_flows, low, high):
+    """
+    Tightest IRR_SEED_RATES bracket of each series' root, with an interpolated start
+
+    NPV at every seed rate comes from one (series x periods) @ (periods x rates)
+    product; each row takes the first interval, from `low` up, where NPV
+    changes sign (a zero NPV counts as positive).
+
+    Returns:
+        tuple: (bracketed, lower, upper, npv at lower, start) per row
+    """
+    rates = np.array([low] + [r for r in IRR_SEED_RATES if low < r < high] + [high])
+    powers = (1 / (1 + rates))[None, :] ** np.arange(cash_flows.shape[1], dtype=np.float64)[:, None]
+    values = cash_flows @ powers
+    positive = values >= 0
+    flips = positive[:, 1:] != positive[:, :-1]
+    bracketed = flips.any(axis=1)
+    interval = np.argmax(flips, axis=1)
+    rows = np.arange(len(cash_flows))
+    lower, upper = rates[interval], rates[interval + 1]
+    value_lower, value_upper = values[rows, interval], values[rows, interval + 1]
+
+    # Start: inverse cubic interpolation (rate as a cubic in NPV) through the four seed
+    # points around the bracket, or the secant where that leaves the bracket
+    first = np.clip(interval - 1, 0, max(len(rates) - 4, 0))
+    stencil = first[:, None] + np.arange(min(len(rates), 4))
+    known_rates, known_values = rates[stencil], values[rows[:, None], stencil]
+    start = np.zeros(len(cash_flows))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(stencil.shape[1]):
+            weight = known_rates[:, i]
+            for j in range(stencil.shape[1]):
+                if j != i:
+                    weight = weight * known_values[:, j] / (known_values[:, j] - known_values[:, i])
+            start += weight
+        secant = lower - value_lower * (upper - lower) / (value_upper - value_lower)
+    start = np.where(np.isfinite(start) & (start > lower) & (start < upper), start, secant)
+    start = np.where(np.isfinite(start) & (start > lower) & (start < upper), start, (lower + upper) / 2)
+    return bracketed, lower, upper, value_lower, start
+
+
+def irr(cash_flows, guess=None, low=None, high=1.0, tol=1e-10, max_iter=100, full_output=False):
+    """
+    Per-period IRR of every row of a (series x periods) cash-flow matrix
+
+    Every row's NPV is first evaluated at the IRR_SEED_RATES grid in one
+    matrix product, which gives each row a tight sign-change bracket and an
+    interpolated start inside it. A safeguarded Newton iteration then runs on all
+    rows at once: any Newton step that leaves the bracket (or a zero
+    derivative) or that is less than half the step before last falls back
+    to bisection (the rtsafe rule). Rows that have converged drop out of the
+    working set, so the cost tracks the slowest rows only.
+
+    Args:
+        cash_flows (array): Flows of shape (series, periods), first period undiscounted
+        guess (float): Starting per-period rate, used for rows whose seed
+            bracket contains it (default: the interpolated seed)
+        low, high (float): Search bracket for the per-period rate; the default
+            low end is -99%, raised for long series so discounting cannot overflow
+        tol (float): Convergence tolerance on the rate
+        max_iter (int): Iteration cap
+        full_output (bool): Also return convergence flags and iteration counts
+
+    Returns:
+        array: IRR per row (NaN where NPV does not change sign on the bracket),
+            or (irr, converged, iterations) if full_output is True
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    n_series = len(cash_flows)
+    # Latest period first, each period contiguous, for Horner's rule
+    periods = np.ascontiguousarray(cash_flows.T[::-1])
+    if low is None:
+        low = max(-0.99, 10 ** (-150 / len(periods)) - 1)
+
+    bracketed, lower, upper, npv_lower, rate = _seed_brackets(cash_flows, float(low), float(high))
+    if guess is not None:
+        rate = np.where((guess > lower) & (guess < upper), guess, rate)
+    # Last two step sizes per row, for the rtsafe fallback rule
+    step = upper - lower
+    previous_step = step.copy()
+    converged = np.zeros(n_series, dtype=bool)
+    iterations = np.zeros(n_series, dtype=np.int64)
+    lower_sign = npv_lower >= 0
+
+    active = np.flatnonzero(bracketed)
+    # Working copy of the active columns. While most of it is still active the
+    # finished columns ride along (cheaper than copying); it is re-packed once
+    # they are the majority.
+    working, working_ids = periods[:, active], active
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        if len(active) < len(working_ids) // 2:
+            working, working_ids = working[:, np.searchsorted(working_ids, active)], active
+        columns = np.searchsorted(working_ids, active)
+        r, lo, hi = rate[active], lower[active], upper[active]
+        x = 1 / (1 + rate[working_ids])
+        value, derivative = _npv_and_derivative(working, x)
+        value, derivative, x = value[columns], derivative[columns], x[columns]
+
+        # Shrink the bracket around the root
+        same_side = (value >= 0) == lower_sign[active]
+        lo = np.where(same_side, r, lo)
+        hi = np.where(same_side, hi, r)
+
+        # Newton step in r (dx/dr = -x^2), bisection whenever it leaves the bracket or stalls
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = r + value / (derivative * x * x)
+        use_newton = (
+            np.isfinite(newton) & (newton > lo) & (newton < hi) &
+            (2 * np.abs(newton - r) <= np.abs(previous_step[active]))
+        )
+        next_rate = np.where(use_newton, newton, (lo + hi) / 2)
+        # A root hit exactly, or a Newton step below tolerance (which may round onto a bracket end
+        # and fail the safeguard), is final: keep it rather than bisecting away from it
+        with np.errstate(invalid='ignore'):
+            settled = (value == 0) | (np.abs(newton - r) <= tol * (1 + np.abs(r)))
+        next_rate = np.where(settled, np.where(np.isfinite(newton), newton, r), next_rate)
+
+        done = settled | (np.abs(next_rate - r) <= tol * (1 + np.abs(r))) | (hi - lo <= tol)
+        previous_step[active] = step[active]
+        step[active] = np.abs(next_rate - r)
+        rate[active], lower[active], upper[active] = next_rate, lo, hi
+        iterations[active] += 1
+        converged[active[done]] = True
+        active = active[~done]
+
+    result = np.where(bracketed, rate, np.nan)
+    if full_output:
+        return result, converged, iterations
+    return result
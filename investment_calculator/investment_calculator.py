@@ -1,3 +1,6 @@
+from investment_calculator import finance_kernel
+
+
 def calculate_investment_details(price, down_payment_percent, loan_years, interest_rate, monthly_rent, maintenance):
     """
     Calculate comprehensive investment details including EMI, ROI, and loan information
@@ -7,14 +10,8 @@ def calculate_investment_details(price, down_payment_percent, loan_years, intere
     loan_amount = price - down_payment
 
     # 2. Monthly EMI (using standard formula)
-    monthly_interest_rate = interest_rate / (12 * 100)
     total_months = loan_years * 12
-    
-    if monthly_interest_rate > 0:
-        emi = (loan_amount * monthly_interest_rate * (1 + monthly_interest_rate) ** total_months) / \
-              ((1 + monthly_interest_rate) ** total_months - 1)
-    else:
-        emi = loan_amount / total_months  # If no interest
+    emi = float(finance_kernel.emi(loan_amount, interest_rate, total_months))
 
     # 3. Total interest and repayment
     total_payment = emi * total_months
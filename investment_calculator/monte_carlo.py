@@ -0,0 +1,170 @@
+import time
+
+import numpy as np
+
+from investment_calculator import finance_kernel
+from investment_calculator.cash_flow import MAX_HORIZON_YEARS, evaluate_investment
+
+# Stochastic assumptions (annual figures in %, except where noted)
+DEFAULT_ASSUMPTIONS = {
+    'rent_growth_mean': 5.0,
+    'rent_growth_std': 2.5,
+    'appreciation_mean': 6.0,
+    'appreciation_std': 5.0,
+    'rate_shock_std': 0.5,        # yearly change of the floating rate, in % points
+    'rate_floor': 5.0,
+    'rate_cap': 15.0,
+    'turnover_probability': 0.35,  # chance a lease ends in a given year
+    'vacancy_months_mean': 1.75,   # extra vacant months after a turnover (min 1); ~8% vacancy overall
+    'expense_inflation': 5.0
+}
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+DEFAULT_CHUNK_SIZE = 20000
+
+MAX_PATHS = 500_000
+
+
+def _simulate_chunk(rng, n_paths, base, horizon, interest_rate, assumptions):
+    """
+    Simulate one block of paths at yearly resolution
+
+    Every stochastic input (rent growth, rate reset, appreciation) moves
+    once a year and vacancy is counted in whole months, so a path's monthly
+    cash flows are constant within a year apart from its vacant months. The
+    yearly sums below are therefore exact totals of the monthly path; no
+    month-by-month matrix is drawn.
+    """
+    years = int(horizon)
+    total_months = years * 12
+    a = assumptions
+
+    # Rent: yearly growth compounding from the model's starting rent
+    rent_growth = rng.normal(a['rent_growth_mean'], a['rent_growth_std'], (n_paths, years)) / 100
+    rent_growth[:, 0] = 0
+    yearly_rent = base['estimated_monthly_rent'] * np.cumprod(1 + rent_growth, axis=1)
+
+    # Vacancy spells: a lease turnover leaves the flat empty for whole months
+    turnover = rng.random((n_paths, years)) < a['turnover_probability']
+    spell = np.minimum(1 + rng.poisson(a['vacancy_months_mean'], (n_paths, years)), 12)
+    occupied_months = 12 - np.where(turnover, spell, 0)
+
+    # Floating rate resets once a year as a bounded random walk
+    rate_shocks = rng.normal(0, a['rate_shock_std'], (n_paths, years))
+    rate_shocks[:, 0] = 0
+    rates = np.clip(interest_rate + np.cumsum(rate_shocks, axis=1), a['rate_floor'], a['rate_cap'])
+
+    # EMI is re-sized at every reset over the remaining tenure
+    balance = np.full(n_paths, base['loan_amount'])
+    yearly_emi = np.empty((n_paths, years))
+    year_end_balance = np.empty((n_paths, years))
+    for year in range(years):
+        r = rates[:, year] / 1200
+        emi = finance_kernel.emi(balance, rates[:, year], total_months - 12 * year)
+        growth_12 = (1 + r) ** 12
+        # Sum of 12 compounded instalments; at a zero rate the limit is simply 12 EMIs
+        with np.errstate(divide='ignore', invalid='ignore'):
+            paid = np.where(r != 0, (growth_12 - 1) / r, 12.0)
+        balance = np.maximum(balance * growth_12 - emi * paid, 0)
+        yearly_emi[:, year] = emi
+        year_end_balance[:, year] = balance
+
+    # Running costs (everything except vacancy, which is simulated above)
+    fixed_expenses = (
+        base['monthly_basic_maintenance'] + base['monthly_property_tax'] +
+        base['monthly_insurance'] + base['monthly_society_maintenance']
+    )
+    expense_growth = (1 + a['expense_inflation'] / 100) ** np.arange(years)
+
+    # Rent, EMI and costs are flat within a year, so the monthly path sums in closed form
+    annual_cash_flow = (
+        yearly_rent * occupied_months
+        - 12 * yearly_emi
+        - 12 * fixed_expenses * expense_growth
+    )
+
+    # Property value and equity at each year end
+    appreciation = rng.normal(a['appreciation_mean'], a['appreciation_std'], (n_paths, years)) / 100
+    property_value = base['property_price'] * np.cumprod(1 + appreciation, axis=1)
+    equity = property_value - year_end_balance
+
+    # IRR on the down payment, selling at the end of the horizon
+    flows = np.column_stack([np.full(n_paths, -base['down_payment']), annual_cash_flow])
+    flows[:, -1] += equity[:, -1]
+    irr = finance_kernel.irr(flows)
+
+    return annual_cash_flow, equity, irr
+
+
+def simulate_investment(locality_stats, budget, horizon, down_payment_percent=20, interest_rate=8.5,
+                        n_paths=100000, seed=None, assumptions=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Monte Carlo simulation of the investment's cash-flow paths, aggregated per year
+
+    Args:
+        locality_stats (dict): Output of PropTechMLService.get_locality_stats
+        budget (float): Property price in lakhs
+        horizon (int): Loan tenure / holding period in years (1 to MAX_HORIZON_YEARS)
+        down_payment_percent (float): Down payment as % of price
+        interest_rate (float): Starting annual interest rate in %
+        n_paths (int): Number of simulated paths
+        seed (int): Seed for reproducible runs
+        assumptions (dict): Overrides for DEFAULT_ASSUMPTIONS
+        chunk_size (int): Paths simulated per array block (bounds memory use)
+
+    Returns:
+        dict: Percentile bands for cash flow, equity and IRR
+    """
+    start = time.perf_counter()
+    assumptions = {**DEFAULT_ASSUMPTIONS, **(assumptions or {})}
+    years = int(horizon)
+    if years < 1 or n_paths < 1:
+        raise ValueError("horizon and n_paths must be at least 1")
+    if years > MAX_HORIZON_YEARS:
+        raise ValueError(f"horizon cannot exceed {MAX_HORIZON_YEARS} years")
+
+    base = {name: value.item() for name, value in evaluate_investment(
+        locality_stats, budget, years, down_payment_percent, interest_rate
+    ).items()}
+
+    rng = np.random.default_rng(seed)
+    annual_cash_flow = np.empty((n_paths, years))
+    equity = np.empty((n_paths, years))
+    irr = np.empty(n_paths)
+    for offset in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - offset)
+        block = slice(offset, offset + size)
+        annual_cash_flow[block], equity[block], irr[block] = _simulate_chunk(
+            rng, size, base, years, interest_rate, assumptions
+        )
+
+    def bands(values, scale=1.0):
+        levels = np.percentile(np.ascontiguousarray(values.T), PERCENTILES, axis=1) * scale
+        return {f"p{p}": np.round(level, 2).tolist() for p, level in zip(PERCENTILES, levels)}
+
+    valid_irr = irr[~np.isnan(irr)] * 100
+    irr_summary = {'defined_share': round(len(valid_irr) / n_paths, 4)}
+    if len(valid_irr):
+        irr_summary.update({
+            'mean': round(float(valid_irr.mean()), 2),
+            **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(valid_irr, PERCENTILES))}
+        })
+
+    elapsed = time.perf_counter() - start
+    return {
+        'paths': n_paths,
+        'seed': seed,
+        'horizon': years,
+        'years': list(range(1, years + 1)),
+        'percentiles': PERCENTILES,
+        'monthly_cash_flow': bands(annual_cash_flow, 1 / 12),
+        'annual_cash_flow': bands(annual_cash_flow),
+        'equity_lakhs': bands(equity, 1 / 100000),
+        'irr_percent': irr_summary,
+        'probability_negative_first_year': round(float((annual_cash_flow[:, 0] < 0).mean()), 4),
+        'probability_loss': round(float((irr < 0).mean()), 4),
+        'assumptions': assumptions,
+        'elapsed_seconds': round(elapsed, 3),
+        'paths_per_second': round(n_paths / elapsed)
+    }
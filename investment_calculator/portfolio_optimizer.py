@@ -0,0 +1,181 @@
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from investment_calculator.cash_flow import evaluate_investment
+from investment_calculator.monte_carlo import DEFAULT_ASSUMPTIONS
+
+FRONTIER_POINTS = 10
+
+# Expected yearly price growth in %, the mean the Monte Carlo simulation draws around
+DEFAULT_APPRECIATION_PERCENT = DEFAULT_ASSUMPTIONS['appreciation_mean']
+
+
+def locality_universe(summary, down_payment_percent=20, interest_rate=8.5, horizon=20,
+                      appreciation_percent=DEFAULT_APPRECIATION_PERCENT):
+    """
+    Per-locality investment figures for one typical property in each locality
+
+    Args:
+        summary (DataFrame): ml_service.data['summary'] (locality-level aggregates)
+        down_payment_percent (float): Down payment as % of price (100 = all cash)
+        interest_rate (float): Annual interest rate in %
+        horizon (int): Loan tenure in years
+        appreciation_percent (float): Expected yearly price growth in %
+
+    Returns:
+        dict: Arrays aligned with 'localities'
+    """
+    summary = summary.dropna(subset=['price_lakh_mean', 'rent_mean'])
+    summary = summary[summary['price_lakh_mean'] > 0]
+    stats = {
+        'locality': summary['locality'].to_numpy(),
+        'avg_price': summary['price_lakh_mean'].to_numpy(dtype=np.float64),
+        'avg_rent': summary['rent_mean'].to_numpy(dtype=np.float64),
+        'roi_range': {'min': summary['roi_min'].to_numpy(dtype=np.float64),
+                      'max': summary['roi_max'].to_numpy(dtype=np.float64)},
+        'avg_rate_sqft': summary['rate_sqft_mean'].fillna(10000).to_numpy(dtype=np.float64)
+    }
+    # The locality arrays broadcast through the model just like the financing inputs
+    result = evaluate_investment(stats, stats['avg_price'], horizon, down_payment_percent, interest_rate)
+
+    return {
+        'localities': summary['locality'].to_numpy(),
+        'price_lakhs': stats['avg_price'],
+        'avg_roi': summary['roi_mean'].to_numpy(dtype=np.float64),
+        'cash_required': result['down_payment'],
+        'monthly_cash_flow': result['monthly_cash_flow'],
+        'annual_cash_flow': result['annual_cash_flow'],
+        # Cash flow after EMIs plus the year's expected gain in property value
+        'annual_total_return': result['annual_cash_flow'] + result['property_price'] * appreciation_percent / 100,
+        'net_annual_income': result['net_annual_income'],
+        'risk_score': result['risk_score'].astype(np.float64)
+    }
+
+
+def _solve(universe, budget, max_properties, risk_ceiling, min_monthly_cash_flow):
+    """Integer counts per locality maximising annual total return, or None if infeasible"""
+    cost = universe['cash_required']
+    rows, lower, upper = [cost], [0], [budget]
+    if min_monthly_cash_flow is not None:
+        rows.append(universe['monthly_cash_flow'])
+        lower.append(min_monthly_cash_flow)
+        upper.append(np.inf)
+    if risk_ceiling is not None:
+        # Cash-weighted average risk <= ceiling, kept linear
+        rows.append((universe['risk_score'] - risk_ceiling) * cost)
+        lower.append(-np.inf)
+        upper.append(0)
+
+    solution = milp(
+        c=-universe['annual_total_return'],
+        constraints=LinearConstraint(np.vstack(rows), lower, upper),
+        integrality=np.ones(len(cost)),
+        bounds=Bounds(0, max_properties),
+        options={"disp": False}
+    )
+    if solution.x is None:
+        return None
+    return np.rint(solution.x).astype(np.int64)
+
+
+def _portfolio_metrics(universe, counts):
+    invested = float(counts @ universe['cash_required'])
+    total_return = float(counts @ universe['annual_total_return'])
+    return {
+        'properties': int(counts.sum()),
+        'cash_invested_lakhs': round(invested / 100000, 2),
+        'property_value_lakhs': round(float(counts @ universe['price_lakhs']), 2),
+        'net_annual_income': round(float(counts @ universe['net_annual_income']), 2),
+        'monthly_cash_flow': round(float(counts @ universe['monthly_cash_flow']), 2),
+        'annual_cash_flow': round(float(counts @ universe['annual_cash_flow']), 2),
+        'annual_total_return': round(total_return, 2),
+        'return_on_cash': round(total_return / invested * 100, 2) if invested else 0.0,
+        'risk_score': round(float(counts @ (universe['risk_score'] * universe['cash_required'])) / invested, 1)
+                      if invested else None
+    }
+
+
+def optimize_portfolio(summary, budget_lakhs, max_per_locality=2, max_locality_share=0.5,
+                       min_monthly_cash_flow=None, risk_ceiling=None, down_payment_percent=20,
+                       interest_rate=8.5, horizon=20, appreciation_percent=DEFAULT_APPRECIATION_PERCENT,
+                       frontier_points=FRONTIER_POINTS):
+    """
+    Select a multi-property portfolio across localities
+
+    Solved as an integer knapsack (one typical property per locality unit)
+    with HiGHS: maximise annual total return (cash flow after EMIs and
+    expenses plus expected appreciation) subject to the cash budget, a
+    per-locality cap (count and share of budget), a minimum combined
+    monthly cash flow and a ceiling on cash-weighted risk. EMIs count
+    against the objective, so leverage is only taken on where appreciation
+    and rent outweigh its cost. The efficient frontier re-solves the same
+    problem over a sweep of risk ceilings.
+
+    Args:
+        summary (DataFrame): ml_service.data['summary']
+        budget_lakhs (float): Cash available (down payments), in lakhs
+        max_per_locality (int): Most properties to buy in one locality
+        max_locality_share (float): Most of the budget to put in one locality
+        min_monthly_cash_flow (float): Floor on the portfolio's monthly cash flow (₹)
+        risk_ceiling (float): Cap on cash-weighted risk score (15-85)
+        down_payment_percent, interest_rate, horizon: Financing of each property
+        appreciation_percent (float): Expected yearly price growth in %
+        frontier_points (int): Risk ceilings on the efficient frontier (0 to skip)
+
+    Returns:
+        dict: Allocation, portfolio metrics and efficient frontier
+    """
+    if budget_lakhs <= 0:
+        raise ValueError("Budget must be positive")
+
+    universe = locality_universe(summary, down_payment_percent, interest_rate, horizon, appreciation_percent)
+    budget = budget_lakhs * 100000
+
+    # Per-locality cap: count limit and share-of-budget limit, whichever binds first
+    share_cap = np.floor(max_locality_share * budget / universe['cash_required'])
+    max_properties = np.minimum(max_per_locality, share_cap)
+
+    counts = _solve(universe, budget, max_properties, risk_ceiling, min_monthly_cash_flow)
+    if counts is None:
+        return {"error": "No portfolio satisfies the constraints"}
+
+    chosen = np.flatnonzero(counts)
+    allocation = [{
+        'locality': str(universe['localities'][i]).title(),
+        'properties': int(counts[i]),
+        'price_lakhs': round(float(universe['price_lakhs'][i]), 2),
+        'cash_lakhs': round(float(counts[i] * universe['cash_required'][i]) / 100000, 2),
+        'monthly_cash_flow': round(float(counts[i] * universe['monthly_cash_flow'][i]), 2),
+        'risk_score': float(universe['risk_score'][i])
+    } for i in chosen[np.argsort(-counts[chosen] * universe['cash_required'][chosen])]]
+
+    frontier = []
+    if frontier_points:
+        risks = universe['risk_score'][max_properties > 0]
+        if len(risks):
+            for ceiling in np.unique(np.linspace(risks.min(), risks.max(), frontier_points).round(1)):
+                point_counts = _solve(universe, budget, max_properties, ceiling, min_monthly_cash_flow)
+                if point_counts is None or not point_counts.any():
+                    continue
+                point = _portfolio_metrics(universe, point_counts)
+                # A looser ceiling that picks the same portfolio adds nothing to the frontier
+                if frontier and frontier[-1]['annual_total_return'] == point['annual_total_return']:
+                    continue
+                frontier.append({'risk_ceiling': float(ceiling), **point})
+
+    return {
+        'budget_lakhs': budget_lakhs,
+        'constraints': {
+            'max_per_locality': max_per_locality,
+            'max_locality_share': max_locality_share,
+            'min_monthly_cash_flow': min_monthly_cash_flow,
+            'risk_ceiling': risk_ceiling,
+            'down_payment_percent': down_payment_percent,
+            'interest_rate': interest_rate,
+            'appreciation_percent': appreciation_percent
+        },
+        'allocation': allocation,
+        'portfolio': _portfolio_metrics(universe, counts),
+        'cash_reserve_lakhs': round((budget - float(counts @ universe['cash_required'])) / 100000, 2),
+        'efficient_frontier': frontier
+    }
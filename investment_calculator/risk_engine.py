@@ -0,0 +1,152 @@
+import numpy as np
+
+# Score ladders as (breaks, points): np.digitize(value, breaks, right) indexes into points.
+# Missing values (NaN) always take the worst score of their ladder.
+CASH_FLOW_RISK = ([-10000, -5000, 0, 5000], [35, 25, 15, 5, 0], False)  # ₹ per month
+ROI_RISK = ([3, 6, 10, 15], [30, 20, 10, 5, 0], False)                # cash-on-cash ROI %
+MARKET_RISK = ([3, 5, 7], [0, 8, 15, 25], True)                       # spread of locality ROI, % points
+VALUE_RISK = ([1.2, 1.5], [0, 5, 10], True)                           # price / locality average price
+
+# Investment score: base plus weighted ladders, adjusted for risk tolerance and clamped
+INVESTMENT_BASE_RISK = 25
+INVESTMENT_RISK_WEIGHTS = {'cash_flow': 0.35, 'roi': 0.30, 'market': 0.25, 'value': 0.10}
+INVESTMENT_RISK_BOUNDS = (15, 85)
+RISK_TOLERANCE_ADJUSTMENTS = {'low': 1.15, 'medium': 1.0, 'high': 0.85}
+
+# Locality score: the ladders below, each scaled to 0-1, weighted and mapped onto 10-90
+YIELD_RISK = ([2, 3, 4], [30, 20, 10, 0], False)         # average gross rental yield %
+PRICE_LEVEL_RISK = ([1.0, 1.5, 2.5], [0, 5, 10, 20], True)  # average price / median locality price
+DISPERSION_RISK = ([0.25, 0.5], [0, 10, 20], True)        # coefficient of variation of prices
+LOCALITY_RISK_WEIGHTS = {'market_risk': 0.30, 'yield_risk': 0.30, 'price_risk': 0.20, 'dispersion_risk': 0.20}
+LOCALITY_RISK_BOUNDS = (10, 90)
+RISK_LEVELS = ([30, 50, 70], ['Low', 'Moderate', 'High', 'Very High'])
+
+
+def ladder_score(values, ladder):
+    """Points of a (breaks, points, right) ladder for scalars or arrays"""
+    breaks, points, right = ladder
+    values = np.asarray(values, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64)
+    return np.where(np.isnan(values), points.max(), points[np.digitize(values, breaks, right=right)])
+
+
+def round_like_python(values, decimals):
+    """
+    np.round that matches Python's round() on every element
+
+    np.round scales by 10**decimals first, which can turn a value just
+    below a .5 boundary into an exact tie; only those ties are re-rounded
+    with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+    scaled = values * 10 ** decimals
+    ties = scaled - np.floor(scaled) == 0.5
+    if ties.any():
+        rounded, ties = np.array(rounded).reshape(-1), ties.reshape(-1)
+        rounded[ties] = [round(float(value), decimals) for value in values.reshape(-1)[ties]]
+        rounded = rounded.reshape(values.shape)
+    return rounded
+
+
+def market_risk(roi_range):
+    """Market risk points from the spread between a locality's highest and lowest ROI"""
+    return ladder_score(roi_range, MARKET_RISK)
+
+
+def realistic_risk_score(stats, monthly_cash_flow, roi, risk_tolerance, property_price):
+    """
+    Vectorized risk score (15-85) for real estate investments
+
+    The market component is read from stats['market_risk'] when the
+    locality stats already carry it (see locality_risk_frame).
+    """
+    if 'market_risk' in stats:
+        market = np.asarray(stats['market_risk'], dtype=np.float64)
+    else:
+        market = market_risk(np.asarray(stats['roi_range']['max']) - np.asarray(stats['roi_range']['min']))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_ratio = property_price / (np.asarray(stats['avg_price']) * 100000)
+
+    weights = INVESTMENT_RISK_WEIGHTS
+    total_risk = (
+        INVESTMENT_BASE_RISK +
+        ladder_score(monthly_cash_flow, CASH_FLOW_RISK) * weights['cash_flow'] +
+        ladder_score(roi, ROI_RISK) * weights['roi'] +
+        market * weights['market'] +
+        ladder_score(price_ratio, VALUE_RISK) * weights['value']
+    )
+
+    # Risk tolerance adjustment
+    final_risk = total_risk * RISK_TOLERANCE_ADJUSTMENTS.get(risk_tolerance, 1.0)
+
+    return np.clip(round_like_python(final_risk, 1), *INVESTMENT_RISK_BOUNDS)
+
+
+def risk_level(score):
+    """'Low' / 'Moderate' / 'High' / 'Very High' for scalar or array locality scores"""
+    breaks, labels = RISK_LEVELS
+    return np.asarray(labels)[np.digitize(score, breaks, right=True)]
+
+
+def locality_risk_frame(summary):
+    """
+    Risk components, score, level and rank of every locality in one pass
+
+    Args:
+        summary (DataFrame): ml_service.data['summary'] (locality-level aggregates)
+
+    Returns:
+        DataFrame: A copy of the summary with market_risk, yield_risk,
+            price_risk, dispersion_risk, risk_score (10-90), risk_level and
+            risk_rank (1 = lowest risk) columns
+    """
+    frame = summary.copy()
+    if frame.empty:
+        return frame.assign(market_risk=[], yield_risk=[], price_risk=[], dispersion_risk=[],
+                            risk_score=[], risk_level=[], risk_rank=[])
+
+    price = frame['price_lakh_mean'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_level = price / np.nanmedian(price)
+        dispersion = frame['price_lakh_std'].fillna(0).to_numpy(dtype=np.float64) / price
+
+    components = {
+        'market_risk': (market_risk(frame['roi_max'] - frame['roi_min']), MARKET_RISK),
+        'yield_risk': (ladder_score(frame['roi_mean'], YIELD_RISK), YIELD_RISK),
+        'price_risk': (ladder_score(price_level, PRICE_LEVEL_RISK), PRICE_LEVEL_RISK),
+        'dispersion_risk': (ladder_score(dispersion, DISPERSION_RISK), DISPERSION_RISK)
+    }
+
+    weighted = np.zeros(len(frame))
+    for name, (points, ladder) in components.items():
+        frame[name] = points
+        weighted += LOCALITY_RISK_WEIGHTS[name] * points / max(ladder[1])
+
+    low, high = LOCALITY_RISK_BOUNDS
+    frame['risk_score'] = np.round(low + (high - low) * weighted, 1)
+    frame['risk_level'] = risk_level(frame['risk_score'].to_numpy())
+    frame['risk_rank'] = frame['risk_score'].rank(method='min').astype(int)
+    return frame
+
+
+def risk_leaderboard(risk_frame, riskiest_first=False, limit=None):
+    """
+    Localities ordered by risk score from a locality_risk_frame()
+
+    Returns:
+        list: One dict per locality with its score, level, rank and components
+    """
+    ordered = risk_frame.sort_values(['risk_score', 'roi_mean'], ascending=[not riskiest_first, riskiest_first])
+    if limit:
+        ordered = ordered.head(limit)
+    return [{
+        'locality': row.locality.title(),
+        'risk_score': float(row.risk_score),
+        'risk_level': row.risk_level,
+        'risk_rank': int(row.risk_rank),
+        'avg_roi': round(float(row.roi_mean), 2),
+        'avg_price': round(float(row.price_lakh_mean), 2),
+        'components': {name: float(getattr(row, name)) for name in LOCALITY_RISK_WEIGHTS}
+    } for row in ordered.itertuples(index=False)]
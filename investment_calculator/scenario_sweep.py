@@ -0,0 +1,141 @@
+import numpy as np
+
+from investment_calculator.cash_flow import MAX_HORIZON_YEARS, evaluate_investment, investment_returns
+from investment_calculator.tax import DEFAULT_TAX_REGIME, after_tax_summary
+
+# Order of the grid dimensions in every returned matrix
+SWEEP_AXES = ['budget', 'horizon', 'down_payment_percent', 'interest_rate']
+
+SWEEP_METRICS = ['monthly_emi', 'monthly_cash_flow', 'annual_roi', 'break_even_years', 'risk_score']
+
+# IRR/NPV need a monthly cash-flow series per scenario, so they are opt-in and capped lower
+SWEEP_RETURN_METRICS = ['irr', 'npv']
+
+# Averages over the years held of the year-wise after-tax cash flows; need the investor's income
+SWEEP_TAX_METRICS = ['after_tax_annual_cash_flow', 'annual_tax_impact']
+
+MAX_SCENARIOS = 1_000_000
+MAX_RETURN_SCENARIOS = 200_000
+
+
+def parse_axis(spec, default):
+    """
+    Turn an axis specification into a 1-D array of values
+
+    Accepts a single number, a list of values, {"start", "stop", "step"}
+    (stop inclusive) or {"min", "max", "num"}. Range lengths are checked
+    against MAX_SCENARIOS before the axis is built.
+
+    Raises:
+        ValueError: Empty, non-finite or over-long axis
+    """
+    if spec is None:
+        return np.atleast_1d(np.asarray(default, dtype=np.float64))
+    if isinstance(spec, dict):
+        if 'num' in spec:
+            bounds = [float(spec['min']), float(spec['max']), float(spec['num'])]
+        else:
+            bounds = [float(spec['start']), float(spec['stop']), float(spec['step'])]
+        if not np.isfinite(bounds).all():
+            raise ValueError("axis bounds must be finite")
+
+        if 'num' in spec:
+            low, high, num = bounds
+            _check_axis_length(int(num))
+            return np.linspace(low, high, int(num))
+        start, stop, step = bounds
+        if step <= 0:
+            raise ValueError("step must be positive")
+        # Same values as np.arange(start, stop + step / 2, step), sized before allocating
+        length = int(np.floor((stop - start) / step + 0.5)) + 1 if stop >= start else 0
+        _check_axis_length(length)
+        return start + np.arange(length) * step
+    values = np.atleast_1d(np.asarray(spec, dtype=np.float64))
+    _check_axis_length(values.size)
+    return values
+
+
+def _check_axis_length(length):
+    if length < 1:
+        raise ValueError("each axis needs at least one value")
+    if length > MAX_SCENARIOS:
+        raise ValueError(f"an axis may have at most {MAX_SCENARIOS:,} values, got {length:,}")
+
+
+def sweep_scenarios(locality_stats, budgets, horizons, down_payment_percents, interest_rates,
+                    risk_tolerance='medium', include_returns=False, appreciation_percent=0.0,
+                    annual_income=None, tax_regime=DEFAULT_TAX_REGIME):
+    """
+    Evaluate the investment model on the full cartesian grid of inputs
+
+    Each axis is laid along its own dimension so NumPy broadcasting builds the
+    whole grid in one pass, without materialising the input combinations.
+    With include_returns, IRR (% per year) and NPV (₹) are solved for every
+    scenario as well; with annual_income, the after-tax metrics are added.
+
+    Returns:
+        dict: Axis values plus one array of shape
+            (len(budgets), len(horizons), len(down_payment_percents), len(interest_rates))
+            per metric
+    """
+    axes = [np.asarray(values, dtype=np.float64) for values in
+            (budgets, horizons, down_payment_percents, interest_rates)]
+    n_scenarios = int(np.prod([len(values) for values in axes]))
+    if n_scenarios > MAX_SCENARIOS:
+        raise ValueError(f"Too many scenarios ({n_scenarios:,}); the limit is {MAX_SCENARIOS:,}")
+    if include_returns and n_scenarios > MAX_RETURN_SCENARIOS:
+        raise ValueError(f"IRR/NPV are limited to {MAX_RETURN_SCENARIOS:,} scenarios, got {n_scenarios:,}")
+    if annual_income is not None and n_scenarios > MAX_RETURN_SCENARIOS:
+        raise ValueError(f"After-tax metrics are limited to {MAX_RETURN_SCENARIOS:,} scenarios, got {n_scenarios:,}")
+    if (axes[1] <= 0).any():
+        raise ValueError("Horizons must be positive")
+    if (axes[2] <= 0).any() or (axes[2] > 100).any():
+        raise ValueError("Down payments must be above 0 and at most 100 percent")
+    if (axes[1] > MAX_HORIZON_YEARS).any():
+        raise ValueError(f"Horizons cannot exceed {MAX_HORIZON_YEARS} years")
+
+    shaped = [values.reshape([-1 if i == axis else 1 for i in range(len(axes))])
+              for axis, values in enumerate(axes)]
+    result = evaluate_investment(locality_stats, *shaped, risk_tolerance=risk_tolerance)
+
+    metrics = {
+        'monthly_emi': result['emi'],
+        'monthly_cash_flow': result['monthly_cash_flow'],
+        'annual_roi': result['roi_on_cash_invested'],
+        'break_even_years': result['break_even_years'],
+        'risk_score': result['risk_score']
+    }
+    if include_returns:
+        returns = investment_returns(result, appreciation_percent)
+        metrics['irr'] = returns['irr']
+        metrics['npv'] = returns['npv']
+    if annual_income is not None:
+        metrics.update(after_tax_summary(result, annual_income, tax_regime))
+
+    return {
+        'axes': dict(zip(SWEEP_AXES, axes)),
+        'shape': result['emi'].shape,
+        'metrics': metrics
+    }
+
+
+def summarize_sweep(sweep):
+    """Best-ROI scenario and cash-flow coverage of a sweep"""
+    roi = sweep['metrics']['annual_roi']
+    best = np.unravel_index(np.nanargmax(roi), roi.shape)
+    return {
+        'scenarios': int(roi.size),
+        'best_roi_scenario': {
+            **{axis: float(sweep['axes'][axis][i]) for axis, i in zip(SWEEP_AXES, best)},
+            **{metric: None if np.isnan(values[best]) else float(values[best])
+               for metric, values in sweep['metrics'].items()}
+        },
+        'positive_cash_flow_share': round(float((sweep['metrics']['monthly_cash_flow'] >= 0).mean()), 4)
+    }
+
+
+def to_json_matrix(values, decimals=2):
+    """Nested lists for JSON, with NaN mapped to None"""
+    rounded = np.round(values, decimals).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
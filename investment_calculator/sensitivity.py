@@ -0,0 +1,80 @@
+import numpy as np
+
+# Inputs perturbed for the tornado chart: label, unit, low/high shift around the base value, valid range
+SENSITIVITY_INPUTS = {
+    'interest_rate': {'label': 'Interest rate', 'unit': '%', 'delta': 1.0, 'bounds': (0, None)},
+    'rent_multiplier': {'label': 'Rent', 'unit': 'x', 'delta': 0.10, 'bounds': (0, None)},
+    'vacancy_rate': {'label': 'Vacancy', 'unit': 'share', 'delta': 0.04, 'bounds': (0, 1)},
+    'maintenance_multiplier': {'label': 'Maintenance', 'unit': 'x', 'delta': 0.20, 'bounds': (0, None)},
+    'appreciation_percent': {'label': 'Appreciation', 'unit': '%', 'delta': 2.0, 'bounds': (None, None)}
+}
+
+# Model outputs a tornado is reported for
+TORNADO_METRICS = {
+    'monthly_cash_flow': 'Monthly cash flow (₹)',
+    'roi_on_cash_invested': 'Cash-on-cash ROI (%)',
+    'irr': 'IRR (%)'
+}
+
+
+def perturbation_batch(base_inputs, inputs=SENSITIVITY_INPUTS):
+    """
+    One array per input covering the base case and every one-at-a-time shift
+
+    Row 0 is the base case; rows 2i+1 and 2i+2 move input i down and up by
+    its delta while every other input stays at its base value. Evaluating
+    the model once on these arrays yields the whole tornado.
+
+    Args:
+        base_inputs (dict): Base value of every input in `inputs`
+        inputs (dict): Perturbation spec, as SENSITIVITY_INPUTS
+
+    Returns:
+        dict: name -> array of 1 + 2 * len(inputs) values
+    """
+    n_rows = 1 + 2 * len(inputs)
+    batch = {}
+    for i, (name, spec) in enumerate(inputs.items()):
+        values = np.full(n_rows, float(base_inputs[name]))
+        values[2 * i + 1] -= spec['delta']
+        values[2 * i + 2] += spec['delta']
+        low, high = spec['bounds']
+        batch[name] = np.clip(values, low, high) if low is not None or high is not None else values
+    return batch
+
+
+def tornado_chart(outputs, batch, inputs=SENSITIVITY_INPUTS, metrics=TORNADO_METRICS):
+    """
+    Tornado data from model outputs evaluated on a perturbation_batch()
+
+    Args:
+        outputs (dict): Output arrays aligned with the batch rows
+        batch (dict): The perturbation_batch() the outputs were evaluated on
+
+    Returns:
+        dict: Per metric, the base value and one bar per input (largest swing first)
+    """
+    chart = {}
+    for metric, label in metrics.items():
+        values = np.asarray(outputs[metric], dtype=np.float64)
+        bars = []
+        for i, name in enumerate(inputs):
+            low, high = values[2 * i + 1], values[2 * i + 2]
+            if not (np.isfinite(low) and np.isfinite(high)):
+                continue
+            bars.append({
+                'input': name,
+                'label': inputs[name]['label'],
+                'low_input': round(float(batch[name][2 * i + 1]), 4),
+                'high_input': round(float(batch[name][2 * i + 2]), 4),
+                'low': round(float(low), 2),
+                'high': round(float(high), 2),
+                'swing': round(float(abs(high - low)), 2)
+            })
+        base = values[0]
+        chart[metric] = {
+            'label': label,
+            'base': round(float(base), 2) if np.isfinite(base) else None,
+            'bars': sorted(bars, key=lambda bar: bar['swing'], reverse=True)
+        }
+    return chart
@@ -0,0 +1,185 @@
+import numpy as np
+
+from investment_calculator.amortization import yearly_breakdown
+
+# Income-tax treatment of a let-out property (FY 2025-26), as data. Per regime:
+#   slabs: (upper limit of the slab in ₹, rate), the last limit None = no limit
+#   rebate: section 87A rebate for taxable income up to income_limit; with marginal_relief, tax just
+#           above the limit never exceeds the income above it
+#   rent_standard_deduction: section 24(a) deduction, share of net annual value
+#   loss_set_off_cap: house-property loss (mostly loan interest) that may reduce other income each year
+#   loss_carry_forward_years: years an unabsorbed loss may be set off against later rental income
+#   principal_deduction_cap: section 80C cap; loan principal shares it with other 80C investments
+# Surcharge on incomes above ₹50 lakh is not modelled.
+TAX_REGIMES = {
+    'new': {
+        'slabs': [(400000, 0.0), (800000, 0.05), (1200000, 0.10), (1600000, 0.15), (2000000, 0.20),
+                  (2400000, 0.25), (None, 0.30)],
+        'rebate': {'income_limit': 1200000, 'max_rebate': 60000, 'marginal_relief': True},
+        'cess_rate': 0.04,
+        'rent_standard_deduction': 0.30,
+        'loss_set_off_cap': 0,
+        'loss_carry_forward_years': 0,
+        'principal_deduction_cap': 0
+    },
+    'old': {
+        'slabs': [(250000, 0.0), (500000, 0.05), (1000000, 0.20), (None, 0.30)],
+        'rebate': {'income_limit': 500000, 'max_rebate': 12500, 'marginal_relief': False},
+        'cess_rate': 0.04,
+        'rent_standard_deduction': 0.30,
+        'loss_set_off_cap': 200000,
+        'loss_carry_forward_years': 8,
+        'principal_deduction_cap': 150000
+    }
+}
+
+DEFAULT_TAX_REGIME = 'new'
+
+TAX_CHUNK_SIZE = 20000  # scenarios per block in after_tax_summary()
+
+
+def get_regime(regime):
+    """Regime configuration by name (or a configuration dict passed through)"""
+    if isinstance(regime, dict):
+        return regime
+    if regime not in TAX_REGIMES:
+        raise ValueError(f"tax regime must be one of {', '.join(TAX_REGIMES)}")
+    return TAX_REGIMES[regime]
+
+
+def slab_tax(taxable_income, regime=DEFAULT_TAX_REGIME):
+    """Income tax including rebate and cess, for scalar or array taxable incomes (₹)"""
+    config = get_regime(regime)
+    upper = np.array([np.inf if limit is None else limit for limit, _ in config['slabs']], dtype=np.float64)
+    lower = np.concatenate([[0.0], upper[:-1]])
+    rates = np.array([rate for _, rate in config['slabs']])
+
+    income = np.maximum(np.asarray(taxable_income, dtype=np.float64), 0)
+    tax = (np.clip(income[..., None] - lower, 0, upper - lower) * rates).sum(axis=-1)
+    limit = config['rebate']['income_limit']
+    tax = tax - np.where(income <= limit, np.minimum(tax, config['rebate']['max_rebate']), 0)
+    if config['rebate']['marginal_relief']:
+        tax = np.where(income > limit, np.minimum(tax, income - limit), tax)
+    return tax * (1 + config['cess_rate'])
+
+
+def house_property_income(net_annual_value, interest, regime=DEFAULT_TAX_REGIME):
+    """
+    Year-by-year taxable house-property income after loss set-off and carry-forward
+
+    A loss (interest above the rent after the standard deduction) reduces
+    other income up to the set-off cap; the excess is carried forward and
+    only offsets later rental income, expiring after the carry-forward years.
+    The only loop is over years; all scenarios move together.
+
+    Args:
+        net_annual_value (array): Rent received less municipal taxes, shape (..., years)
+        interest (array): Loan interest paid, same shape
+
+    Returns:
+        tuple: (income counted towards total income, loss carried forward at each year end)
+    """
+    config = get_regime(regime)
+    income = net_annual_value * (1 - config['rent_standard_deduction']) - interest
+    cap = config['loss_set_off_cap']
+    carry_years = config['loss_carry_forward_years']
+
+    counted = np.empty_like(income)
+    carried_total = np.zeros_like(income)
+    carried = np.zeros(income.shape[:-1] + (carry_years,))  # oldest loss first
+    for year in range(income.shape[-1]):
+        current = income[..., year]
+        if carry_years:
+            # Earlier losses absorb this year's rental income, oldest first
+            remaining = np.maximum(current, 0)
+            for vintage in range(carry_years):
+                used = np.minimum(carried[..., vintage], remaining)
+                carried[..., vintage] -= used
+                remaining -= used
+            current = current - (np.maximum(current, 0) - remaining)
+
+        loss = np.maximum(-current, 0)
+        set_off = np.minimum(loss, cap)
+        counted[..., year] = np.where(current >= 0, current, -set_off)
+
+        if carry_years:
+            # The oldest loss expires; this year's unabsorbed loss joins the queue
+            carried = np.concatenate([carried[..., 1:], (loss - set_off)[..., None]], axis=-1)
+            carried_total[..., year] = carried.sum(axis=-1)
+    return counted, carried_total
+
+
+def after_tax_cash_flows(result, annual_income, regime=DEFAULT_TAX_REGIME, other_80c=0):
+    """
+    Year-wise tax effect and after-tax cash flow of every scenario
+
+    Args:
+        result (dict): evaluate_investment() output (any shape of scenarios)
+        annual_income: Investor's taxable income from other sources, in ₹ (scalar or broadcastable)
+        regime (str or dict): Key of TAX_REGIMES or a configuration of the same form
+        other_80c: Section 80C deductions already claimed elsewhere, in ₹
+
+    Returns:
+        dict: Arrays of shape (..., years): 'interest', 'principal',
+            'house_property_income', 'loss_carried_forward', 'principal_deduction',
+            'tax_impact' (extra tax; negative is a saving), 'pre_tax_cash_flow'
+            and 'after_tax_cash_flow'; plus 'year'
+    """
+    config = get_regime(regime)
+    loan = yearly_breakdown(result['loan_amount'], result['interest_rate'], result['total_months'])
+    months_held = np.clip(result['total_months'][..., None] - (loan['year'] - 1) * 12, 0, 12)
+
+    rent_received = (result['estimated_monthly_rent'] - result['monthly_vacancy_cost'])[..., None] * months_held
+    net_annual_value = rent_received - result['monthly_property_tax'][..., None] * months_held
+    counted, carried = house_property_income(net_annual_value, loan['interest'], config)
+
+    # Section 80C room left after the investor's other claims
+    income = np.asarray(annual_income, dtype=np.float64)[..., None]
+    claimed_elsewhere = np.minimum(other_80c, config['principal_deduction_cap'])
+    principal_deduction = np.minimum(loan['principal'], config['principal_deduction_cap'] - claimed_elsewhere)
+
+    base_income = income - claimed_elsewhere
+    tax_impact = (slab_tax(base_income + counted - principal_deduction, config) -
+                  slab_tax(np.broadcast_to(base_income, counted.shape), config))
+
+    pre_tax = result['monthly_cash_flow'][..., None] * months_held
+    return {
+        'year': loan['year'],
+        'interest': loan['interest'],
+        'principal': loan['principal'],
+        'house_property_income': counted,
+        'loss_carried_forward': carried,
+        'principal_deduction': principal_deduction,
+        'tax_impact': tax_impact,
+        'pre_tax_cash_flow': pre_tax,
+        'after_tax_cash_flow': pre_tax - tax_impact
+    }
+
+
+def after_tax_summary(result, annual_income, regime=DEFAULT_TAX_REGIME, other_80c=0, chunk_size=TAX_CHUNK_SIZE):
+    """
+    Per-scenario averages of after_tax_cash_flows() over the years held
+
+    Scenarios are processed in blocks of `chunk_size` so the (scenarios x years)
+    arrays stay bounded on large grids.
+
+    Returns:
+        dict: 'after_tax_annual_cash_flow' and 'annual_tax_impact' in the result's shape
+    """
+    shape = result['loan_amount'].shape
+    names = ('loan_amount', 'interest_rate', 'total_months', 'estimated_monthly_rent', 'monthly_vacancy_cost',
+             'monthly_property_tax', 'monthly_cash_flow')
+    flat = {name: np.broadcast_to(result[name], shape).ravel() for name in names}
+    income = np.broadcast_to(np.asarray(annual_income, dtype=np.float64), shape).ravel()
+
+    cash_flow = np.empty(income.size)
+    tax_impact = np.empty(income.size)
+    for start in range(0, income.size, chunk_size):
+        block = slice(start, start + chunk_size)
+        flows = after_tax_cash_flows({name: values[block] for name, values in flat.items()},
+                                     income[block], regime, other_80c)
+        years_held = flat['total_months'][block] / 12
+        cash_flow[block] = flows['after_tax_cash_flow'].sum(axis=-1) / years_held
+        tax_impact[block] = flows['tax_impact'].sum(axis=-1) / years_held
+
+    return {'after_tax_annual_cash_flow': cash_flow.reshape(shape), 'annual_tax_impact': tax_impact.reshape(shape)}
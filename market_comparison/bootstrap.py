@@ -0,0 +1,137 @@
+import numpy as np
+
+BOOTSTRAP_RESAMPLES = 10000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 42             # fixed, so a comparison always reports the same interval
+BOOTSTRAP_MIN_LISTINGS = 5      # fewer listings on either side -> no significance claimed
+BOOTSTRAP_CHUNK_ELEMENTS = 2_000_000  # resample indices drawn per block (resamples x listings)
+
+ROI_FACTOR = 12 / 100000 * 100  # monthly rent / price in lakhs -> annual ROI %
+
+INTERVAL_METRICS = {'price': 'Price', 'rent': 'Rent', 'roi': 'ROI'}
+
+
+class ListingSamples:
+    """
+    Listing-level prices and rents of every locality, grouped once
+
+    The merged frame pairs every price listing with every rent listing of
+    its locality, so its ROI mean equals mean(rent) * mean(1 / price) and
+    only the two independent samples need resampling.
+    """
+
+    def __init__(self, price_listings, rent_listings):
+        self.prices = self._group(price_listings, 'price_lakh')
+        self.rents = self._group(rent_listings, 'rent')
+
+    @staticmethod
+    def _group(listings, column):
+        values = listings[['locality', column]].dropna()
+        values = values[values[column] > 0]
+        return {locality: group[column].to_numpy(dtype=np.float64)
+                for locality, group in values.groupby('locality')}
+
+    def __contains__(self, locality):
+        return locality in self.prices and locality in self.rents
+
+
+def resample_means(values, n_resamples=BOOTSTRAP_RESAMPLES, rng=None, chunk_elements=BOOTSTRAP_CHUNK_ELEMENTS):
+    """
+    Means of bootstrap resamples of the columns of `values`
+
+    Each block draws a (resamples x listings) index array and gathers all
+    columns with it at once; blocks only bound memory on large samples.
+
+    Args:
+        values (array): Shape (listings,) or (listings, columns)
+
+    Returns:
+        array: Shape (n_resamples,) or (n_resamples, columns)
+    """
+    rng = np.random.default_rng(BOOTSTRAP_SEED) if rng is None else rng
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    means = np.empty((n_resamples,) + values.shape[1:])
+    block = max(1, chunk_elements // max(n, 1))
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        indices = rng.integers(0, n, size=(size, n))
+        means[start:start + size] = values[indices].mean(axis=1)
+    return means
+
+
+def locality_resamples(samples, locality, n_resamples, rng):
+    """Resampled mean price, rent and ROI of one locality, each of shape (n_resamples,)"""
+    prices = samples.prices[locality]
+    price_means = resample_means(np.column_stack([prices, 1 / prices]), n_resamples, rng)
+    rent_means = resample_means(samples.rents[locality], n_resamples, rng)
+    return {
+        'price': price_means[:, 0],
+        'rent': rent_means,
+        'roi': rent_means * price_means[:, 1] * ROI_FACTOR
+    }
+
+
+def bootstrap_comparison(samples, loc1, loc2, n_resamples=BOOTSTRAP_RESAMPLES, confidence=BOOTSTRAP_CONFIDENCE,
+                         seed=BOOTSTRAP_SEED):
+    """
+    Bootstrap intervals for the differences (loc2 - loc1) in mean price, rent and ROI
+
+    Args:
+        samples (ListingSamples): Listing-level samples
+        loc1, loc2 (str): Resolved (lower-case) locality names
+
+    Returns:
+        dict: Per metric: difference, ci_low, ci_high and significant (the
+            interval excludes zero and both sides have enough listings);
+            plus confidence, resamples and listing counts. None when either
+            locality has no listings.
+    """
+    if loc1 not in samples or loc2 not in samples:
+        return None
+
+    rng = np.random.default_rng(seed)
+    first = locality_resamples(samples, loc1, n_resamples, rng)
+    second = locality_resamples(samples, loc2, n_resamples, rng)
+    tail = (1 - confidence) / 2 * 100
+
+    def observed(locality):
+        prices, rents = samples.prices[locality], samples.rents[locality]
+        return {'price': prices.mean(), 'rent': rents.mean(), 'roi': rents.mean() * (1 / prices).mean() * ROI_FACTOR}
+
+    counts = {locality: {'price_listings': len(samples.prices[locality]), 'rent_listings': len(samples.rents[locality])}
+              for locality in (loc1, loc2)}
+    enough = all(min(count.values()) >= BOOTSTRAP_MIN_LISTINGS for count in counts.values())
+
+    base, other = observed(loc1), observed(loc2)
+    result = {'confidence': confidence, 'resamples': n_resamples, 'listings': counts}
+    for metric in INTERVAL_METRICS:
+        low, high = np.percentile(second[metric] - first[metric], [tail, 100 - tail])
+        result[metric] = {
+            'difference': round(float(other[metric] - base[metric]), 2),
+            'ci_low': round(float(low), 2),
+            'ci_high': round(float(high), 2),
+            'significant': bool(enough and (low > 0 or high < 0))
+        }
+    return result
+
+
+def annotate_comparison(comparison, intervals):
+    """
+    Attach bootstrap intervals to a compare_localities() result
+
+    Adds comparison['comparison']['intervals'] and '<metric>_significant'
+    flags, and marks summary lines whose winner is within the noise.
+    """
+    if not comparison or not intervals:
+        return comparison
+    details = comparison['comparison']
+    details['intervals'] = intervals
+    for metric in INTERVAL_METRICS:
+        details[f'{metric}_significant'] = intervals[metric]['significant']
+
+    # Summary lines follow generate_comparison_summary(): price, ROI, rent
+    for position, metric in enumerate(['price', 'roi', 'rent']):
+        if position < len(comparison.get('summary', [])) and not intervals[metric]['significant']:
+            comparison['summary'][position] += f" (the {INTERVAL_METRICS[metric]} difference is not statistically significant)"
+    return comparison
@@ -0,0 +1,126 @@
+from collections import OrderedDict
+import copy
+from itertools import combinations
+import threading
+
+COMPARISON_CACHE_SIZE = 1024  # pairs kept; 32 localities make 496
+
+# (field, stat, lower is better) of each verdict, in the order of the summary lines
+COMPARISON_VERDICTS = [('better_price', 'avg_price', True), ('better_roi', 'avg_roi', False),
+                       ('better_rent', 'avg_rent', False)]
+
+
+def mirror_comparison(comparison):
+    """The same comparison with the two localities swapped"""
+    mirrored = copy.deepcopy(comparison)
+    mirrored['loc1'], mirrored['loc2'] = mirrored['loc2'], mirrored['loc1']
+
+    details = mirrored['comparison']
+    for key in ('price_difference', 'roi_difference', 'rent_difference'):
+        details[key] = -details[key]
+    for metric, interval in details.get('intervals', {}).items():
+        if isinstance(interval, dict) and 'ci_low' in interval:
+            interval['difference'] = -interval['difference']
+            interval['ci_low'], interval['ci_high'] = -interval['ci_high'], -interval['ci_low']
+
+    # A tie goes to the second locality, so the verdicts are re-derived for the new order
+    first, second = mirrored['loc1'], mirrored['loc2']
+    summary = mirrored.get('summary', [])
+    for position, (field, stat, lower_is_better) in enumerate(COMPARISON_VERDICTS):
+        value1, value2 = first['stats'][stat], second['stats'][stat]
+        wins = value1 < value2 if lower_is_better else value1 > value2
+        winner = first['name'] if wins else second['name']
+        if winner != details[field] and position < len(summary) and summary[position].startswith(details[field]):
+            summary[position] = winner + summary[position][len(details[field]):]
+        details[field] = winner
+
+    chart_data = mirrored.get('chart_data')
+    if chart_data:
+        chart_data['loc1_values'], chart_data['loc2_values'] = chart_data['loc2_values'], chart_data['loc1_values']
+    return mirrored
+
+
+class ComparisonCache:
+    """
+    Bounded LRU of comparison payloads keyed by (data version, sorted pair)
+
+    Each unordered pair is stored once; asking for it the other way round
+    returns the mirrored payload. Entries are copied on the way out, so
+    callers may decorate them freely.
+    """
+
+    def __init__(self, maxsize=COMPARISON_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(loc1, loc2, version):
+        return (version,) + tuple(sorted((loc1, loc2)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        loc1, loc2, version = item
+        return self.key(loc1, loc2, version) in self._entries
+
+    def get(self, loc1, loc2, version):
+        key = self.key(loc1, loc2, version)
+        with self._lock:
+            comparison = self._entries.get(key)
+            if comparison is None:
+                return None
+            self._entries.move_to_end(key)
+        if (loc1, loc2) == key[1:]:
+            return copy.deepcopy(comparison)
+        return mirror_comparison(comparison)
+
+    def put(self, loc1, loc2, version, comparison):
+        """Store a comparison computed with loc1 as the first locality"""
+        key = self.key(loc1, loc2, version)
+        if (loc1, loc2) != key[1:]:
+            comparison = mirror_comparison(comparison)
+        with self._lock:
+            self._entries[key] = comparison
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class ComparisonWarmer(threading.Thread):
+    """
+    Daemon thread filling a ComparisonCache with every unordered locality pair
+
+    Args:
+        cache (ComparisonCache): Cache to fill
+        compute (callable): compute(loc1, loc2) -> comparison dict or None
+        localities (list): Resolved locality names
+        version (str): Data version the comparisons belong to
+    """
+
+    def __init__(self, cache, compute, localities, version):
+        super().__init__(name="comparison-warmer", daemon=True)
+        self.cache = cache
+        self.compute = compute
+        self.localities = sorted(localities)
+        self.version = version
+        self.warmed = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        for loc1, loc2 in combinations(self.localities, 2):
+            if self._stop_event.is_set():
+                return
+            if (loc1, loc2, self.version) in self.cache:
+                continue
+            try:
+                comparison = self.compute(loc1, loc2)
+            except Exception:
+                continue
+            if comparison:
+                self.cache.put(loc1, loc2, self.version, comparison)
+                self.warmed += 1
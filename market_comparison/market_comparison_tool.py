@@ -1,8 +1,30 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import io
-import base64
+
+# Optional helpers: the tool falls back to plain groupby lookups without them
+try:
+    from market_comparison.summary_index import SUMMARY_AGGREGATIONS, LocalitySummaryIndex
+    SUMMARY_INDEX_AVAILABLE = True
+except ImportError:
+    SUMMARY_INDEX_AVAILABLE = False
+    SUMMARY_AGGREGATIONS = {
+        "price_lakh": ["mean", "min", "max", "std"],
+        "rate_sqft": ["mean", "min", "max"],
+        "rent": ["mean", "min", "max"],
+        "roi": ["mean", "min", "max"]
+    }
+
+try:
+    from market_comparison.multi_comparison import compare_many
+    MULTI_COMPARISON_AVAILABLE = True
+except ImportError:
+    MULTI_COMPARISON_AVAILABLE = False
+
+try:
+    from market_comparison.bootstrap import annotate_comparison, bootstrap_comparison
+    BOOTSTRAP_AVAILABLE = True
+except ImportError:
+    BOOTSTRAP_AVAILABLE = False
 
 class MarketComparisonTool:
     def __init__(self):
@@ -14,6 +36,9 @@ class MarketComparisonTool:
             'nariman point', 'parel', 'powai', 'prabhadevi', 'santacruz', 'sion', 'tardeo',
             'vidyavihar', 'vikhroli', 'vile parle', 'wadala', 'worli'
         ]
+        # Shared with PropTechMLService, which builds them once at load time
+        self.summary_index = None
+        self.listing_samples = None
     
     def preprocess_data(self, price_df, rent_df):
         """Preprocess and clean the data"""
@@ -42,45 +67,51 @@ class MarketComparisonTool:
         
         return merged
     
+    def get_summary_index(self, merged_data):
+        """Summary index of merged_data; rebuilt only when handed a different frame (None if unavailable)"""
+        if not SUMMARY_INDEX_AVAILABLE:
+            return None
+        if self.summary_index is None or self.summary_index.source is not merged_data:
+            self.summary_index = LocalitySummaryIndex.from_merged(merged_data)
+        return self.summary_index
+    
     def get_locality_summary(self, merged_data, locality_input):
-        """Get summary statistics for a locality"""
-        # Create summary table
-        summary = merged_data.groupby("locality").agg({
-            "price_lakh": ["mean", "min", "max", "std"],
-            "rate_sqft": ["mean", "min", "max"],
-            "rent": ["mean", "min", "max"],
-            "roi": ["mean", "min", "max"]
-        }).reset_index()
+        """Get summary statistics for a locality (one-row DataFrame, empty when unknown)"""
+        index = self.get_summary_index(merged_data)
+        if index is not None:
+            return index.frame(locality_input)
         
-        # Flatten column names
+        # No summary index: group the listings on every call
+        summary = merged_data.groupby("locality").agg(SUMMARY_AGGREGATIONS).reset_index()
         summary.columns = ['_'.join(col).strip('_') for col in summary.columns]
-        
-        # Match in summary
-        loc_summary = summary[summary["locality"].str.contains(locality_input, na=False)]
-        
-        # Fallback: match in merged data if summary fails
-        if loc_summary.empty:
-            loc_summary = self.get_fallback_summary(merged_data, locality_input)
-        
-        return loc_summary
+        loc_summary = summary[summary["locality"].str.contains(locality_input, na=False, regex=False)]
+        return loc_summary.iloc[0:1]
     
-    def get_fallback_summary(self, merged_data, loc_input):
-        """Fallback method to get summary when direct match fails"""
-        match_df = merged_data[merged_data["locality"].str.contains(loc_input, na=False)]
-        if not match_df.empty:
-            top_loc = match_df["locality"].value_counts().idxmax()
-            fallback_data = match_df[match_df["locality"] == top_loc].groupby("locality").agg({
-                "price_lakh": ["mean", "min", "max", "std"],
-                "rate_sqft": ["mean", "min", "max"],
-                "rent": ["mean", "min", "max"],
-                "roi": ["mean", "min", "max"]
-            }).reset_index()
-            
-            # Flatten column names
-            fallback_data.columns = ['_'.join(col).strip('_') for col in fallback_data.columns]
-            return fallback_data
+    def get_locality_stats(self, merged_data, locality_input):
+        """Display statistics of a locality (see LocalitySummaryIndex.stats), None when unknown"""
+        index = self.get_summary_index(merged_data)
+        if index is not None:
+            return index.stats(locality_input)
         
-        return pd.DataFrame()
+        loc_summary = self.get_locality_summary(merged_data, str(locality_input).lower().strip())
+        if loc_summary.empty:
+            return None
+        row = loc_summary.iloc[0]
+        return {
+            'locality': row['locality'],
+            'avg_price': round(row.get('price_lakh_mean', 0), 2),
+            'price_range': {
+                'min': round(row.get('price_lakh_min', 0), 2),
+                'max': round(row.get('price_lakh_max', 0), 2)
+            },
+            'avg_rent': round(row.get('rent_mean', 0), 2),
+            'avg_roi': round(row.get('roi_mean', 0), 2),
+            'roi_range': {
+                'min': round(row.get('roi_min', 0), 2),
+                'max': round(row.get('roi_max', 0), 2)
+            },
+            'avg_rate_sqft': round(row.get('rate_sqft_mean', 0), 2)
+        }
     
     def compare_localities(self, loc1_input, loc2_input, market_data):
         """
@@ -100,49 +131,15 @@ class MarketComparisonTool:
                 # If ROI not calculated, calculate it
                 market_data["roi"] = (market_data["rent"] * 12) / (market_data["price_lakh"] * 100000) * 100
             
-            # Get summaries for both localities
-            loc1_summary = self.get_locality_summary(market_data, loc1_input.lower().strip())
-            loc2_summary = self.get_locality_summary(market_data, loc2_input.lower().strip())
+            # Look up both localities in the precomputed summary
+            loc1_stats = self.get_locality_stats(market_data, loc1_input)
+            loc2_stats = self.get_locality_stats(market_data, loc2_input)
             
-            if loc1_summary.empty or loc2_summary.empty:
+            if not loc1_stats or not loc2_stats:
                 return None
             
-            # Extract data for comparison
-            loc1_data = {
-                'name': loc1_summary.iloc[0]['locality'].title(),
-                'stats': {
-                    'avg_price': round(loc1_summary.iloc[0].get('price_lakh_mean', 0), 2),
-                    'price_range': {
-                        'min': round(loc1_summary.iloc[0].get('price_lakh_min', 0), 2),
-                        'max': round(loc1_summary.iloc[0].get('price_lakh_max', 0), 2)
-                    },
-                    'avg_rent': round(loc1_summary.iloc[0].get('rent_mean', 0), 2),
-                    'avg_roi': round(loc1_summary.iloc[0].get('roi_mean', 0), 2),
-                    'roi_range': {
-                        'min': round(loc1_summary.iloc[0].get('roi_min', 0), 2),
-                        'max': round(loc1_summary.iloc[0].get('roi_max', 0), 2)
-                    },
-                    'avg_rate_sqft': round(loc1_summary.iloc[0].get('rate_sqft_mean', 0), 2)
-                }
-            }
-            
-            loc2_data = {
-                'name': loc2_summary.iloc[0]['locality'].title(),
-                'stats': {
-                    'avg_price': round(loc2_summary.iloc[0].get('price_lakh_mean', 0), 2),
-                    'price_range': {
-                        'min': round(loc2_summary.iloc[0].get('price_lakh_min', 0), 2),
-                        'max': round(loc2_summary.iloc[0].get('price_lakh_max', 0), 2)
-                    },
-                    'avg_rent': round(loc2_summary.iloc[0].get('rent_mean', 0), 2),
-                    'avg_roi': round(loc2_summary.iloc[0].get('roi_mean', 0), 2),
-                    'roi_range': {
-                        'min': round(loc2_summary.iloc[0].get('roi_min', 0), 2),
-                        'max': round(loc2_summary.iloc[0].get('roi_max', 0), 2)
-                    },
-                    'avg_rate_sqft': round(loc2_summary.iloc[0].get('rate_sqft_mean', 0), 2)
-                }
-            }
+            loc1_data = {'name': loc1_stats['locality'].title(), 'stats': loc1_stats}
+            loc2_data = {'name': loc2_stats['locality'].title(), 'stats': loc2_stats}
             
             # Calculate comparison metrics
             price_difference = loc2_data['stats']['avg_price'] - loc1_data['stats']['avg_price']
@@ -157,7 +154,7 @@ class MarketComparisonTool:
             # Generate chart data for frontend
             chart_data = self.generate_comparison_chart_data(loc1_data, loc2_data)
             
-            return {
+            comparison = {
                 'loc1': loc1_data,
                 'loc2': loc2_data,
                 'comparison': {
@@ -172,10 +169,23 @@ class MarketComparisonTool:
                 'summary': self.generate_comparison_summary(loc1_data, loc2_data)
             }
             
+            # Bootstrap intervals tell real differences from noise
+            if BOOTSTRAP_AVAILABLE and self.listing_samples is not None:
+                intervals = bootstrap_comparison(self.listing_samples, loc1_stats['locality'], loc2_stats['locality'])
+                annotate_comparison(comparison, intervals)
+            
+            return comparison
+            
         except Exception as e:
             print(f"Error in comparison: {e}")
             return None
     
+    def compare_many(self, locality_inputs, market_data):
+        """All-pairs comparison of several localities (see multi_comparison.compare_many)"""
+        if not MULTI_COMPARISON_AVAILABLE or not SUMMARY_INDEX_AVAILABLE:
+            raise RuntimeError("Multi-locality comparison not available")
+        return compare_many(self.get_summary_index(market_data), locality_inputs)
+    
     def generate_comparison_chart_data(self, loc1_data, loc2_data):
         """Generate data for frontend charts"""
         return {
@@ -0,0 +1,67 @@
+import numpy as np
+
+# Pairwise metrics: (stats key, True when a higher value is better)
+PAIRWISE_METRICS = {
+    'price': ('avg_price', False),
+    'roi': ('avg_roi', True),
+    'rent': ('avg_rent', True)
+}
+
+
+def compare_many(index, locality_inputs=None):
+    """
+    N-way comparison of localities from a LocalitySummaryIndex
+
+    Stat vectors are stacked once and every pair is compared by
+    broadcasting, so N localities cost one pass instead of N*(N-1)/2
+    two-way comparisons. Cell [i][j] of a matrix reads as in the two-way
+    view with row i as the first locality and column j as the second:
+    differences are j minus i, and winners break ties towards j.
+
+    Args:
+        index (LocalitySummaryIndex): Summary index to resolve names against
+        locality_inputs (list): Locality names; None compares every locality
+
+    Returns:
+        dict: localities, stats, differences / winners (N x N per metric),
+            wins (pairs won per locality and metric), best (per metric) and
+            unmatched inputs; None when fewer than two localities resolve
+    """
+    if locality_inputs is None:
+        locality_inputs = index.names
+
+    names, unmatched = [], []
+    for locality_input in locality_inputs:
+        name = index.resolve(locality_input)
+        if name is None:
+            unmatched.append(locality_input)
+        elif name not in names:
+            names.append(name)
+    if len(names) < 2:
+        return None
+
+    stats = [index.stats(name) for name in names]
+    labels = [name.title() for name in names]
+    values = np.array([[entry[key] for key, _ in PAIRWISE_METRICS.values()] for entry in stats], dtype=np.float64)
+
+    # (N, N, metrics): [i, j] compares row locality i with column locality j
+    differences = values[None, :, :] - values[:, None, :]
+    row_better = np.where([higher for _, higher in PAIRWISE_METRICS.values()],
+                          differences < 0, differences > 0)
+    rows, columns = np.indices((len(names), len(names)))
+    winner = np.where(row_better, rows[..., None], columns[..., None])
+    diagonal = np.eye(len(names), dtype=bool)
+    wins = row_better.sum(axis=1)
+
+    result = {'localities': labels, 'stats': stats, 'differences': {}, 'winners': {}, 'wins': {}, 'best': {},
+              'unmatched': unmatched}
+    for position, (metric, (_, higher)) in enumerate(PAIRWISE_METRICS.items()):
+        result['differences'][metric] = np.round(differences[..., position], 2).tolist()
+        result['winners'][metric] = [
+            [None if diagonal[i, j] else labels[winner[i, j, position]] for j in range(len(names))]
+            for i in range(len(names))
+        ]
+        result['wins'][metric] = wins[:, position].tolist()
+        column = values[:, position]
+        result['best'][metric] = labels[int(np.argmax(column) if higher else np.argmin(column))]
+    return result
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+LOCATIONS_PATH = "data/Map_Location.csv"
+
+SIMILAR_TOP_K = 5
+BEDROOM_MIX = [1, 2, 3, 4]  # share of listings per bedroom count; the last one is 4 and above
+
+# Profile features and their weights in the cosine similarity. Prices are
+# compared in logs, so a 2x gap counts the same at every price level.
+PROFILE_WEIGHTS = {
+    'log_price': 1.0,
+    'log_rent': 1.0,
+    'roi': 1.0,
+    'log_rate_sqft': 1.0,
+    'volatility': 0.5,
+    'latitude': 0.75,
+    'longitude': 0.75,
+    **{f'bhk_{bedrooms}': 0.25 for bedrooms in BEDROOM_MIX}
+}
+
+
+def locality_coordinates(localities, path=LOCATIONS_PATH):
+    """
+    Median latitude/longitude of each locality in the geocoded listings
+
+    Localities are found as whole words in the listing's location and
+    region text; those never mentioned are left out.
+    """
+    try:
+        locations = pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.ParserError):
+        return pd.DataFrame(columns=['latitude', 'longitude'])
+
+    text = (locations['Location'].astype(str) + " " + locations['Region'].astype(str)).str.lower()
+    pattern = r'\b(' + '|'.join(sorted(localities, key=len, reverse=True)) + r')\b'
+    frame = pd.DataFrame({
+        'locality': text.str.extract(pattern, expand=False),
+        'latitude': pd.to_numeric(locations['Latitude'], errors="coerce"),
+        'longitude': pd.to_numeric(locations['Longitude'], errors="coerce")
+    }).dropna()
+    return frame.groupby('locality')[['latitude', 'longitude']].median()
+
+
+def build_profiles(summary, price_listings=None, coordinates=None):
+    """
+    Raw locality profile frame (one row per locality, PROFILE_WEIGHTS columns)
+
+    Args:
+        summary (DataFrame): ml_service.data['summary']
+        price_listings (DataFrame): Listing-level prices with a 'bedroom' column, for the BHK mix
+        coordinates (DataFrame): locality_coordinates() output
+    """
+    names = summary['locality'].astype(str)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profiles = pd.DataFrame({
+            'log_price': np.log(summary['price_lakh_mean'].to_numpy(dtype=np.float64)),
+            'log_rent': np.log(summary['rent_mean'].to_numpy(dtype=np.float64)),
+            'roi': summary['roi_mean'].to_numpy(dtype=np.float64),
+            'log_rate_sqft': np.log(summary['rate_sqft_mean'].to_numpy(dtype=np.float64)),
+            'volatility': (summary['price_lakh_std'] / summary['price_lakh_mean']).to_numpy(dtype=np.float64)
+        }, index=names.to_numpy())
+
+    coordinates = coordinates if coordinates is not None else pd.DataFrame(columns=['latitude', 'longitude'])
+    profiles = profiles.join(coordinates[['latitude', 'longitude']])
+
+    if price_listings is not None and 'bedroom' in price_listings:
+        bedrooms = pd.to_numeric(price_listings['bedroom'], errors="coerce").clip(upper=BEDROOM_MIX[-1])
+        mix = pd.crosstab(price_listings['locality'], bedrooms, normalize='index')
+        mix = mix.reindex(columns=BEDROOM_MIX, fill_value=0)
+        mix.columns = [f'bhk_{bedrooms}' for bedrooms in BEDROOM_MIX]
+        profiles = profiles.join(mix)
+    return profiles.reindex(columns=list(PROFILE_WEIGHTS))
+
+
+def profile_matrix(profiles):
+    """
+    Standardised, weighted profile matrix
+
+    Each feature is z-scored across localities; missing values (no
+    coordinates, no listings) sit at the average, so they neither add
+    nor remove similarity.
+    """
+    values = profiles.to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    z = np.nan_to_num((values - mean) / std)
+    return z * np.array([PROFILE_WEIGHTS[column] for column in profiles.columns])
+
+
+class SimilarityIndex:
+    """
+    Precomputed top-k cosine-similar localities
+
+    The full (localities x localities) similarity is computed once per data
+    version; a query is a row lookup in the top-k table.
+    """
+
+    def __init__(self, profiles, k=SIMILAR_TOP_K, version=None):
+        self.profiles = profiles
+        self.names = list(profiles.index)
+        self.positions = {name: position for position, name in enumerate(self.names)}
+        self.version = version
+        self.coordinates = profiles[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+
+        matrix = profile_matrix(profiles)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        unit = matrix / np.where(norms > 0, norms, 1.0)
+        similarity = unit @ unit.T
+        np.fill_diagonal(similarity, -np.inf)
+
+        self.k = min(k, max(len(self.names) - 1, 0))
+        order = np.argsort(-similarity, axis=1, kind='stable')[:, :self.k]
+        self.top_indices = order
+        self.top_scores = np.take_along_axis(similarity, order, axis=1)
+
+    @classmethod
+    def build(cls, summary, price_listings=None, locations_path=LOCATIONS_PATH, k=SIMILAR_TOP_K, version=None):
+        coordinates = locality_coordinates(summary['locality'].astype(str).tolist(), locations_path)
+        return cls(build_profiles(summary, price_listings, coordinates), k=k, version=version)
+
+    def __len__(self):
+        return len(self.names)
+
+    def distance_km(self, first, second):
+        """Great-circle distance between two localities, or None without coordinates"""
+        (lat1, lon1), (lat2, lon2) = np.radians(self.coordinates[[first, second]])
+        if np.isnan([lat1, lon1, lat2, lon2]).any():
+            return None
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return round(float(6371 * 2 * np.arcsin(np.sqrt(a))), 1)
+
+    def similar(self, locality, k=None):
+        """
+        Most similar localities to a resolved locality name
+
+        Returns:
+            list: Dicts with locality, similarity (-1 to 1) and distance_km
+                (None without coordinates); empty for unknown localities
+        """
+        position = self.positions.get(locality)
+        if position is None:
+            return []
+        k = self.k if k is None else min(k, self.k)
+        return [{
+            'locality': self.names[other],
+            'similarity': round(float(score), 3),
+            'distance_km': self.distance_km(position, other)
+        } for other, score in zip(self.top_indices[position, :k], self.top_scores[position, :k])]
@@ -0,0 +1,120 @@
+from functools import lru_cache
+import hashlib
+
+import pandas as pd
+
+# Locality-level aggregates of the merged price/rent frame; flattened to e.g. 'price_lakh_mean'
+SUMMARY_AGGREGATIONS = {
+    "price_lakh": ["mean", "min", "max", "std"],
+    "rate_sqft": ["mean", "min", "max"],
+    "rent": ["mean", "min", "max"],
+    "roi": ["mean", "min", "max"]
+}
+
+VERSION_COLUMNS = ['locality', 'price_lakh', 'rate_sqft', 'rent', 'roi']
+
+RESOLVE_CACHE_SIZE = 1024  # distinct user inputs remembered by LocalitySummaryIndex.resolve()
+
+
+def build_summary_frame(merged):
+    """One row per locality with the SUMMARY_AGGREGATIONS columns and a 'listings' count"""
+    grouped = merged.groupby("locality")
+    summary = grouped.agg(SUMMARY_AGGREGATIONS).reset_index()
+    summary.columns = ['_'.join(col).strip('_') for col in summary.columns]
+    summary['listings'] = grouped.size().to_numpy()
+    return summary
+
+
+def compute_data_version(merged):
+    """Short content hash of the columns the summary is built from"""
+    columns = [c for c in VERSION_COLUMNS if c in merged.columns]
+    hashes = pd.util.hash_pandas_object(merged[columns], index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+
+class LocalitySummaryIndex:
+    """
+    Precomputed locality summary with name resolution
+
+    Built once per dataset (and tagged with its data version), so a lookup
+    is a dict hit on a cached name instead of a groupby over every listing.
+    Names resolve as: exact match, then the first locality containing the
+    input ("andh" -> andheri); anything else is unknown.
+    """
+
+    def __init__(self, summary, version=None, source=None):
+        self.summary = summary.reset_index(drop=True)
+        self.version = version
+        self.source = source  # merged frame the summary was built from, if known
+        self.names = self.summary['locality'].astype(str).tolist() if not self.summary.empty else []
+        self.positions = {name: position for position, name in enumerate(self.names)}
+        self.records = self.summary.to_dict('records')
+        self.resolve = lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def from_merged(cls, merged):
+        return cls(build_summary_frame(merged), version=compute_data_version(merged), source=merged)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, locality):
+        return self.resolve(locality) is not None
+
+    def _resolve(self, locality_input):
+        key = str(locality_input).lower().strip()
+        if not key:
+            return None
+        if key in self.positions:
+            return key
+        for name in self.names:
+            if key in name:
+                return name
+        return None
+
+    def row(self, locality_input):
+        """Summary row of the resolved locality as a dict, or None"""
+        name = self.resolve(locality_input)
+        return None if name is None else self.records[self.positions[name]]
+
+    def frame(self, locality_input):
+        """Summary row of the resolved locality as a one-row DataFrame (empty when unknown)"""
+        name = self.resolve(locality_input)
+        if name is None:
+            return self.summary.iloc[0:0]
+        position = self.positions[name]
+        return self.summary.iloc[position:position + 1]
+
+    def stats(self, locality_input):
+        """
+        Display statistics of the resolved locality
+
+        Returns:
+            dict: locality, avg_price, price_range, avg_rent, avg_roi, roi_range,
+                avg_rate_sqft and, when the summary is risk-scored, market_risk,
+                risk_score and risk_level; None when the locality is unknown
+        """
+        stats = self.row(locality_input)
+        if stats is None:
+            return None
+
+        locality_stats = {
+            'locality': stats['locality'],
+            'avg_price': round(stats.get('price_lakh_mean', 0), 2),
+            'price_range': {
+                'min': round(stats.get('price_lakh_min', 0), 2),
+                'max': round(stats.get('price_lakh_max', 0), 2)
+            },
+            'avg_rent': round(stats.get('rent_mean', 0), 2),
+            'avg_roi': round(stats.get('roi_mean', 0), 2),
+            'roi_range': {
+                'min': round(stats.get('roi_min', 0), 2),
+                'max': round(stats.get('roi_max', 0), 2)
+            },
+            'avg_rate_sqft': round(stats.get('rate_sqft_mean', 0), 2)
+        }
+        if 'risk_score' in stats:
+            locality_stats['market_risk'] = float(stats['market_risk'])
+            locality_stats['risk_score'] = float(stats['risk_score'])
+            locality_stats['risk_level'] = stats['risk_level']
+        return locality_stats
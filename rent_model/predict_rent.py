@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+
+COEFFICIENTS_PATH = "rent_model/rent_coefficients.json"
+
+
+class RentModel:
+    """
+    Hedonic log-linear rent model:
+    log(rent) = locality + b * log(area) + bedrooms + furnishing
+
+    Categorical effects are held in arrays and dicts built once from the
+    coefficient JSON (written by rent_model/rent_model.py), so a prediction
+    is a few lookups and one exp, for one listing or a whole batch.
+    """
+
+    def __init__(self, coefficients):
+        self.coefficients = coefficients
+        self.log_area = coefficients['log_area']
+        self.locality_effects = coefficients['localities']
+        self.default_locality = coefficients['default_locality']
+        self.bedroom_effects = np.array([coefficients['bedrooms'][key]
+                                         for key in sorted(coefficients['bedrooms'], key=int)])
+        self.bedroom_area_breaks = np.array(coefficients['bedroom_area_breaks'])
+        self.typical_area_sqft = {int(key): area for key, area in coefficients['typical_area_sqft'].items()}
+        self.furnishing_effects = coefficients['furnishing']
+        self.default_furnishing = coefficients['default_furnishing']
+        self.smearing = coefficients['smearing']
+
+    @classmethod
+    def load(cls, path=COEFFICIENTS_PATH):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def knows(self, locality):
+        return str(locality).strip().lower() in self.locality_effects
+
+    def estimate_bedrooms(self, area_sqft):
+        """Most likely bedroom count (0 = 1 RK) for built-up areas"""
+        return np.digitize(area_sqft, self.bedroom_area_breaks)
+
+    def _locality_effect(self, locality):
+        if isinstance(locality, str):
+            return self.locality_effects.get(locality.strip().lower(), self.default_locality)
+        return np.array([self.locality_effects.get(str(name).strip().lower(), self.default_locality)
+                         for name in locality])
+
+    def _furnishing_effect(self, furnishing):
+        if furnishing is None:
+            return self.default_furnishing
+        if isinstance(furnishing, str):
+            return self.furnishing_effects.get(furnishing.strip().lower(), self.default_furnishing)
+        return np.array([self.furnishing_effects.get(str(value).strip().lower(), self.default_furnishing)
+                         for value in furnishing])
+
+    def predict(self, locality, area_sqft, bedrooms=None, furnishing=None):
+        """
+        Expected monthly rent (₹) for scalars or aligned arrays
+
+        Args:
+            locality: Locality name(s); unknown names get the average locality effect
+            area_sqft: Built-up area(s) in sqft
+            bedrooms: Bedroom count(s), 0 for 1 RK; None or NaN estimates them from area
+            furnishing: 'unfurnished' / 'semi furnished' / 'fully furnished'; None averages over them
+
+        Returns:
+            float or array: Monthly rent
+        """
+        area_sqft = np.asarray(area_sqft, dtype=np.float64)
+        if bedrooms is None:
+            bedrooms = self.estimate_bedrooms(area_sqft)
+        else:
+            bedrooms = np.asarray(bedrooms, dtype=np.float64)
+            bedrooms = np.where(np.isnan(bedrooms), self.estimate_bedrooms(area_sqft), bedrooms)
+        bedroom_index = np.clip(bedrooms, 0, len(self.bedroom_effects) - 1).astype(np.intp)
+
+        log_rent = (
+            self._locality_effect(locality) +
+            self.log_area * np.log(area_sqft) +
+            self.bedroom_effects[bedroom_index] +
+            self._furnishing_effect(furnishing)
+        )
+        rent = np.exp(log_rent) * self.smearing
+        return float(rent) if np.ndim(rent) == 0 else rent
+
+
+# Load the shipped coefficients
+try:
+    rent_model = RentModel.load(COEFFICIENTS_PATH)
+    MODEL_LOADED = True
+except Exception:
+    rent_model = None
+    MODEL_LOADED = False
+
+
+def predict_rent(locality, area_sqft, bedrooms=None, furnishing=None):
+    """Monthly rent from the hedonic model (see RentModel.predict)"""
+    if not MODEL_LOADED:
+        raise RuntimeError("Rent model coefficients not available")
+    return rent_model.predict(locality, area_sqft, bedrooms, furnishing)
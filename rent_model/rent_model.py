@@ -0,0 +1,115 @@
+# rent_model.py
+
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+# Sibling module resolves directly when run as a script from rent_model/
+try:
+    from predict_rent import COEFFICIENTS_PATH, RentModel
+except ImportError:
+    from rent_model.predict_rent import COEFFICIENTS_PATH, RentModel
+
+BEDROOM_LEVELS = [0, 1, 2, 3]  # 0 = 1 RK
+FURNISHING_LEVELS = ['unfurnished', 'semi furnished', 'fully furnished']
+
+
+def parse_area(values):
+    """'1,250 sq.ft' -> 1250.0 (NaN when missing)"""
+    return pd.to_numeric(values.astype(str).str.replace(",", "").str.extract(r"([\d.]+)")[0], errors="coerce")
+
+
+def parse_bedrooms(values):
+    """'2 BHK Apartment' -> 2, '1 RK Apartment' -> 0"""
+    def bedrooms(text):
+        match = re.match(r"\s*(\d+)\s*(BHK|RK)", str(text), re.IGNORECASE)
+        if not match:
+            return np.nan
+        return 0 if match.group(2).upper() == "RK" else min(int(match.group(1)), BEDROOM_LEVELS[-1])
+    return values.map(bedrooms)
+
+
+def load_training_frame(path="data/Mumbai_House_Rent.csv"):
+    """Rent listings with parsed hedonic features"""
+    df = pd.read_csv(path)
+    frame = pd.DataFrame({
+        'locality': df['Locality'].astype(str).str.strip().str.lower(),
+        'rent': pd.to_numeric(df['Rent/Month'], errors="coerce"),
+        'area_sqft': parse_area(df['Build_up_area(sq.ft)']),
+        'bedrooms': parse_bedrooms(df['Type']),
+        'furnishing': df['Furnishing'].astype(str).str.strip().str.lower()
+    })
+    frame = frame.dropna()
+    return frame[(frame['rent'] > 0) & (frame['area_sqft'] > 0) & frame['furnishing'].isin(FURNISHING_LEVELS)]
+
+
+def design_matrix(frame, localities):
+    """[locality one-hot | log area | bedroom dummies (vs RK) | furnishing dummies (vs unfurnished)]"""
+    locality_index = pd.Categorical(frame['locality'], categories=localities).codes
+    columns = [np.eye(len(localities))[locality_index], np.log(frame['area_sqft'].to_numpy())[:, None]]
+    columns += [(frame['bedrooms'].to_numpy() == level)[:, None] for level in BEDROOM_LEVELS[1:]]
+    columns += [(frame['furnishing'].to_numpy() == level)[:, None] for level in FURNISHING_LEVELS[1:]]
+    return np.hstack(columns).astype(np.float64)
+
+
+def fit(frame):
+    """Least-squares fit of log(rent); returns the coefficient dict written to JSON"""
+    localities = sorted(frame['locality'].unique())
+    X = design_matrix(frame, localities)
+    y = np.log(frame['rent'].to_numpy())
+    beta, *_ = np.linalg.lstsq(X, y, rcond=None)
+    residuals = y - X @ beta
+
+    n_localities = len(localities)
+    locality_effects = beta[:n_localities]
+    bedroom_effects = [0.0, *beta[n_localities + 1:n_localities + len(BEDROOM_LEVELS)]]
+    furnishing_effects = [0.0, *beta[n_localities + len(BEDROOM_LEVELS):]]
+
+    # Listing-weighted averages stand in for unknown localities and unspecified furnishing
+    locality_share = frame['locality'].value_counts(normalize=True).reindex(localities).to_numpy()
+    furnishing_share = frame['furnishing'].value_counts(normalize=True).reindex(FURNISHING_LEVELS).fillna(0)
+
+    # Bedrooms from area: cut halfway (in log area) between the median areas of adjacent bedroom counts
+    median_area = frame.groupby('bedrooms')['area_sqft'].median().reindex(BEDROOM_LEVELS)
+    median_log_area = np.log(median_area.to_numpy())
+    bedroom_area_breaks = np.exp((median_log_area[:-1] + median_log_area[1:]) / 2)
+
+    return {
+        'log_area': float(beta[n_localities]),
+        'localities': dict(zip(localities, locality_effects.round(6).tolist())),
+        'default_locality': float(locality_share @ locality_effects),
+        'bedrooms': dict(zip(map(str, BEDROOM_LEVELS), np.round(bedroom_effects, 6).tolist())),
+        'bedroom_area_breaks': bedroom_area_breaks.round(1).tolist(),
+        'typical_area_sqft': dict(zip(map(str, BEDROOM_LEVELS), median_area.round(1).tolist())),
+        'furnishing': dict(zip(FURNISHING_LEVELS, np.round(furnishing_effects, 6).tolist())),
+        'default_furnishing': float(furnishing_share.to_numpy() @ furnishing_effects),
+        # Duan's smearing factor: exp(E[log rent]) underestimates E[rent]
+        'smearing': float(np.mean(np.exp(residuals))),
+        'rmse_log': float(np.sqrt(np.mean(residuals ** 2))),
+        'trained_rows': int(len(frame))
+    }
+
+
+if __name__ == "__main__":
+    df = load_training_frame()
+
+    # Hold out 20% to report accuracy against the locality-average baseline
+    rng = np.random.default_rng(42)
+    test = rng.random(len(df)) < 0.2
+    held_out = fit(df[~test])
+    model = RentModel(held_out)
+    test_frame = df[test]
+    predicted = model.predict(test_frame['locality'], test_frame['area_sqft'], test_frame['bedrooms'],
+                              test_frame['furnishing'])
+    baseline = test_frame['locality'].map(df[~test].groupby('locality')['rent'].mean())
+    actual = test_frame['rent'].to_numpy()
+    print(f"✅ Hedonic rent model MAPE: {np.mean(np.abs(predicted / actual - 1)) * 100:.1f}% "
+          f"(locality average: {np.mean(np.abs(baseline.to_numpy() / actual - 1)) * 100:.1f}%)")
+
+    # Refit on every listing for the shipped coefficients
+    coefficients = fit(df)
+    with open(COEFFICIENTS_PATH, "w") as f:
+        json.dump(coefficients, f, indent=2)
+    print(f"💾 Coefficients for {len(coefficients['localities'])} localities saved to {COEFFICIENTS_PATH}")
@@ -2,6 +2,14 @@ import joblib
 import numpy as np
 import pandas as pd
 
+# Sibling modules resolve directly when run as a script from roi_model/
+try:
+    from roi_lookup import ROILookupTable, LOOKUP_PATH, match_locality
+    from roi_intervals import PackedForest, load_conformal_scores, predict_interval
+except ImportError:
+    from roi_model.roi_lookup import ROILookupTable, LOOKUP_PATH, match_locality
+    from roi_model.roi_intervals import PackedForest, load_conformal_scores, predict_interval
+
 # Load your trained model and encoder (adjust paths as needed)
 try:
     model = joblib.load("roi_model/roi_model.pkl")
@@ -12,36 +20,63 @@ except:
     model = None
     locality_encoder = None
 
-def predict_roi(locality, price):
+# Distilled lookup table for fast mode (built by roi_model/roi_lookup.py)
+try:
+    lookup_table = ROILookupTable.load(LOOKUP_PATH)
+    LOOKUP_LOADED = True
+except:
+    LOOKUP_LOADED = False
+    lookup_table = None
+
+# Conformal calibration scores (written by roi_model/roi_model.py)
+try:
+    conformal_scores = load_conformal_scores()
+except:
+    conformal_scores = None
+
+packed_forest = None
+
+def get_packed_forest():
+    """Flatten the forest once, on first use"""
+    global packed_forest
+    if packed_forest is None:
+        packed_forest = PackedForest(model)
+    return packed_forest
+
+def encode_locality(locality):
+    """Encode a (possibly partial) locality name for the model"""
+    locality_clean = match_locality(locality, locality_encoder.classes_)
+    return locality_encoder.transform([locality_clean])[0]
+
+def encode_features(locality, price):
+    """Model input row for a locality and price"""
+    return np.array([[encode_locality(locality), price]])
+
+def predict_roi(locality, price, mode="model"):
     """
     Predict ROI for a given locality and price
     
     Args:
         locality (str): Locality name
         price (float): Property price
+        mode (str): "model" to run the forest, "fast" to use the distilled
+            lookup table (falls back to the forest if the table is missing)
         
     Returns:
         float: Predicted ROI percentage
     """
+    if mode == "fast" and LOOKUP_LOADED:
+        try:
+            return lookup_table.predict(locality, price)
+        except Exception as e:
+            raise Exception(f"Error predicting ROI: {str(e)}")
+    
     if not MODEL_LOADED:
         raise Exception("ROI model not loaded")
     
     try:
-        # Clean locality name
-        locality_clean = locality.lower().strip()
-        
-        # Check if locality is in encoder classes
-        if locality_clean not in locality_encoder.classes_:
-            # Try to find a partial match
-            available_localities = locality_encoder.classes_
-            matches = [loc for loc in available_localities if locality_clean in loc or loc in locality_clean]
-            if matches:
-                locality_clean = matches[0]
-            else:
-                raise Exception(f"Locality '{locality}' not found in training data")
-        
-        # Encode locality
-        locality_encoded = locality_encoder.transform([locality_clean])[0]
+        # Clean and encode locality name
+        locality_encoded = encode_locality(locality)
         
         # Make prediction
         prediction = model.predict(np.array([[locality_encoded, price]]))[0]
@@ -51,6 +86,48 @@ def predict_roi(locality, price):
     except Exception as e:
         raise Exception(f"Error predicting ROI: {str(e)}")
 
+def predict_roi_interval(locality, price, quantiles=(5, 95), calibrated=True, coverage=0.9):
+    """
+    Predict ROI with an uncertainty interval from the forest's per-tree outputs
+    
+    Args:
+        locality (str): Locality name
+        price (float): Property price
+        quantiles (sequence): Percentiles of the per-tree predictions to report
+        calibrated (bool): Add a conformal interval if calibration scores exist
+        coverage (float): Target coverage of the conformal interval
+        
+    Returns:
+        dict: Mean prediction, tree spread, quantiles and optional conformal bounds
+    """
+    if not MODEL_LOADED:
+        raise Exception("ROI model not loaded")
+    
+    try:
+        interval = predict_interval(
+            get_packed_forest(),
+            encode_features(locality, price),
+            quantiles=quantiles,
+            calibration=conformal_scores if calibrated else None,
+            coverage=coverage
+        )
+        
+        result = {
+            'mean': float(interval['mean'][0]),
+            'std': float(interval['std'][0]),
+            'quantiles': {q: float(v[0]) for q, v in interval['quantiles'].items()}
+        }
+        if 'lower' in interval:
+            result['lower'] = float(interval['lower'][0])
+            result['upper'] = float(interval['upper'][0])
+            result['coverage'] = coverage
+        return result
+        
+    except ValueError:
+        raise
+    except Exception as e:
+        raise Exception(f"Error predicting ROI interval: {str(e)}")
+
 # Command-line interface (only runs when script is executed directly)
 if __name__ == "__main__":
     print("🏠 ROI Prediction Model")
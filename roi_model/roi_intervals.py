@@ -0,0 +1,137 @@
+# roi_intervals.py
+
+import json
+import numpy as np
+
+CONFORMAL_PATH = "roi_model/roi_conformal.json"
+
+
+class PackedForest:
+    """
+    All trees of a fitted forest flattened into shared node arrays
+
+    Traversing every tree for every sample happens in lock-step, one tree
+    level per numpy step, so the per-tree predictions come out of a single
+    vectorized pass instead of one estimator.predict call per tree.
+    """
+
+    def __init__(self, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point at themselves so extra steps keep them in place
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+
+        self.feature = np.concatenate(features).astype(np.int64)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts).astype(np.int64)
+        self.right = np.concatenate(rights).astype(np.int64)
+        self.value = np.concatenate(values)
+        self.is_leaf = self.left == np.arange(offset)
+        self.roots = np.asarray(roots, dtype=np.int64)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict_per_tree(self, X):
+        """
+        Per-tree predictions for every sample
+
+        Args:
+            X (array): Model inputs of shape (n_samples, n_features)
+
+        Returns:
+            array: Predictions of shape (n_samples, n_trees)
+        """
+        # sklearn compares float32 inputs against the thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+
+        while not self.is_leaf[nodes].all():
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes]
+
+
+def load_conformal_scores(path=CONFORMAL_PATH):
+    """Load calibration scores written by calibrate_conformal()"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def calibrate_conformal(packed_forest, X_cal, y_cal, path=CONFORMAL_PATH):
+    """
+    Store normalized conformal scores from a held-out split
+
+    The score of each calibration row is |y - mean| / (std + beta), so the
+    calibrated interval widens where the trees disagree.
+    """
+    per_tree = packed_forest.predict_per_tree(X_cal)
+    mean = per_tree.mean(axis=1)
+    std = per_tree.std(axis=1)
+    beta = float(np.median(std)) or 1e-6
+
+    scores = np.abs(np.asarray(y_cal, dtype=np.float64) - mean) / (std + beta)
+    calibration = {"beta": beta, "scores": np.sort(scores).tolist()}
+    with open(path, "w") as f:
+        json.dump(calibration, f)
+    return calibration
+
+
+def conformal_multiplier(calibration, coverage):
+    """Finite-sample corrected score quantile for the requested coverage"""
+    scores = np.asarray(calibration["scores"])
+    n = len(scores)
+    rank = min(int(np.ceil((n + 1) * coverage)), n)
+    return float(scores[rank - 1])
+
+
+def predict_interval(packed_forest, X, quantiles=(5, 95), calibration=None, coverage=0.9):
+    """
+    Mean prediction plus spread of the per-tree outputs
+
+    Args:
+        packed_forest (PackedForest): Flattened forest
+        X (array): Model inputs of shape (n_samples, n_features)
+        quantiles (sequence): Percentiles of the per-tree predictions to report
+        calibration (dict): Optional conformal scores from calibrate_conformal()
+        coverage (float): Target coverage of the conformal interval, strictly between 0 and 1
+
+    Returns:
+        dict: Arrays for mean, std, each quantile and (if calibrated) lower/upper
+
+    Raises:
+        ValueError: coverage outside (0, 1)
+    """
+    if not 0 < coverage < 1:
+        raise ValueError("coverage must be strictly between 0 and 1")
+    per_tree = packed_forest.predict_per_tree(X)
+    mean = per_tree.mean(axis=1)
+    std = per_tree.std(axis=1)
+
+    result = {
+        "mean": mean,
+        "std": std,
+        "quantiles": dict(zip(quantiles, np.percentile(per_tree, quantiles, axis=1)))
+    }
+
+    if calibration is not None:
+        half_width = conformal_multiplier(calibration, coverage) * (std + calibration["beta"])
+        result["lower"] = mean - half_width
+        result["upper"] = mean + half_width
+        result["coverage"] = coverage
+
+    return result
@@ -0,0 +1,223 @@
+# roi_lookup.py
+
+import bisect
+import numpy as np
+
+LOOKUP_PATH = "roi_model/roi_lookup.npz"
+
+# Column of the price feature in the model input [[locality_encoded, price]]
+PRICE_FEATURE = 1
+
+
+def match_locality(locality, available_localities):
+    """
+    Resolve a locality name against the trained locality classes
+
+    Args:
+        locality (str): Locality name as entered by the user
+        available_localities (sequence): Known (cleaned) locality names
+
+    Returns:
+        str: Matching locality name
+    """
+    locality_clean = locality.lower().strip()
+    if locality_clean in available_localities:
+        return locality_clean
+
+    # Try to find a partial match
+    matches = [loc for loc in available_localities if locality_clean in loc or loc in locality_clean]
+    if matches:
+        return matches[0]
+
+    raise Exception(f"Locality '{locality}' not found in training data")
+
+
+def _float32_floor(values):
+    """Largest float32 value that is <= each float64 value"""
+    floored = values.astype(np.float32)
+    too_big = floored.astype(np.float64) > values
+    floored[too_big] = np.nextafter(floored[too_big], np.float32(-np.inf))
+    return floored
+
+
+def _float32_above(value):
+    """Smallest float32 value that is > a float64 value"""
+    above = np.float32(value)
+    if float(above) <= value:
+        above = np.nextafter(above, np.float32(np.inf))
+    return above
+
+
+def price_split_points(model):
+    """Collect every price threshold used by any tree of the forest"""
+    thresholds = [
+        estimator.tree_.threshold[estimator.tree_.feature == PRICE_FEATURE]
+        for estimator in model.estimators_
+    ]
+    return np.unique(np.concatenate(thresholds))
+
+
+def build_lookup_table(model, locality_encoder):
+    """
+    Distill the ROI forest into per-locality piecewise-constant tables
+
+    For a fixed locality the forest is a step function of price whose steps can
+    only sit on the forest's own price thresholds, so evaluating it once inside
+    every interval between consecutive thresholds reproduces it exactly.
+    Intervals are probed with float32 values because sklearn casts inputs to
+    float32 before comparing them with the thresholds.
+
+    Args:
+        model: Fitted RandomForestRegressor on [[locality_encoded, price]]
+        locality_encoder: Fitted LabelEncoder for the locality column
+
+    Returns:
+        ROILookupTable: Compressed lookup table
+    """
+    thresholds = price_split_points(model)
+
+    # One probe per interval (t[i-1], t[i]], plus one above the last threshold
+    probes = _float32_floor(thresholds)
+    non_empty = np.ones(len(thresholds), dtype=bool)
+    non_empty[1:] = probes[1:].astype(np.float64) > thresholds[:-1]
+    thresholds, probes = thresholds[non_empty], probes[non_empty]
+    probes = np.append(probes, _float32_above(thresholds[-1]))
+
+    localities = np.asarray(locality_encoder.classes_, dtype=str)
+    codes = locality_encoder.transform(localities)
+
+    grid = np.column_stack([
+        np.repeat(codes, len(probes)),
+        np.tile(probes.astype(np.float64), len(codes))
+    ])
+    surface = model.predict(grid).reshape(len(codes), len(probes))
+
+    # Only keep the thresholds at which the prediction actually changes
+    breaks, values, break_offsets = [], [], [0]
+    for row in surface:
+        changes = np.flatnonzero(row[1:] != row[:-1])
+        breaks.append(thresholds[changes])
+        values.append(row[np.append(changes, len(row) - 1)])
+        break_offsets.append(break_offsets[-1] + len(changes))
+
+    return ROILookupTable(
+        localities=localities,
+        break_offsets=np.asarray(break_offsets, dtype=np.int64),
+        breaks=np.concatenate(breaks),
+        values=np.concatenate(values)
+    )
+
+
+def measure_max_deviation(table, model, locality_encoder, prices):
+    """Largest absolute difference between the table and the forest on a price grid"""
+    prices = np.asarray(prices, dtype=np.float64)
+    localities = np.asarray(locality_encoder.classes_, dtype=str)
+    codes = locality_encoder.transform(localities)
+
+    grid = np.column_stack([np.repeat(codes, len(prices)), np.tile(prices, len(codes))])
+    forest = model.predict(grid)
+    lookup = table.predict_batch(np.repeat(np.arange(len(localities)), len(prices)), grid[:, 1])
+    return float(np.max(np.abs(forest - lookup)))
+
+
+class ROILookupTable:
+    """Piecewise-constant ROI surface answering predictions with a binary search"""
+
+    def __init__(self, localities, break_offsets, breaks, values, max_deviation=None):
+        self.localities = np.asarray(localities, dtype=str)
+        self.break_offsets = np.asarray(break_offsets, dtype=np.int64)
+        self.breaks = np.asarray(breaks, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.max_deviation = max_deviation
+
+        # Plain lists keep the per-request path to a single bisect call
+        self._index = {name: i for i, name in enumerate(self.localities.tolist())}
+        self._breaks = []
+        self._values = []
+        for i in range(len(self.localities)):
+            start, end = self.break_offsets[i], self.break_offsets[i + 1]
+            self._breaks.append(self.breaks[start:end].tolist())
+            self._values.append(self.values[start + i:end + i + 1].tolist())
+
+    @classmethod
+    def load(cls, path=LOOKUP_PATH):
+        """Load a table written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            max_deviation = float(data["max_deviation"]) if "max_deviation" in data else None
+            return cls(
+                localities=data["localities"],
+                break_offsets=data["break_offsets"],
+                breaks=data["breaks"],
+                values=data["values"],
+                max_deviation=max_deviation
+            )
+
+    def save(self, path=LOOKUP_PATH):
+        """Write the table as a compressed .npz file"""
+        arrays = {
+            "localities": self.localities,
+            "break_offsets": self.break_offsets,
+            "breaks": self.breaks,
+            "values": self.values
+        }
+        if self.max_deviation is not None:
+            arrays["max_deviation"] = np.float64(self.max_deviation)
+        np.savez_compressed(path, **arrays)
+
+    def predict(self, locality, price):
+        """
+        Predict ROI for a given locality and price
+
+        Args:
+            locality (str): Locality name
+            price (float): Property price
+
+        Returns:
+            float: Predicted ROI percentage
+        """
+        locality_clean = match_locality(locality, self._index)
+        i = self._index[locality_clean]
+        position = bisect.bisect_left(self._breaks[i], float(np.float32(price)))
+        return self._values[i][position]
+
+    def predict_batch(self, locality_indices, prices):
+        """Vectorized prediction for arrays of locality indices and prices"""
+        locality_indices = np.asarray(locality_indices, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64).astype(np.float32).astype(np.float64)
+
+        # Shift each price into its own locality's segment of the concatenated breaks
+        starts = self.break_offsets[locality_indices]
+        ends = self.break_offsets[locality_indices + 1]
+        positions = np.empty(len(prices), dtype=np.int64)
+        for i in np.unique(locality_indices):
+            mask = locality_indices == i
+            positions[mask] = np.searchsorted(
+                self.breaks[starts[mask][0]:ends[mask][0]], prices[mask], side="left"
+            )
+        return self.values[starts + locality_indices + positions]
+
+
+# Command-line interface (only runs when script is executed directly)
+if __name__ == "__main__":
+    import time
+    import joblib
+    import pandas as pd
+
+    print("🏠 Building ROI lookup table")
+
+    model = joblib.load("roi_model/roi_model.pkl")
+    locality_encoder = joblib.load("roi_model/locality_encoder.pkl")
+
+    start = time.perf_counter()
+    table = build_lookup_table(model, locality_encoder)
+    print(f"✅ Distilled {len(table.localities)} localities into {len(table.values)} steps "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    # Check against a dense uniform grid plus every training price
+    prices = pd.read_csv("data/roi_dataset_cleaned.csv")["Price"].dropna().to_numpy()
+    grid = np.concatenate([np.linspace(0, prices.max() * 1.5, 5000), prices])
+    table.max_deviation = measure_max_deviation(table, model, locality_encoder, grid)
+    print(f"📏 Max deviation from forest: {table.max_deviation:.6f} ROI points")
+
+    table.save(LOOKUP_PATH)
+    print(f"💾 Lookup table saved to {LOOKUP_PATH}")
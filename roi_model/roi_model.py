@@ -7,6 +7,10 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error
 import numpy as np
+# Run as `python roi_model/roi_model.py`: sibling modules are imported by their
+# own names, since `roi_model.*` would resolve to this script and re-run training
+from roi_lookup import build_lookup_table, measure_max_deviation, LOOKUP_PATH
+from roi_intervals import PackedForest, calibrate_conformal, CONFORMAL_PATH
 
 # Load cleaned dataset
 df = pd.read_csv('data/roi_dataset_cleaned.csv')
@@ -40,4 +44,16 @@ print(f"✅ Model trained. RMSE: {rmse:.2f}")
 # Save model and encoder
 joblib.dump(model, 'roi_model/roi_model.pkl')
 joblib.dump(le, 'roi_model/locality_encoder.pkl')
-print("💾 Model and encoder saved successfully in roi_model/")
\ No newline at end of file
+print("💾 Model and encoder saved successfully in roi_model/")
+
+# Calibrate prediction intervals on the held-out split
+calibrate_conformal(PackedForest(model), X_test.to_numpy(), y_test.to_numpy())
+print(f"📐 Conformal calibration saved to {CONFORMAL_PATH}")
+
+# Distill the forest into the fast-mode lookup table (the small .npz is committed,
+# so fast mode works without the model pickle; re-run this script after retraining)
+lookup_table = build_lookup_table(model, le)
+price_grid = np.concatenate([np.linspace(0, df['Price'].max() * 1.5, 5000), df['Price'].to_numpy()])
+lookup_table.max_deviation = measure_max_deviation(lookup_table, model, le, price_grid)
+lookup_table.save(LOOKUP_PATH)
+print(f"⚡ Lookup table saved to {LOOKUP_PATH} (max deviation {lookup_table.max_deviation:.6f})")
@@ -0,0 +1,158 @@
+# shadow_scoring.py
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+CANDIDATE_MODEL_PATH = "roi_model/roi_model_candidate.pkl"
+
+
+class RollingWindow:
+    """Most recent samples of a metric, for percentile summaries"""
+
+    def __init__(self, size=5000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self, scale=1.0):
+        if not self.samples:
+            return {"count": 0}
+        values = np.asarray(self.samples) * scale
+        p50, p99 = np.percentile(values, [50, 99])
+        return {
+            "count": self.count,
+            "window": len(values),
+            "mean": round(float(values.mean()), 4),
+            "p50": round(float(p50), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(values.max()), 4)
+        }
+
+
+class ShadowMetricsStore:
+    """In-process store for shadow latency, divergence and error metrics"""
+
+    def __init__(self, window=5000, max_pending=10000):
+        self.lock = threading.Lock()
+        self.window = window
+        self.latency = {}
+        self.divergence = RollingWindow(window)
+        self.signed_divergence = RollingWindow(window)
+        self.errors = {}
+        self.dropped = 0
+        self.failures = 0
+        # request_id -> {model_name: prediction}, awaiting ground truth
+        self.pending = OrderedDict()
+        self.max_pending = max_pending
+
+    def record_latency(self, model_name, seconds):
+        with self.lock:
+            self.latency.setdefault(model_name, RollingWindow(self.window)).add(seconds)
+
+    def record_prediction(self, request_id, model_name, prediction):
+        with self.lock:
+            predictions = self.pending.setdefault(request_id, {})
+            predictions[model_name] = prediction
+            self.pending.move_to_end(request_id)
+            while len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+
+            if "primary" in predictions and "candidate" in predictions:
+                difference = predictions["candidate"] - predictions["primary"]
+                self.divergence.add(abs(difference))
+                self.signed_divergence.add(difference)
+
+    def record_ground_truth(self, request_id, actual):
+        """Score every stored prediction for a request against its observed ROI"""
+        with self.lock:
+            predictions = self.pending.pop(request_id, None)
+            if predictions is None:
+                return False
+            for model_name, prediction in predictions.items():
+                self.errors.setdefault(model_name, RollingWindow(self.window)).add(prediction - actual)
+            return True
+
+    def record_drop(self):
+        with self.lock:
+            self.dropped += 1
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+
+    def snapshot(self):
+        """Current metrics as a JSON-serializable dict"""
+        with self.lock:
+            errors = {}
+            for model_name, window in self.errors.items():
+                values = np.asarray(window.samples)
+                errors[model_name] = {
+                    "count": window.count,
+                    "mae": round(float(np.abs(values).mean()), 4),
+                    "rmse": round(float(np.sqrt((values ** 2).mean())), 4),
+                    "bias": round(float(values.mean()), 4)
+                }
+
+            return {
+                "latency_ms": {name: window.summary(scale=1000) for name, window in self.latency.items()},
+                "divergence": {
+                    "absolute": self.divergence.summary(),
+                    "signed_mean": self.signed_divergence.summary().get("mean")
+                },
+                "errors": errors,
+                "pending_ground_truth": len(self.pending),
+                "dropped": self.dropped,
+                "failures": self.failures
+            }
+
+
+class ShadowScorer:
+    """
+    Scores a candidate ROI model on live inputs off the request thread
+
+    The request thread only enqueues work; the candidate runs in a single
+    background worker so it can never slow down or break the primary path.
+    When the queue backs up, new shadow requests are dropped and counted.
+    """
+
+    def __init__(self, candidate_model, encode_features, metrics=None, max_queue=1000):
+        self.candidate_model = candidate_model
+        self.encode_features = encode_features
+        self.metrics = metrics or ShadowMetricsStore()
+        self.max_queue = max_queue
+        self.queued = 0
+        self.queue_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roi-shadow")
+
+    def submit(self, request_id, *inputs):
+        """Queue the candidate model on the same inputs as the primary"""
+        with self.queue_lock:
+            if self.queued >= self.max_queue:
+                self.metrics.record_drop()
+                return False
+            self.queued += 1
+
+        self.executor.submit(self._score, request_id, inputs)
+        return True
+
+    def _score(self, request_id, inputs):
+        try:
+            # Feature encoding happens here too, keeping it off the request thread. It is timed
+            # with the prediction, like the primary's predict_roi() call that encodes and predicts
+            start = time.perf_counter()
+            features = np.asarray(self.encode_features(*inputs), dtype=np.float64)
+            prediction = float(self.candidate_model.predict(features)[0])
+            self.metrics.record_latency("candidate", time.perf_counter() - start)
+            self.metrics.record_prediction(request_id, "candidate", prediction)
+        except Exception:
+            self.metrics.record_failure()
+        finally:
+            with self.queue_lock:
+                self.queued -= 1
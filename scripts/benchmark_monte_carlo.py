@@ -0,0 +1,30 @@
+# benchmark_monte_carlo.py
+# Throughput of the Monte Carlo investment engine. Run from the project root:
+#   python scripts/benchmark_monte_carlo.py
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from investment_calculator.monte_carlo import simulate_investment
+
+# Representative locality stats (Andheri-like), so the benchmark does not need the datasets
+LOCALITY_STATS = {
+    'avg_price': 120.0,
+    'price_range': {'min': 40.0, 'max': 400.0},
+    'avg_rent': 45000.0,
+    'avg_roi': 4.5,
+    'roi_range': {'min': 2.0, 'max': 8.0},
+    'avg_rate_sqft': 22000.0
+}
+
+for horizon in (10, 20, 30):
+    for n_paths in (10_000, 100_000, 250_000):
+        start = time.perf_counter()
+        result = simulate_investment(LOCALITY_STATS, 120, horizon, n_paths=n_paths, seed=42)
+        elapsed = time.perf_counter() - start
+        print(f"horizon={horizon:>2}y paths={n_paths:>7,}: {elapsed:6.3f}s "
+              f"({n_paths / elapsed:,.0f} paths/s, {n_paths * horizon * 12 / elapsed / 1e6:,.1f}M path-months/s) "
+              f"median IRR {result['irr_percent'].get('p50')}%")